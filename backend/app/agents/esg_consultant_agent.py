@@ -1,7 +1,17 @@
 import logging
 import asyncio
-from typing import Dict, List, Tuple, Any, Optional
-from datetime import datetime
+import multiprocessing
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import count
+from types import MappingProxyType
+from typing import Deque, Dict, List, Mapping, Tuple, Any, Optional
+from datetime import datetime, timezone
+from time import perf_counter_ns
+
+import orjson
 
 from app.agents.base_agent import BaseAgent, AgentProcessingError
 from app.bus import A2AMessage, MessageType
@@ -11,370 +21,167 @@ from app.vector_store.chroma_db import get_chroma_manager
 from langchain_openai import ChatOpenAI
 from langchain.chains import ConversationalRetrievalChain
 from app.core.llm_factory import llm_factory
+from app.services.assessment_engine import run_4d_assessment
 from langchain.prompts import PromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate, ChatPromptTemplate
 from langchain_community.vectorstores import Chroma
 from langchain.memory import ConversationBufferWindowMemory
-from langchain.schema import BaseRetriever
+from langchain.schema import BaseRetriever, Document
 from langchain.callbacks.base import BaseCallbackHandler
 
-class ESGQueryError(AgentProcessingError):
-    """ESG 查询专用异常"""
-    def __init__(self, message: str, query: str = "", recoverable: bool = True):
-        super().__init__(message, recoverable)
-        self.query = query
+# 每个对话保留的历史问答轮数
+MAX_CONVERSATION_HISTORY = 10
 
-class ESGAssessmentEngine:
-    """
-    ESG 评估引擎 - 智能评估和风险分析专家
-    
-    功能特性:
-    - 基于企业画像的智能评估
-    - 4D评估模型：发现、诊断、设计、交付
-    - 行业基准对比分析
-    - 风险机会识别
-    - 可操作的改进建议
-    """
-    
-    def __init__(self):
-        self.assessment_framework = {
-            "环境维度": {
-                "climate_change": {"name": "气候变化", "indicators": ["碳足迹", "能源效率", "气候风险适应"]},
-                "resource_management": {"name": "资源管理", "indicators": ["水资源", "废物管理", "循环经济"]},
-                "biodiversity": {"name": "生物多样性", "indicators": ["生态影响", "自然资本保护"]},
-                "pollution_control": {"name": "污染防控", "indicators": ["排放管理", "化学品安全"]}
-            },
-            "社会维度": {
-                "employee_rights": {"name": "员工权益", "indicators": ["劳工标准", "多样性包容", "健康安全"]},
-                "community_relations": {"name": "社区关系", "indicators": ["社区投资", "当地就业", "文化尊重"]},
-                "customer_responsibility": {"name": "客户责任", "indicators": ["产品安全", "数据隐私", "负责任营销"]},
-                "supply_chain": {"name": "供应链管理", "indicators": ["供应商ESG标准", "人权尽职调查"]}
-            },
-            "治理维度": {
-                "corporate_governance": {"name": "公司治理", "indicators": ["董事会独立性", "透明度", "问责制"]},
-                "business_ethics": {"name": "商业伦理", "indicators": ["反腐败", "反贿赂", "公平竞争"]},
-                "risk_management": {"name": "风险管理", "indicators": ["ESG风险识别", "管理体系", "应急响应"]},
-                "stakeholder_engagement": {"name": "利益相关方参与", "indicators": ["沟通机制", "反馈处理", "参与决策"]}
-            }
-        }
-        
-        # 行业基准数据（简化版本）
-        self.industry_benchmarks = {
-            "制造业": {
-                "environmental_score": 6.5,
-                "social_score": 7.0,
-                "governance_score": 7.5,
-                "key_challenges": ["碳减排", "供应链管理", "员工安全"]
-            },
-            "金融业": {
-                "environmental_score": 7.5,
-                "social_score": 8.0,
-                "governance_score": 8.5,
-                "key_challenges": ["负责任投资", "数据安全", "金融包容性"]
-            },
-            "服务业": {
-                "environmental_score": 7.0,
-                "social_score": 7.5,
-                "governance_score": 7.8,
-                "key_challenges": ["数据隐私", "员工福利", "客户权益"]
-            },
-            "科技业": {
-                "environmental_score": 7.2,
-                "social_score": 7.8,
-                "governance_score": 8.0,
-                "key_challenges": ["算法伦理", "数字鸿沟", "数据安全"]
-            }
-        }
+# 对话摘要中展示的最近查询数
+RECENT_QUERIES_SIZE = 3
 
-    def conduct_4d_assessment(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        执行4D评估模型：发现、诊断、设计、交付
-        
-        Args:
-            company_profile: 企业画像
-            
-        Returns:
-            完整的ESG评估报告
-        """
-        # Step 1: Discover - 发现关键议题和风险点
-        key_issues = self._discover_key_issues(company_profile)
-        
-        # Step 2: Diagnose - 诊断当前ESG管理成熟度
-        maturity_diagnosis = self._diagnose_maturity(company_profile, key_issues)
-        
-        # Step 3: Design - 设计改进方案
-        improvement_design = self._design_improvements(company_profile, maturity_diagnosis)
-        
-        # Step 4: Deliver - 交付可执行路径
-        execution_plan = self._deliver_execution_plan(improvement_design)
-        
-        return {
-            "assessment_summary": {
-                "overall_score": self._calculate_overall_score(maturity_diagnosis),
-                "maturity_level": self._determine_maturity_level(maturity_diagnosis),
-                "top_risks": key_issues["high_risk_issues"][:3],
-                "top_opportunities": key_issues["opportunities"][:3]
-            },
-            "detailed_assessment": {
-                "key_issues_identified": key_issues,
-                "maturity_diagnosis": maturity_diagnosis,
-                "benchmark_comparison": self._compare_with_benchmarks(company_profile, maturity_diagnosis),
-                "risk_opportunity_analysis": self._analyze_risks_opportunities(company_profile, key_issues)
-            },
-            "improvement_roadmap": {
-                "improvement_design": improvement_design,
-                "execution_plan": execution_plan,
-                "quick_wins": execution_plan["quick_wins"],
-                "medium_term": execution_plan["medium_term"],
-                "long_term": execution_plan["long_term"]
-            },
-            "assessment_metadata": {
-                "assessment_date": datetime.now().isoformat(),
-                "assessment_framework": "4D模型",
-                "industry_context": company_profile.get("basic_profile", {}).get("industry_category", "未知"),
-                "data_completeness": company_profile.get("data_completeness", 0)
-            }
-        }
+# 统计平均耗时时保留的最近样本数
+STATS_WINDOW = 1000
 
-    def _discover_key_issues(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """发现关键ESG议题和风险点"""
-        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
-        risk_mapping = company_profile.get("esg_risk_mapping", {})
-        
-        high_risk_issues = []
-        medium_risk_issues = []
-        opportunities = []
-        
-        # 分析环境风险
-        env_risks = risk_mapping.get("environmental_risks", {})
-        if env_risks.get("level") == "高":
-            high_risk_issues.extend(env_risks.get("specific_risks", []))
-        elif env_risks.get("level") == "中":
-            medium_risk_issues.extend(env_risks.get("specific_risks", []))
-        
-        # 分析社会风险
-        social_risks = risk_mapping.get("social_risks", {})
-        if social_risks.get("level") == "高":
-            high_risk_issues.extend(social_risks.get("specific_risks", []))
-        elif social_risks.get("level") == "中":
-            medium_risk_issues.extend(social_risks.get("specific_risks", []))
-        
-        # 分析治理风险
-        gov_risks = risk_mapping.get("governance_risks", {})
-        if gov_risks.get("level") == "高":
-            high_risk_issues.extend(gov_risks.get("specific_risks", []))
-        elif gov_risks.get("level") == "中":
-            medium_risk_issues.extend(gov_risks.get("specific_risks", []))
-        
-        # 识别机会
-        maturity = company_profile.get("esg_maturity_assessment", {})
-        if maturity.get("improvement_potential") == "高":
-            opportunities.extend([
-                "建立ESG管理体系",
-                "制定可持续发展战略",
-                "提升ESG披露透明度"
-            ])
-        
-        return {
-            "high_risk_issues": high_risk_issues,
-            "medium_risk_issues": medium_risk_issues,
-            "opportunities": opportunities,
-            "materiality_matrix": self._create_materiality_matrix(company_profile)
-        }
 
-    def _diagnose_maturity(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> Dict[str, Any]:
-        """诊断ESG管理成熟度"""
-        maturity_assessment = company_profile.get("esg_maturity_assessment", {})
-        
-        # 基于现有成熟度评估扩展
-        current_stage = maturity_assessment.get("maturity_stage", "起步阶段")
-        
-        # 各维度成熟度评分（0-4分）
-        environmental_maturity = self._assess_dimension_maturity("环境", company_profile)
-        social_maturity = self._assess_dimension_maturity("社会", company_profile)
-        governance_maturity = self._assess_dimension_maturity("治理", company_profile)
-        
-        return {
-            "overall_maturity": current_stage,
-            "dimension_scores": {
-                "environmental": environmental_maturity,
-                "social": social_maturity,
-                "governance": governance_maturity
-            },
-            "strengths": self._identify_strengths(company_profile),
-            "gaps": self._identify_gaps(company_profile, key_issues),
-            "improvement_priorities": self._prioritize_improvements(environmental_maturity, social_maturity, governance_maturity)
-        }
+def _increment(counters: Dict[str, "count[int]"], counts: Dict[str, int], name: str) -> None:
+    """计数器自增：next() 在 GIL 下是原子的，不会丢失并发的自增"""
+    counts[name] = next(counters[name])
 
-    def _assess_dimension_maturity(self, dimension: str, company_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """评估单个维度的成熟度"""
-        # 简化的成熟度评估逻辑
-        maturity_indicators = company_profile.get("esg_maturity_assessment", {}).get("supporting_evidence", [])
-        
-        score = 1  # 基础分
-        if any("政策" in evidence for evidence in maturity_indicators):
-            score += 1
-        if any("实施" in evidence for evidence in maturity_indicators):
-            score += 1
-        if any("监控" in evidence for evidence in maturity_indicators):
-            score += 1
-        
-        levels = ["无意识", "初步意识", "系统化管理", "整合管理", "领先实践"]
-        
-        return {
-            "score": min(score, 4),
-            "level": levels[min(score, 4)],
-            "description": f"{dimension}维度处于{levels[min(score, 4)]}阶段"
-        }
 
-    def _create_materiality_matrix(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
-        """创建重要性议题矩阵"""
-        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
-        
-        # 基于行业特点设定议题重要性
-        if industry == "制造业":
-            high_impact_issues = ["碳排放管理", "供应链管理", "员工健康安全"]
-            medium_impact_issues = ["水资源管理", "社区关系", "公司治理"]
-        elif industry == "金融业":
-            high_impact_issues = ["负责任投资", "数据安全", "公司治理"]
-            medium_impact_issues = ["员工多样性", "客户隐私", "气候风险"]
-        else:
-            high_impact_issues = ["合规管理", "员工权益", "环境影响"]
-            medium_impact_issues = ["客户关系", "供应商管理", "社区参与"]
-        
-        return {
-            "high_impact_high_concern": high_impact_issues,
-            "medium_impact_medium_concern": medium_impact_issues,
-            "matrix_explanation": "基于行业特点和利益相关方关注度生成的重要性矩阵"
-        }
+# 来源文档预览的最大字符数
+PREVIEW_MAX_CHARS = 200
 
-    def _compare_with_benchmarks(self, company_profile: Dict[str, Any], maturity_diagnosis: Dict[str, Any]) -> Dict[str, Any]:
-        """与行业基准对比"""
-        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
-        benchmark = self.industry_benchmarks.get(industry, self.industry_benchmarks["服务业"])
-        
-        current_scores = maturity_diagnosis["dimension_scores"]
-        
-        return {
-            "industry_benchmark": benchmark,
-            "performance_gaps": {
-                "environmental": benchmark["environmental_score"] - current_scores["environmental"]["score"],
-                "social": benchmark["social_score"] - current_scores["social"]["score"],
-                "governance": benchmark["governance_score"] - current_scores["governance"]["score"]
-            },
-            "relative_position": "需要改进" if any(gap > 1 for gap in [
-                benchmark["environmental_score"] - current_scores["environmental"]["score"],
-                benchmark["social_score"] - current_scores["social"]["score"],
-                benchmark["governance_score"] - current_scores["governance"]["score"]
-            ]) else "接近行业平均水平"
-        }
 
-    def _analyze_risks_opportunities(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> Dict[str, Any]:
-        """分析风险和机会"""
-        risks = []
-        opportunities = []
-        
-        # 短期风险（1年内）
-        for risk in key_issues["high_risk_issues"]:
-            risks.append({
-                "risk": risk,
-                "timeframe": "短期",
-                "impact": "高",
-                "likelihood": "中",
-                "mitigation": f"建立{risk}管理制度"
-            })
-        
-        # 机会识别
-        for opp in key_issues["opportunities"]:
-            opportunities.append({
-                "opportunity": opp,
-                "value_potential": "中",
-                "timeframe": "中期",
-                "implementation_difficulty": "中"
-            })
-        
-        return {
-            "risk_register": risks,
-            "opportunity_register": opportunities,
-            "risk_heat_map": "高风险议题需要优先关注",
-            "opportunity_value_assessment": "中等价值创造潜力"
-        }
+def _preview(content: str) -> str:
+    """截取来源文档预览，未超过阈值时原样返回"""
+    return content if len(content) <= PREVIEW_MAX_CHARS else f"{content[:PREVIEW_MAX_CHARS]}…"
 
-    def _design_improvements(self, company_profile: Dict[str, Any], maturity_diagnosis: Dict[str, Any]) -> Dict[str, Any]:
-        """设计改进方案"""
-        priorities = maturity_diagnosis["improvement_priorities"]
-        gaps = maturity_diagnosis["gaps"]
-        
-        return {
-            "strategic_recommendations": [
-                "建立ESG治理架构",
-                "制定ESG政策体系",
-                "建立ESG绩效监测机制"
-            ],
-            "operational_improvements": [
-                "开展ESG培训",
-                "建立数据收集系统",
-                "制定ESG报告流程"
-            ],
-            "capability_building": [
-                "建立ESG专业团队",
-                "引入ESG管理工具",
-                "建立利益相关方沟通机制"
-            ]
-        }
 
-    def _deliver_execution_plan(self, improvement_design: Dict[str, Any]) -> Dict[str, Any]:
-        """交付执行计划"""
-        return {
-            "quick_wins": [
-                {"action": "制定ESG政策声明", "timeline": "1个月", "resource": "低", "impact": "中"},
-                {"action": "开展ESG现状调研", "timeline": "2个月", "resource": "中", "impact": "高"},
-                {"action": "建立ESG工作小组", "timeline": "1个月", "resource": "低", "impact": "中"}
-            ],
-            "medium_term": [
-                {"action": "建立ESG管理体系", "timeline": "6个月", "resource": "高", "impact": "高"},
-                {"action": "开展ESG培训项目", "timeline": "3个月", "resource": "中", "impact": "中"},
-                {"action": "建立ESG数据系统", "timeline": "4个月", "resource": "高", "impact": "高"}
-            ],
-            "long_term": [
-                {"action": "发布ESG报告", "timeline": "12个月", "resource": "高", "impact": "高"},
-                {"action": "获得ESG认证", "timeline": "18个月", "resource": "高", "impact": "中"},
-                {"action": "建立ESG文化", "timeline": "24个月", "resource": "中", "impact": "高"}
-            ]
+# 来源文档数超过该值时，在线程中处理以免阻塞事件循环
+SOURCE_OFFLOAD_THRESHOLD = 16
+
+
+def _process_sources(source_docs: List[Any]) -> List[Dict[str, Any]]:
+    """将检索到的来源文档转换为响应结构（纯函数）"""
+    return [
+        {
+            "content_preview": _preview(doc.page_content),
+            "metadata": doc.metadata,
+            "relevance_rank": i
         }
+        for i, doc in enumerate(source_docs, 1)
+        if isinstance(doc, Document)
+    ]
+
+
+# 个性化上下文模板
+_CONTEXT_TEMPLATE = (
+    "**企业背景信息：**\n"
+    "- 行业类别: {industry}\n"
+    "- 企业规模: {scale}\n"
+    "- ESG成熟度: {maturity}\n"
+    "\n"
+    "**主要ESG风险：**\n"
+    "{risks}"
+    "\n"
+    "请基于以上企业特定背景，提供针对性的ESG建议和指导。"
+)
+
+# 企业画像缓存键的序列化选项（键排序，保证同一画像得到同一键）
+_PROFILE_KEY_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=1024)
+def _render_personalized_context(profile_key: bytes) -> str:
+    """按规范化企业画像渲染个性化上下文"""
+    company_profile = orjson.loads(profile_key)
+    basic_info = company_profile.get("basic_profile", {})
+    risk_mapping = company_profile.get("esg_risk_mapping", {})
+    maturity = company_profile.get("esg_maturity_assessment", {})
+
+    risks = "".join([
+        f"- {risk_type}: {', '.join(risk_info['specific_risks'])}\n"
+        for risk_type, risk_info in risk_mapping.items()
+        if isinstance(risk_info, dict) and risk_info.get("specific_risks")
+    ])
+
+    return _CONTEXT_TEMPLATE.format_map({
+        "industry": basic_info.get("industry_category", "未知"),
+        "scale": basic_info.get("business_scale", "未知"),
+        "maturity": maturity.get("maturity_stage", "未评估"),
+        "risks": risks,
+    })
+
+
+# 个性化建议查找表（模块加载时预计算，所有Agent共享的只读元组）
+_MATURITY_RECOMMENDATIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "起步阶段": ("建议先建立ESG基础管理制度", "开展ESG现状评估和差距分析", "制定ESG发展路线图"),
+    "发展阶段": ("完善ESG管理体系和流程", "建立ESG绩效监测机制", "加强ESG信息披露"),
+})
+_INDUSTRY_RECOMMENDATIONS: Mapping[str, str] = MappingProxyType({
+    "制造业": "重点关注碳排放管理和供应链ESG风险",
+    "金融业": "重点关注负责任投资和ESG风险整合",
+})
+# (成熟度, 行业) -> 最多3条建议；"" 表示未匹配的成熟度或行业
+_RECS_BY_MATURITY_INDUSTRY: Mapping[Tuple[str, str], Tuple[str, ...]] = MappingProxyType({
+    (maturity, industry): (
+        _MATURITY_RECOMMENDATIONS.get(maturity, ())
+        + ((_INDUSTRY_RECOMMENDATIONS[industry],) if industry else ())
+    )[:3]
+    for maturity in (*_MATURITY_RECOMMENDATIONS, "")
+    for industry in (*_INDUSTRY_RECOMMENDATIONS, "")
+})
+
+_COMMON_FRAMEWORKS: Tuple[str, ...] = ("GRI标准", "SASB标准", "TCFD框架")
+_FRAMEWORKS_BY_INDUSTRY: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "制造业": _COMMON_FRAMEWORKS + ("ISO 14001环境管理体系",),
+    "金融业": _COMMON_FRAMEWORKS + ("UNEP FI原则", "赤道原则"),
+})
+
+_DEFAULT_NEXT_STEPS: Tuple[str, ...] = ("完善ESG数据收集系统", "开展利益相关方沟通", "准备ESG报告披露")
+_NEXT_STEPS_BY_MATURITY: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "起步阶段": ("开展ESG培训提升意识", "建立ESG工作小组", "制定ESG政策声明"),
+})
+
+
+@lru_cache(maxsize=2048)
+def _personalization_for(industry: str, maturity: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """按 (行业, 成熟度) 返回 (定制化建议, 相关框架, 下一步行动)，结果按键缓存"""
+    recommendations = _RECS_BY_MATURITY_INDUSTRY[(
+        maturity if maturity in _MATURITY_RECOMMENDATIONS else "",
+        industry if industry in _INDUSTRY_RECOMMENDATIONS else "",
+    )]
+    return (
+        recommendations,
+        _FRAMEWORKS_BY_INDUSTRY.get(industry, _COMMON_FRAMEWORKS),
+        _NEXT_STEPS_BY_MATURITY.get(maturity, _DEFAULT_NEXT_STEPS),
+    )
+
+
+# 评估进程池（所有Agent共享，首次评估时创建）
+_assessment_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_assessment_pool() -> ProcessPoolExecutor:
+    """获取评估进程池（工作进程数见 ASSESSMENT_POOL_SIZE）。使用forkserver启动方式，避免在已有Chroma/LangChain线程的进程中直接fork"""
+    global _assessment_pool
+    if _assessment_pool is None:
+        _assessment_pool = ProcessPoolExecutor(
+            max_workers=settings.ASSESSMENT_POOL_SIZE,
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _assessment_pool
+
+
+def shutdown_assessment_pool() -> None:
+    """关闭评估进程池"""
+    global _assessment_pool
+    if _assessment_pool is not None:
+        _assessment_pool.shutdown(wait=False, cancel_futures=True)
+        _assessment_pool = None
+
+
+class ESGQueryError(AgentProcessingError):
+    """ESG 查询专用异常"""
+    def __init__(self, message: str, query: str = "", recoverable: bool = True):
+        super().__init__(message, recoverable)
+        self.query = query
 
-    def _calculate_overall_score(self, maturity_diagnosis: Dict[str, Any]) -> float:
-        """计算总体ESG得分"""
-        scores = maturity_diagnosis["dimension_scores"]
-        env_score = scores["environmental"]["score"]
-        social_score = scores["social"]["score"]
-        gov_score = scores["governance"]["score"]
-        
-        # 加权平均（可根据行业调整权重）
-        return round((env_score + social_score + gov_score) / 3 * 2.5, 1)  # 转换为10分制
-
-    def _determine_maturity_level(self, maturity_diagnosis: Dict[str, Any]) -> str:
-        """确定整体成熟度水平"""
-        return maturity_diagnosis["overall_maturity"]
-
-    def _identify_strengths(self, company_profile: Dict[str, Any]) -> List[str]:
-        """识别优势"""
-        return ["有ESG意识", "愿意改进", "具备基础条件"]
-
-    def _identify_gaps(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> List[str]:
-        """识别差距"""
-        return key_issues["high_risk_issues"] + key_issues["medium_risk_issues"]
-
-    def _prioritize_improvements(self, env_maturity: Dict, social_maturity: Dict, governance_maturity: Dict) -> List[str]:
-        """优先级排序"""
-        scores = [
-            ("环境", env_maturity["score"]),
-            ("社会", social_maturity["score"]),
-            ("治理", governance_maturity["score"])
-        ]
-        
-        # 按得分从低到高排序，得分低的优先改进
-        sorted_scores = sorted(scores, key=lambda x: x[1])
-        return [dimension for dimension, score in sorted_scores]
 
 class ESGConsultantAgent(BaseAgent):
     """
@@ -406,27 +213,19 @@ class ESGConsultantAgent(BaseAgent):
             self.chroma_manager = get_chroma_manager()
             self.qa_chain = self._init_enhanced_qa_chain()
             
-            # ESG评估引擎
-            self.assessment_engine = ESGAssessmentEngine()
-            
             # 对话管理
-            self.conversations: Dict[str, List[Tuple[str, str]]] = {}
+            self.conversations: Dict[str, Deque[Tuple[str, str]]] = {}
             self.conversation_contexts: Dict[str, Dict[str, Any]] = {}
             
-            # 查询统计
-            self.query_stats = {
-                "total_queries": 0,
-                "successful_queries": 0,
-                "failed_queries": 0,
-                "average_response_time": 0.0
-            }
+            # 查询/评估统计：计数用 itertools.count（next() 原子自增），
+            # 耗时只保留最近 STATS_WINDOW 次，均值在读取统计时再计算
+            self._query_counters = {name: count(1) for name in ("total_queries", "successful_queries", "failed_queries")}
+            self._query_counts = dict.fromkeys(self._query_counters, 0)
+            self._query_times_ns: Deque[int] = deque(maxlen=STATS_WINDOW)
             
-            # 评估统计
-            self.assessment_stats = {
-                "total_assessments": 0,
-                "completed_assessments": 0,
-                "average_assessment_time": 0.0
-            }
+            self._assessment_counters = {name: count(1) for name in ("total_assessments", "completed_assessments")}
+            self._assessment_counts = dict.fromkeys(self._assessment_counters, 0)
+            self._assessment_times: Deque[float] = deque(maxlen=STATS_WINDOW)
             
             # 注册处理器
             self.register_handler("ping", self.handle_ping)
@@ -434,7 +233,7 @@ class ESGConsultantAgent(BaseAgent):
             self.register_handler("esg_assessment", self.handle_esg_assessment)
             self.register_handler("profile_based_query", self.handle_profile_based_query)
             
-            logging.info(f"ESGConsultantAgent {agent_id} initialized with enhanced capabilities and assessment engine")
+            logging.info("ESGConsultantAgent %s initialized with enhanced capabilities and assessment engine", agent_id)
             
         except Exception as e:
             raise AgentProcessingError(f"Failed to initialize ESGConsultantAgent: {e}", recoverable=False)
@@ -533,7 +332,7 @@ class ESGConsultantAgent(BaseAgent):
         Returns:
             健康状态响应
         """
-        logging.info(f"Received ping from {message.from_agent}")
+        logging.info("Received ping from %s", message.from_agent)
         
         # 执行健康检查
         health_info = {
@@ -558,22 +357,23 @@ class ESGConsultantAgent(BaseAgent):
         Returns:
             查询结果和相关信息
         """
-        start_time = asyncio.get_event_loop().time()
+        t0 = perf_counter_ns()
         query_text = message.payload.get("query", "").strip()
-        conversation_id = message.conversation_id
+        # 驻留对话ID，后续各字典查找可直接按对象身份比较
+        conversation_id = sys.intern(message.conversation_id or "")
         
         # 更新查询统计
-        self.query_stats["total_queries"] += 1
+        _increment(self._query_counters, self._query_counts, "total_queries")
         
         try:
             # 输入验证
             self._validate_query_input(query_text, conversation_id)
             
-            logging.info(f"Processing ESG query for conversation '{conversation_id}': '{query_text[:100]}...'")
+            logging.info("Processing ESG query for conversation '%s': '%.100s...'", conversation_id, query_text)
             
             # 获取或初始化对话上下文
             conversation_context = self._get_conversation_context(conversation_id)
-            chat_history = self.conversations.get(conversation_id, [])
+            chat_history = list(self.conversations.get(conversation_id, ()))
             
             # 增强查询处理
             result = await self._process_enhanced_query(
@@ -583,24 +383,27 @@ class ESGConsultantAgent(BaseAgent):
             )
             
             # 更新对话历史和上下文
-            self._update_conversation_history(conversation_id, query_text, result["answer"])
-            self._update_conversation_context(conversation_id, query_text, result)
+            self._update_conversation_history(conversation_id, conversation_context, query_text, result["answer"])
+            self._update_conversation_context(conversation_context, query_text)
             
             # 计算响应时间
-            response_time = asyncio.get_event_loop().time() - start_time
-            self._update_query_stats(response_time, success=True)
+            elapsed_ns = perf_counter_ns() - t0
+            self._update_query_stats(elapsed_ns, success=True)
+            response_time = elapsed_ns / 1e9
             
             # 构建增强响应
-            enhanced_response = self._build_enhanced_response(result, response_time, conversation_id)
+            enhanced_response = await self._build_enhanced_response(
+                result, response_time, conversation_id, conversation_context
+            )
             
-            logging.info(f"ESG query processed successfully in {response_time:.2f}s")
+            logging.info("ESG query processed successfully in %.2fs", response_time)
             return enhanced_response
             
         except ESGQueryError as e:
-            self._update_query_stats(asyncio.get_event_loop().time() - start_time, success=False)
+            self._update_query_stats(perf_counter_ns() - t0, success=False)
             raise e
         except Exception as e:
-            self._update_query_stats(asyncio.get_event_loop().time() - start_time, success=False)
+            self._update_query_stats(perf_counter_ns() - t0, success=False)
             raise ESGQueryError(
                 f"Unexpected error processing ESG query: {e}",
                 query=query_text,
@@ -626,7 +429,9 @@ class ESGConsultantAgent(BaseAgent):
                 "query_count": 0,
                 "topics": set(),
                 "user_interests": [],
-                "last_query_time": None
+                "last_query_time": None,
+                # 最近几次查询的环形缓冲，摘要接口直接读取，无需遍历完整历史
+                "recent_queries": deque(maxlen=RECENT_QUERIES_SIZE)
             }
         return self.conversation_contexts[conversation_id]
 
@@ -634,7 +439,7 @@ class ESGConsultantAgent(BaseAgent):
         """增强的查询处理"""
         try:
             # 在执行器中运行 LangChain 调用以避免阻塞
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             result = await loop.run_in_executor(
                 None,
                 lambda: self.qa_chain.invoke({
@@ -662,27 +467,24 @@ class ESGConsultantAgent(BaseAgent):
         
         # 检查答案质量指标
         if len(answer) < 20:
-            logging.warning(f"Query answer seems too short: {len(answer)} characters")
+            logging.warning("Query answer seems too short: %s characters", len(answer))
         
         source_docs = result.get("source_documents", [])
         if not source_docs:
             logging.warning("Query returned no source documents")
 
-    def _update_conversation_history(self, conversation_id: str, query: str, answer: str):
-        """更新对话历史"""
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = []
-        
-        self.conversations[conversation_id].append((query, answer))
+    def _update_conversation_history(self, conversation_id: str, context: Dict[str, Any], query: str, answer: str):
+        """更新对话历史（context 为调用方已取得的对话上下文）"""
+        history = self.conversations.get(conversation_id)
+        if history is None:
+            # 有界队列限制历史长度以控制内存使用，超出时自动丢弃最早的记录
+            history = self.conversations[conversation_id] = deque(maxlen=MAX_CONVERSATION_HISTORY)
         
-        # 限制历史长度以控制内存使用
-        max_history = 10
-        if len(self.conversations[conversation_id]) > max_history:
-            self.conversations[conversation_id] = self.conversations[conversation_id][-max_history:]
+        history.append((query, answer))
+        context["recent_queries"].append(query)
 
-    def _update_conversation_context(self, conversation_id: str, query: str, result: Dict[str, Any]):
+    def _update_conversation_context(self, context: Dict[str, Any], query: str):
         """更新对话上下文"""
-        context = self.conversation_contexts[conversation_id]
         context["query_count"] += 1
         context["last_query_time"] = datetime.now()
         
@@ -694,39 +496,37 @@ class ESGConsultantAgent(BaseAgent):
         }
         
         query_lower = query.lower()
+        add_topic = context["topics"].add
         for topic, keywords in esg_keywords.items():
             if any(keyword in query_lower for keyword in keywords):
-                context["topics"].add(topic)
-
-    def _update_query_stats(self, response_time: float, success: bool):
-        """更新查询统计"""
-        if success:
-            self.query_stats["successful_queries"] += 1
-        else:
-            self.query_stats["failed_queries"] += 1
-        
-        # 更新平均响应时间
-        total_queries = self.query_stats["total_queries"]
-        current_avg = self.query_stats["average_response_time"]
-        self.query_stats["average_response_time"] = (
-            (current_avg * (total_queries - 1) + response_time) / total_queries
-        )
+                add_topic(topic)
+
+    def _update_query_stats(self, elapsed_ns: int, success: bool):
+        """记录一次查询结果（耗时以纳秒传入，仅在输出时换算为秒）"""
+        _increment(self._query_counters, self._query_counts,
+                   "successful_queries" if success else "failed_queries")
+        self._query_times_ns.append(elapsed_ns)
+
+    @property
+    def query_stats(self) -> Dict[str, Any]:
+        """查询统计快照，平均响应时间取最近 STATS_WINDOW 次"""
+        times = self._query_times_ns
+        return {
+            **self._query_counts,
+            "average_response_time": sum(times) / len(times) / 1e9 if times else 0.0
+        }
 
-    def _build_enhanced_response(self, result: Dict[str, Any], response_time: float, conversation_id: str) -> Dict[str, Any]:
+    async def _build_enhanced_response(self, result: Dict[str, Any], response_time: float,
+                                       conversation_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """构建增强的响应"""
         answer = result.get("answer", "")
         source_docs = result.get("source_documents", [])
         
-        # 处理来源文档
-        processed_sources = []
-        for i, doc in enumerate(source_docs):
-            if hasattr(doc, 'page_content') and hasattr(doc, 'metadata'):
-                source_info = {
-                    "content_preview": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                    "metadata": doc.metadata,
-                    "relevance_rank": i + 1
-                }
-                processed_sources.append(source_info)
+        # 处理来源文档（检索宽度较大时移出事件循环）
+        if len(source_docs) > SOURCE_OFFLOAD_THRESHOLD:
+            processed_sources = await asyncio.to_thread(_process_sources, source_docs)
+        else:
+            processed_sources = _process_sources(source_docs)
         
         # 构建完整响应
         enhanced_response = {
@@ -737,12 +537,12 @@ class ESGConsultantAgent(BaseAgent):
                 "conversation_id": conversation_id,
                 "sources_count": len(processed_sources),
                 "answer_length": len(answer),
-                "query_timestamp": datetime.now().isoformat(),
+                "query_timestamp": datetime.now(timezone.utc).isoformat(),
                 "agent_id": self.agent_id
             },
             "conversation_context": {
-                "total_queries": self.conversation_contexts[conversation_id]["query_count"],
-                "identified_topics": list(self.conversation_contexts[conversation_id]["topics"])
+                "total_queries": context["query_count"],
+                "identified_topics": list(context["topics"])
             }
         }
         
@@ -771,10 +571,10 @@ class ESGConsultantAgent(BaseAgent):
             if conversation_id in self.conversation_contexts:
                 del self.conversation_contexts[conversation_id]
             
-            logging.info(f"Conversation {conversation_id} reset successfully")
+            logging.info("Conversation %s reset successfully", conversation_id)
             return True
         except Exception as e:
-            logging.error(f"Failed to reset conversation {conversation_id}: {e}")
+            logging.error("Failed to reset conversation %s: %s", conversation_id, e)
             return False
 
     def get_conversation_summary(self, conversation_id: str) -> Optional[Dict[str, Any]]:
@@ -791,7 +591,7 @@ class ESGConsultantAgent(BaseAgent):
             "created_at": context.get("created_at"),
             "last_query_time": context.get("last_query_time"),
             "identified_topics": list(context.get("topics", [])),
-            "recent_queries": [q for q, _ in conversation[-3:]]  # 最近3个查询
+            "recent_queries": list(context.get("recent_queries", ()))  # 最近3个查询
         }
         
         return summary
@@ -806,25 +606,27 @@ class ESGConsultantAgent(BaseAgent):
         Returns:
             完整的ESG评估报告
         """
-        start_time = asyncio.get_event_loop().time()
+        t0 = perf_counter_ns()
         company_profile = message.payload.get("company_profile", {})
         conversation_id = message.conversation_id
         
         # 更新评估统计
-        self.assessment_stats["total_assessments"] += 1
+        _increment(self._assessment_counters, self._assessment_counts, "total_assessments")
         
         try:
-            logging.info(f"Starting ESG assessment for conversation '{conversation_id}'")
+            logging.info("Starting ESG assessment for conversation '%s'", conversation_id)
             
             # 验证企业画像数据
             if not company_profile:
                 raise ESGQueryError("企业画像数据不能为空", recoverable=False)
             
-            # 执行4D评估
-            assessment_result = self.assessment_engine.conduct_4d_assessment(company_profile)
+            # 执行4D评估（纯CPU计算，放到进程池中执行，避免阻塞事件循环并利用多核）
+            assessment_result = await asyncio.get_running_loop().run_in_executor(
+                _get_assessment_pool(), run_4d_assessment, company_profile
+            )
             
             # 计算评估时间
-            assessment_time = asyncio.get_event_loop().time() - start_time
+            assessment_time = (perf_counter_ns() - t0) / 1e9
             self._update_assessment_stats(assessment_time, success=True)
             
             # 构建增强响应
@@ -833,7 +635,7 @@ class ESGConsultantAgent(BaseAgent):
                 "assessment_metadata": {
                     "assessment_time": round(assessment_time, 3),
                     "conversation_id": conversation_id,
-                    "assessment_timestamp": datetime.now().isoformat(),
+                    "assessment_timestamp": datetime.now(timezone.utc).isoformat(),
                     "agent_id": self.agent_id,
                     "company_profile_completeness": company_profile.get("data_completeness", 0)
                 },
@@ -844,11 +646,11 @@ class ESGConsultantAgent(BaseAgent):
                 }
             }
             
-            logging.info(f"ESG assessment completed successfully in {assessment_time:.2f}s")
+            logging.info("ESG assessment completed successfully in %.2fs", assessment_time)
             return enhanced_response
             
         except Exception as e:
-            self._update_assessment_stats(asyncio.get_event_loop().time() - start_time, success=False)
+            self._update_assessment_stats((perf_counter_ns() - t0) / 1e9, success=False)
             raise ESGQueryError(f"ESG评估失败: {e}", recoverable=True)
 
     async def handle_profile_based_query(self, message: A2AMessage) -> Dict[str, Any]:
@@ -861,13 +663,14 @@ class ESGConsultantAgent(BaseAgent):
         Returns:
             个性化的查询结果
         """
-        start_time = asyncio.get_event_loop().time()
+        t0 = perf_counter_ns()
         query_text = message.payload.get("query", "").strip()
         company_profile = message.payload.get("company_profile", {})
-        conversation_id = message.conversation_id
+        # 驻留对话ID，后续各字典查找可直接按对象身份比较
+        conversation_id = sys.intern(message.conversation_id or "")
         
         # 更新查询统计
-        self.query_stats["total_queries"] += 1
+        _increment(self._query_counters, self._query_counts, "total_queries")
         
         try:
             # 输入验证
@@ -877,7 +680,7 @@ class ESGConsultantAgent(BaseAgent):
                 logging.warning("No company profile provided, falling back to general query")
                 return await self.handle_user_query(message)
             
-            logging.info(f"Processing profile-based ESG query for conversation '{conversation_id}': '{query_text[:100]}...'")
+            logging.info("Processing profile-based ESG query for conversation '%s': '%.100s...'", conversation_id, query_text)
             
             # 获取或初始化对话上下文
             conversation_context = self._get_conversation_context(conversation_id)
@@ -887,7 +690,7 @@ class ESGConsultantAgent(BaseAgent):
             personalized_context = self._build_personalized_context(query_text, company_profile)
             
             # 增强查询处理（结合企业画像）
-            chat_history = self.conversations.get(conversation_id, [])
+            chat_history = list(self.conversations.get(conversation_id, ()))
             enhanced_query = f"{personalized_context}\n\n用户问题: {query_text}"
             
             result = await self._process_enhanced_query(
@@ -897,26 +700,27 @@ class ESGConsultantAgent(BaseAgent):
             )
             
             # 更新对话历史和上下文
-            self._update_conversation_history(conversation_id, query_text, result["answer"])
-            self._update_conversation_context(conversation_id, query_text, result)
+            self._update_conversation_history(conversation_id, conversation_context, query_text, result["answer"])
+            self._update_conversation_context(conversation_context, query_text)
             
             # 计算响应时间
-            response_time = asyncio.get_event_loop().time() - start_time
-            self._update_query_stats(response_time, success=True)
+            elapsed_ns = perf_counter_ns() - t0
+            self._update_query_stats(elapsed_ns, success=True)
+            response_time = elapsed_ns / 1e9
             
             # 构建个性化响应
-            enhanced_response = self._build_personalized_response(
-                result, response_time, conversation_id, company_profile
+            enhanced_response = await self._build_personalized_response(
+                result, response_time, conversation_id, conversation_context, company_profile
             )
             
-            logging.info(f"Profile-based ESG query processed successfully in {response_time:.2f}s")
+            logging.info("Profile-based ESG query processed successfully in %.2fs", response_time)
             return enhanced_response
             
         except ESGQueryError as e:
-            self._update_query_stats(asyncio.get_event_loop().time() - start_time, success=False)
+            self._update_query_stats(perf_counter_ns() - t0, success=False)
             raise e
         except Exception as e:
-            self._update_query_stats(asyncio.get_event_loop().time() - start_time, success=False)
+            self._update_query_stats(perf_counter_ns() - t0, success=False)
             raise ESGQueryError(
                 f"个性化查询处理失败: {e}",
                 query=query_text,
@@ -924,119 +728,52 @@ class ESGConsultantAgent(BaseAgent):
             )
 
     def _build_personalized_context(self, query: str, company_profile: Dict[str, Any]) -> str:
-        """构建个性化上下文"""
-        basic_info = company_profile.get("basic_profile", {})
-        risk_mapping = company_profile.get("esg_risk_mapping", {})
-        maturity = company_profile.get("esg_maturity_assessment", {})
-        
-        context_parts = [
-            "**企业背景信息：**",
-            f"- 行业类别: {basic_info.get('industry_category', '未知')}",
-            f"- 企业规模: {basic_info.get('business_scale', '未知')}",
-            f"- ESG成熟度: {maturity.get('maturity_stage', '未评估')}",
-            "",
-            "**主要ESG风险：**"
-        ]
-        
-        # 添加风险信息
-        for risk_type, risk_info in risk_mapping.items():
-            if isinstance(risk_info, dict) and risk_info.get("specific_risks"):
-                context_parts.append(f"- {risk_type}: {', '.join(risk_info['specific_risks'])}")
-        
-        context_parts.extend([
-            "",
-            "请基于以上企业特定背景，提供针对性的ESG建议和指导。"
-        ])
-        
-        return "\n".join(context_parts)
+        """构建个性化上下文（同一企业画像的结果会被缓存）"""
+        return _render_personalized_context(orjson.dumps(company_profile, option=_PROFILE_KEY_OPTIONS, default=str))
 
-    def _build_personalized_response(self, result: Dict[str, Any], response_time: float, 
-                                   conversation_id: str, company_profile: Dict[str, Any]) -> Dict[str, Any]:
+    async def _build_personalized_response(self, result: Dict[str, Any], response_time: float, 
+                                         conversation_id: str, context: Dict[str, Any],
+                                         company_profile: Dict[str, Any]) -> Dict[str, Any]:
         """构建个性化响应"""
-        base_response = self._build_enhanced_response(result, response_time, conversation_id)
+        base_response = await self._build_enhanced_response(result, response_time, conversation_id, context)
         
         # 添加个性化元素
         industry = company_profile.get("basic_profile", {}).get("industry_category", "")
         maturity = company_profile.get("esg_maturity_assessment", {}).get("maturity_stage", "")
         
+        recommendations, frameworks, next_steps = _personalization_for(industry, maturity)
         base_response["personalization"] = {
             "industry_context": industry,
             "maturity_context": maturity,
-            "tailored_recommendations": self._generate_tailored_recommendations(
-                result["answer"], company_profile
-            ),
-            "relevant_frameworks": self._suggest_relevant_frameworks(industry),
-            "next_steps": self._suggest_next_steps(company_profile)
+            "tailored_recommendations": recommendations,
+            "relevant_frameworks": frameworks,
+            "next_steps": next_steps
         }
         
         return base_response
 
-    def _generate_tailored_recommendations(self, answer: str, company_profile: Dict[str, Any]) -> List[str]:
-        """生成定制化建议"""
-        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
-        maturity = company_profile.get("esg_maturity_assessment", {}).get("maturity_stage", "")
-        
-        recommendations = []
-        
-        if maturity == "起步阶段":
-            recommendations.extend([
-                "建议先建立ESG基础管理制度",
-                "开展ESG现状评估和差距分析",
-                "制定ESG发展路线图"
-            ])
-        elif maturity == "发展阶段":
-            recommendations.extend([
-                "完善ESG管理体系和流程",
-                "建立ESG绩效监测机制",
-                "加强ESG信息披露"
-            ])
-        
-        if industry == "制造业":
-            recommendations.append("重点关注碳排放管理和供应链ESG风险")
-        elif industry == "金融业":
-            recommendations.append("重点关注负责任投资和ESG风险整合")
-        
-        return recommendations[:3]  # 限制数量
-
-    def _suggest_relevant_frameworks(self, industry: str) -> List[str]:
-        """建议相关框架"""
-        common_frameworks = ["GRI标准", "SASB标准", "TCFD框架"]
-        
-        if industry == "制造业":
-            common_frameworks.append("ISO 14001环境管理体系")
-        elif industry == "金融业":
-            common_frameworks.extend(["UNEP FI原则", "赤道原则"])
-        
-        return common_frameworks
-
-    def _suggest_next_steps(self, company_profile: Dict[str, Any]) -> List[str]:
-        """建议下一步行动"""
-        maturity = company_profile.get("esg_maturity_assessment", {}).get("maturity_stage", "")
-        
-        if maturity == "起步阶段":
-            return [
-                "开展ESG培训提升意识",
-                "建立ESG工作小组",
-                "制定ESG政策声明"
-            ]
-        else:
-            return [
-                "完善ESG数据收集系统",
-                "开展利益相关方沟通",
-                "准备ESG报告披露"
-            ]
-
     def _update_assessment_stats(self, assessment_time: float, success: bool):
-        """更新评估统计"""
+        """记录一次评估结果"""
         if success:
-            self.assessment_stats["completed_assessments"] += 1
-        
-        # 更新平均评估时间
-        total_assessments = self.assessment_stats["total_assessments"]
-        current_avg = self.assessment_stats["average_assessment_time"]
-        self.assessment_stats["average_assessment_time"] = (
-            (current_avg * (total_assessments - 1) + assessment_time) / total_assessments
-        )
+            _increment(self._assessment_counters, self._assessment_counts, "completed_assessments")
+        self._assessment_times.append(assessment_time)
+
+    @property
+    def assessment_stats(self) -> Dict[str, Any]:
+        """评估统计快照，平均评估时间取最近 STATS_WINDOW 次"""
+        times = self._assessment_times
+        return {
+            **self._assessment_counts,
+            "average_assessment_time": sum(times) / len(times) if times else 0.0
+        }
+
+    async def cleanup(self) -> None:
+        """Agent特定的清理逻辑"""
+        try:
+            shutdown_assessment_pool()
+            logging.info("✅ ESGConsultantAgent %s cleaned up successfully", self.agent_id)
+        except Exception as e:
+            logging.error("❌ Error during ESGConsultantAgent cleanup: %s", e)
 
     def get_comprehensive_stats(self) -> Dict[str, Any]:
         """获取综合统计信息"""
@@ -3,17 +3,67 @@
 集成知识库搜索能力，为Chat模块提供基于私有知识库的智能回答
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from string import Template
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+
+import numpy as np
 
 from app.agents.base_agent import BaseAgent
-from app.tools.knowledge_search_tool import create_knowledge_search_tool
+from app.tools.knowledge_search_tool import KnowledgeSearchTool, create_knowledge_search_tool
 from app.bus.schemas import A2AMessage, MessageType
 from app.core.config import settings
+from app.core.chat_cache import chat_cache
+from app.core.response import iso_now
 
 logger = logging.getLogger(__name__)
 
+# 回答中嵌入的知识库上下文最大字符数
+MAX_CONTEXT_CHARS = 4000
+
+# 基于知识库的回答模板
+_KNOWLEDGE_RESPONSE_TEMPLATE = Template(
+    "基于您的知识库，我为您找到了以下相关信息：\n\n"
+    "$context\n\n"
+    "📋 **答案总结**:\n\n"
+    "根据上述文档内容，针对您的问题，我可以提供以下回答：\n\n"
+    "💡 **建议**: 如需了解更多详细信息，请查看相关文档或联系相关部门。"
+)
+
+# 每个Agent缓存的用户搜索工具数量上限
+USER_TOOLS_CACHE_SIZE = 1024
+
+# 需要搜索知识库的关键词和模式
+KNOWLEDGE_KEYWORDS = (
+    "文档", "报告", "政策", "规定", "制度", "流程",
+    "公司", "企业", "组织", "部门", "团队",
+    "ESG", "环境", "社会", "治理", "可持续",
+    "合规", "审计", "风险", "内控",
+    "什么是", "如何", "为什么", "介绍一下", "详细说明"
+)
+
+# 所有关键词编译为一个忽略大小写的正则，在C层一次扫描完成匹配
+_KNOWLEDGE_PATTERN = re.compile("|".join(map(re.escape, KNOWLEDGE_KEYWORDS)), re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def should_search_knowledge(question: str) -> bool:
+    """
+    判断问题是否需要搜索知识库（纯函数，重复问题直接命中缓存）
+    
+    Args:
+        question: 用户问题
+        
+    Returns:
+        是否需要搜索知识库
+    """
+    return _KNOWLEDGE_PATTERN.search(question) is not None
+
 
 class KnowledgeEnhancedAgent(BaseAgent):
     """
@@ -23,6 +73,21 @@ class KnowledgeEnhancedAgent(BaseAgent):
     当用户询问关于公司文档、政策或内部资料时，此Agent会搜索知识库并提供准确答案。
     """
     
+    # Agent特性（所有实例共享的只读常量）
+    capabilities: Tuple[str, ...] = (
+        "knowledge_search",           # 知识库搜索
+        "document_reference",         # 文档引用
+        "context_aware_response",     # 上下文感知回答
+        "source_citation",           # 来源引用
+    )
+    
+    personality: Mapping[str, bool] = MappingProxyType({
+        "helpful": True,              # 乐于助人
+        "accurate": True,            # 准确性优先
+        "detail_oriented": True,     # 注重细节
+        "citation_focused": True,    # 重视引用来源
+    })
+    
     def __init__(self, agent_id: str = "knowledge_enhanced_agent"):
         """
         初始化知识库增强Agent
@@ -31,26 +96,21 @@ class KnowledgeEnhancedAgent(BaseAgent):
             agent_id: Agent标识符
         """
         super().__init__(agent_id)
-        self.knowledge_search_tool = None
-        self.current_user_id = None
-        
-        # Agent特性
-        self.capabilities = [
-            "knowledge_search",           # 知识库搜索
-            "document_reference",         # 文档引用
-            "context_aware_response",     # 上下文感知回答
-            "source_citation",           # 来源引用
-        ]
-        
-        self.personality = {
-            "helpful": True,              # 乐于助人
-            "accurate": True,            # 准确性优先
-            "detail_oriented": True,     # 注重细节
-            "citation_focused": True,    # 重视引用来源
-        }
+        # 用户ID -> 知识库搜索工具，按LRU淘汰
+        self._tools: "OrderedDict[str, KnowledgeSearchTool]" = OrderedDict()
+        # (用户ID, 问题) -> 正在进行的知识库检索
+        self._inflight: Dict[Tuple[Optional[str], str], asyncio.Future] = {}
         
         logger.info(f"🧠 {self.agent_id} initialized with knowledge search capabilities")
     
+    async def initialize(self) -> bool:
+        """Agent特定的异步初始化逻辑（工具按用户延迟创建）"""
+        return True
+    
+    async def cleanup(self) -> None:
+        """Agent特定的清理逻辑"""
+        self._tools.clear()
+    
     async def _setup_tools(self, user_id: Optional[str] = None):
         """
         设置工具，包括知识库搜索工具
@@ -59,17 +119,30 @@ class KnowledgeEnhancedAgent(BaseAgent):
             user_id: 用户ID，用于个性化知识库访问
         """
         try:
-            if user_id:
-                self.current_user_id = user_id
-                self.knowledge_search_tool = create_knowledge_search_tool(user_id)
-                logger.info(f"🔧 Knowledge search tool setup for user: {user_id}")
-            else:
+            if not user_id:
                 logger.warning("⚠️ No user_id provided, knowledge search may be limited")
+            elif user_id in self._tools:
+                self._tools.move_to_end(user_id)
+            else:
+                # 工具创建是同步的，检查与写入之间不会被其它协程打断
+                self._tools[user_id] = create_knowledge_search_tool(user_id)
+                while len(self._tools) > USER_TOOLS_CACHE_SIZE:
+                    self._tools.popitem(last=False)
+                logger.info(f"🔧 Knowledge search tool setup for user: {user_id}")
                 
         except Exception as e:
             logger.error(f"❌ Failed to setup tools: {e}")
             raise
     
+    @staticmethod
+    def _user_id(message: A2AMessage) -> Optional[str]:
+        """从消息上下文或负载中获取用户ID"""
+        return message.context.get("user_id") or message.payload.get("user_id")
+    
+    def _get_tool(self, message: A2AMessage) -> Optional[KnowledgeSearchTool]:
+        """获取消息所属用户的知识库搜索工具"""
+        return self._tools.get(self._user_id(message))
+    
     async def _process_message(self, message: A2AMessage) -> Dict[str, Any]:
         """
         处理消息，重点是知识库相关的查询
@@ -82,8 +155,8 @@ class KnowledgeEnhancedAgent(BaseAgent):
         """
         try:
             # 获取用户信息并设置工具
-            user_id = message.context.get("user_id") or message.payload.get("user_id")
-            if user_id and user_id != self.current_user_id:
+            user_id = self._user_id(message)
+            if user_id and user_id not in self._tools:
                 await self._setup_tools(user_id)
             
             action = message.action
@@ -130,7 +203,8 @@ class KnowledgeEnhancedAgent(BaseAgent):
                 }
             
             # 检查工具是否已设置
-            if not self.knowledge_search_tool:
+            search_tool = self._get_tool(message)
+            if not search_tool:
                 return {
                     "type": "error", 
                     "error": "知识库搜索工具未初始化，请先设置用户信息",
@@ -138,7 +212,7 @@ class KnowledgeEnhancedAgent(BaseAgent):
                 }
             
             # 执行搜索
-            search_results = await self.knowledge_search_tool.search(
+            search_results = await search_tool.search(
                 query=query,
                 n_results=n_results,
                 document_types=document_types,
@@ -150,7 +224,7 @@ class KnowledgeEnhancedAgent(BaseAgent):
                 "results": search_results,
                 "query": query,
                 "agent_id": self.agent_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
         except Exception as e:
@@ -180,10 +254,24 @@ class KnowledgeEnhancedAgent(BaseAgent):
                     "agent_id": self.agent_id
                 }
             
-            # 首先检查是否需要搜索知识库
-            if await self._should_search_knowledge(user_question):
+            # 首先检查是否需要搜索知识库（本地判断，不涉及I/O），
+            # 不需要时直接返回，省去问题向量化和语义缓存查询
+            if should_search_knowledge(user_question):
+                # 相似问题近期已回答过时直接复用（按用户分区）
+                user_id = self._user_id(message)
+                cache_probe = None
+                if user_id:
+                    cache_probe = await chat_cache.lookup(user_id, user_question)
+                    if cache_probe.response is not None:
+                        cache_probe.response["timestamp"] = iso_now()
+                        return cache_probe.response
+                
                 # 执行知识库搜索
-                knowledge_context = await self._get_knowledge_context(user_question)
+                # 复用缓存查询阶段已算好的问题向量，避免重复嵌入
+                query_vector = cache_probe.vector if cache_probe is not None else None
+                knowledge_context = await self._get_knowledge_context(
+                    user_question, self._tools.get(user_id), query_vector
+                )
                 
                 if knowledge_context:
                     # 生成基于知识库的回答
@@ -191,14 +279,17 @@ class KnowledgeEnhancedAgent(BaseAgent):
                         user_question, knowledge_context
                     )
                     
-                    return {
+                    result = {
                         "type": "enhanced_chat_response",
                         "response": enhanced_response,
                         "has_knowledge_context": True,
                         "knowledge_sources": knowledge_context.get("sources", []),
                         "agent_id": self.agent_id,
-                        "timestamp": datetime.now().isoformat()
+                        "timestamp": iso_now()
                     }
+                    if cache_probe is not None:
+                        chat_cache.store(cache_probe, result)
+                    return result
             
             # 如果不需要知识库搜索，返回常规回答指示
             return {
@@ -216,53 +307,73 @@ class KnowledgeEnhancedAgent(BaseAgent):
                 "agent_id": self.agent_id
             }
     
-    async def _should_search_knowledge(self, question: str) -> bool:
+    async def _get_knowledge_context(self, question: str,
+                                     search_tool: Optional[KnowledgeSearchTool],
+                                     query_vector: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
         """
-        判断问题是否需要搜索知识库
+        获取问题相关的知识库上下文
+        
+        同一用户的相同问题正在检索时，后到的请求直接等待同一结果，不重复检索。
         
         Args:
             question: 用户问题
+            search_tool: 当前用户的知识库搜索工具
+            query_vector: 已计算的问题向量，提供时直接按向量检索
             
         Returns:
-            是否需要搜索知识库
+            知识库上下文信息
         """
-        # 定义需要搜索的关键词和模式
-        knowledge_keywords = [
-            "文档", "报告", "政策", "规定", "制度", "流程",
-            "公司", "企业", "组织", "部门", "团队",
-            "ESG", "环境", "社会", "治理", "可持续",
-            "合规", "审计", "风险", "内控",
-            "什么是", "如何", "为什么", "介绍一下", "详细说明"
-        ]
+        if not search_tool:
+            return None
+        
+        key = (search_tool.user_id, question)
+        future = self._inflight.get(key)
+        if future is not None:
+            # shield：等待方被取消时不影响共享的检索结果
+            return await asyncio.shield(future)
         
-        question_lower = question.lower()
-        return any(keyword in question_lower for keyword in knowledge_keywords)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            context = await self._search_knowledge_context(question, search_tool, query_vector)
+            future.set_result(context)
+            return context
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                # 发起方被取消，等待方按无上下文处理
+                future.set_result(None)
     
-    async def _get_knowledge_context(self, question: str) -> Optional[Dict[str, Any]]:
+    async def _search_knowledge_context(self, question: str,
+                                        search_tool: KnowledgeSearchTool,
+                                        query_vector: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
         """
-        获取问题相关的知识库上下文
+        检索知识库并构建上下文
         
         Args:
             question: 用户问题
+            search_tool: 当前用户的知识库搜索工具
+            query_vector: 已计算的问题向量
             
         Returns:
             知识库上下文信息
         """
         try:
-            if not self.knowledge_search_tool:
-                return None
-            
-            # 搜索知识库
-            search_results = await self.knowledge_search_tool.search(
-                query=question,
-                n_results=3  # 获取最相关的3个结果作为上下文
-            )
+            # 搜索知识库，获取最相关的3个结果作为上下文
+            if query_vector is not None:
+                search_results = await search_tool.search_by_vector(
+                    query_vector, query=question, n_results=3, format=False
+                )
+            else:
+                search_results = await search_tool.search(
+                    query=question, n_results=3, format=False
+                )
             
-            if "抱歉" in search_results or "没有找到" in search_results:
+            if not search_results["found"]:
                 return None
             
             return {
-                "context": search_results,
+                "context": search_tool.format_results(search_results, question),
                 "sources": ["知识库搜索结果"],  # 可以进一步解析具体来源
                 "confidence": "high"
             }
@@ -284,18 +395,10 @@ class KnowledgeEnhancedAgent(BaseAgent):
             基于知识库的回答
         """
         try:
-            context_text = knowledge_context.get("context", "")
+            context_text = knowledge_context.get("context", "")[:MAX_CONTEXT_CHARS]
             
             # 构建增强的回答
-            response_parts = [
-                f"基于您的知识库，我为您找到了以下相关信息：\n",
-                context_text,
-                "\n📋 **答案总结**:\n",
-                "根据上述文档内容，针对您的问题，我可以提供以下回答：",
-                "\n💡 **建议**: 如需了解更多详细信息，请查看相关文档或联系相关部门。"
-            ]
-            
-            return "\n".join(response_parts)
+            return _KNOWLEDGE_RESPONSE_TEMPLATE.substitute(context=context_text)
             
         except Exception as e:
             logger.error(f"❌ Failed to generate knowledge-based response: {e}")
@@ -313,7 +416,7 @@ class KnowledgeEnhancedAgent(BaseAgent):
         """
         try:
             query = message.payload.get("query", "")
-            context = await self._get_knowledge_context(query)
+            context = await self._get_knowledge_context(query, self._get_tool(message))
             
             return {
                 "type": "knowledge_context",
@@ -1,33 +1,68 @@
 """
 API endpoints for managing and retrieving ESG reports.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from typing import Any
 
-from app.services.report_service import ReportService, get_report_service
+from app.services.report_service import fetch_report, fetch_report_version
 from app.models import report as report_models
 
 router = APIRouter()
 
+# Clients may keep the report but must revalidate it with If-None-Match
+REPORT_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+
+def _report_etag(report_id: str, updated_at: datetime, report_status: str) -> str:
+    """Weak ETag derived from the report's version columns"""
+    digest = hashlib.blake2b(
+        f"{report_id}|{updated_at.isoformat()}|{report_status}".encode(), digest_size=16
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
 @router.get(
     "/{report_id}",
     response_model=report_models.ReportResponse,
     summary="Get a Report by ID",
     description="Retrieve the status and content of a specific ESG report."
 )
-def get_report(
-    report_id: str,
-    report_service: ReportService = Depends(get_report_service),
-) -> Any:
+async def get_report(report_id: str, request: Request, response: Response) -> Any:
     """
     Get a single report by its unique ID.
     
     - **report_id**: The UUID of the report to retrieve.
+
+    Responses carry an ETag; polling with If-None-Match returns 304 Not Modified
+    while the report is unchanged, without loading or serializing its content.
     """
-    db_report = report_service.get_report(report_id)
+    version = await fetch_report_version(report_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report with ID {report_id} not found."
+        )
+
+    etag = _report_etag(report_id, *version)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": REPORT_CACHE_CONTROL},
+        )
+
+    db_report = await fetch_report(report_id)
     if not db_report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Report with ID {report_id} not found."
         )
+    # ETag from the row actually returned, in case it changed since the version check
+    response.headers["ETag"] = _report_etag(report_id, db_report.updated_at, db_report.status)
+    response.headers["Cache-Control"] = REPORT_CACHE_CONTROL
     return db_report 
\ No newline at end of file
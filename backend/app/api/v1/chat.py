@@ -3,20 +3,27 @@ Chat API - 集成知识库搜索的智能聊天接口
 支持基于私有知识库的对话增强
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Response
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional, Dict, Any, Mapping, Tuple
+import asyncio
 import logging
-from datetime import datetime
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from time import time_ns
+from types import MappingProxyType
 
 from app.services.agent_service import get_agent_service, AgentService
-from app.agents.knowledge_enhanced_agent import create_knowledge_enhanced_agent
+from app.agents.knowledge_enhanced_agent import KnowledgeEnhancedAgent, create_knowledge_enhanced_agent
 from app.tools.knowledge_search_tool import create_knowledge_search_tool
-from app.core.response import APIResponse, create_response
+from app.core.response import APIResponse, create_response, iso_now
 from app.bus.schemas import A2AMessage, MessageType
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/chat", tags=["Chat"])
+# 聊天响应包含大量中文文本，使用orjson序列化（直接输出UTF-8，无需转义）
+router = APIRouter(prefix="/chat", tags=["Chat"], default_response_class=ORJSONResponse)
 
 
 # ========== 请求/响应模型 ==========
@@ -57,6 +64,58 @@ class KnowledgeSearchResponse(BaseModel):
     timestamp: str = Field(..., description="时间戳")
 
 
+# ========== 通用聊天建议 ==========
+
+_STATIC_SUGGESTIONS: Tuple[str, ...] = (
+    "我们公司的ESG政策是什么？",
+    "请介绍一下公司的环境保护措施",
+    "公司的治理结构是怎样的？",
+    "有哪些社会责任项目？",
+    "可持续发展目标是什么？"
+)
+
+SUGGESTIONS_CACHE_CONTROL = "public, max-age=3600"
+
+# 常规回答中回显用户问题的最大字符数
+MAX_ECHO_CHARS = 500
+
+
+# ========== Agent池 ==========
+
+# 缓存的用户Agent数量上限，超出时淘汰最久未使用的
+KNOWLEDGE_AGENT_POOL_SIZE = 512
+
+_agent_pool: "OrderedDict[str, KnowledgeEnhancedAgent]" = OrderedDict()
+_agent_pool_lock = asyncio.Lock()
+
+
+async def get_or_create_agent(user_id: str) -> KnowledgeEnhancedAgent:
+    """
+    获取用户的知识库增强Agent，不存在时创建并完成工具设置
+    
+    Args:
+        user_id: 用户ID
+        
+    Returns:
+        该用户复用的KnowledgeEnhancedAgent实例
+    """
+    agent = _agent_pool.get(user_id)
+    if agent is not None:
+        _agent_pool.move_to_end(user_id)
+        return agent
+    
+    async with _agent_pool_lock:
+        agent = _agent_pool.get(user_id)
+        if agent is None:
+            agent = create_knowledge_enhanced_agent("chat_knowledge_agent")
+            await agent._setup_tools(user_id)
+            _agent_pool[user_id] = agent
+            while len(_agent_pool) > KNOWLEDGE_AGENT_POOL_SIZE:
+                _, evicted = _agent_pool.popitem(last=False)
+                await evicted.cleanup()
+        return agent
+
+
 # ========== API接口 ==========
 
 @router.post("/send", response_model=APIResponse[ChatResponse])
@@ -71,18 +130,18 @@ async def send_chat_message(
     自动搜索私有知识库并提供基于文档内容的准确回答。
     """
     try:
-        conversation_id = request.conversation_id or f"chat_{datetime.now().timestamp()}"
+        conversation_id = request.conversation_id or f"chat_{time_ns()}"
         
-        # 创建知识库增强Agent
-        knowledge_agent = create_knowledge_enhanced_agent("chat_knowledge_agent")
+        # 获取该用户的知识库增强Agent（跨请求复用）
+        knowledge_agent = await get_or_create_agent(request.user_id)
         
         # 创建消息
         message = A2AMessage(
-            message_id=f"chat_{datetime.now().timestamp()}",
+            message_id=f"chat_{time_ns()}",
             conversation_id=conversation_id,
             task_id=conversation_id,
             from_agent="user",
-            to_agent="chat_knowledge_agent",
+            to_agent=knowledge_agent.agent_id,
             message_type=MessageType.REQUEST,
             action="enhanced_chat",
             payload={
@@ -108,7 +167,7 @@ async def send_chat_message(
                 has_knowledge_context=True,
                 knowledge_sources=agent_response.get("knowledge_sources", []),
                 suggestions=_generate_follow_up_suggestions(request.message),
-                timestamp=datetime.now().isoformat()
+                timestamp=iso_now()
             )
         elif agent_response.get("type") == "regular_chat_response":
             # 常规回答（需要调用基础LLM）
@@ -119,7 +178,7 @@ async def send_chat_message(
                 has_knowledge_context=False,
                 knowledge_sources=[],
                 suggestions=_generate_follow_up_suggestions(request.message),
-                timestamp=datetime.now().isoformat()
+                timestamp=iso_now()
             )
         else:
             # 错误响应
@@ -151,17 +210,16 @@ async def search_knowledge(request: KnowledgeSearchRequest):
             query=request.query,
             n_results=request.n_results,
             document_types=request.document_types,
-            category_filter=request.category_filter
+            category_filter=request.category_filter,
+            format=False
         )
-        
-        # 判断是否找到结果
-        found_results = not ("抱歉" in search_results or "没有找到" in search_results)
+        found_results = search_results["found"]
         
         response = KnowledgeSearchResponse(
-            results=search_results,
+            results=search_tool.format_results(search_results, request.query),
             query=request.query,
             found_results=found_results,
-            timestamp=datetime.now().isoformat()
+            timestamp=iso_now()
         )
         
         logger.info(f"✅ Knowledge search completed: '{request.query}' -> {found_results}")
@@ -184,16 +242,16 @@ async def get_knowledge_context(
     为特定查询获取相关的知识库上下文信息，用于增强对话。
     """
     try:
-        # 创建知识库增强Agent
-        knowledge_agent = create_knowledge_enhanced_agent("context_agent")
+        # 获取该用户的知识库增强Agent（跨请求复用）
+        knowledge_agent = await get_or_create_agent(user_id)
         
         # 创建获取上下文的消息
         message = A2AMessage(
-            message_id=f"context_{datetime.now().timestamp()}",
+            message_id=f"context_{time_ns()}",
             conversation_id=f"context_{user_id}",
             task_id=f"context_{user_id}",
             from_agent="user",
-            to_agent="context_agent",
+            to_agent=knowledge_agent.agent_id,
             message_type=MessageType.REQUEST,
             action="get_knowledge_context",
             payload={
@@ -218,7 +276,7 @@ async def get_knowledge_context(
 
 
 @router.get("/suggestions/{user_id}")
-async def get_chat_suggestions(user_id: str):
+async def get_chat_suggestions(user_id: str, response: Response):
     """
     获取聊天建议
     
@@ -226,19 +284,13 @@ async def get_chat_suggestions(user_id: str):
     """
     try:
         # 这里可以基于用户的文档内容生成智能建议
-        # 暂时返回一些通用建议
-        suggestions = [
-            "我们公司的ESG政策是什么？",
-            "请介绍一下公司的环境保护措施",
-            "公司的治理结构是怎样的？",
-            "有哪些社会责任项目？",
-            "可持续发展目标是什么？"
-        ]
+        # 暂时返回通用建议，内容固定，允许客户端缓存
+        response.headers["Cache-Control"] = SUGGESTIONS_CACHE_CONTROL
         
         return create_response({
-            "suggestions": suggestions,
+            "suggestions": _STATIC_SUGGESTIONS,
             "user_id": user_id,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": iso_now()
         })
         
     except Exception as e:
@@ -248,7 +300,46 @@ async def get_chat_suggestions(user_id: str):
 
 # ========== 辅助函数 ==========
 
-def _generate_follow_up_suggestions(user_message: str) -> List[str]:
+# 后续问题建议：各关键词分组为一个命名分组；分组放在行首前瞻中，
+# 保证 ESG > 环境 > 社会 > 治理 的优先级与消息中出现的位置无关
+_SUGGESTION_PATTERN = re.compile(
+    r"(?=.*?(?P<esg>ESG))|(?=.*?(?P<env>环境|环保|绿色))"
+    r"|(?=.*?(?P<soc>社会|员工|社区))|(?=.*?(?P<gov>治理|管理|风险))",
+    re.IGNORECASE | re.DOTALL
+)
+
+_SUGGESTIONS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "esg": (
+        "ESG评估的具体流程是什么？",
+        "公司在ESG方面有哪些改进计划？",
+        "如何提高ESG评分？"
+    ),
+    "env": (
+        "公司的碳减排目标是什么？",
+        "有哪些环保技术和措施？",
+        "环境管理体系如何运作？"
+    ),
+    "soc": (
+        "员工培训和发展计划如何？",
+        "公司如何参与社区建设？",
+        "多元化和包容性政策是什么？"
+    ),
+    "gov": (
+        "公司治理结构是怎样的？",
+        "风险管理机制如何？",
+        "合规管理体系如何运作？"
+    ),
+})
+
+_DEFAULT_SUGGESTIONS: Tuple[str, ...] = (
+    "还有其他相关问题吗？",
+    "需要更详细的信息吗？",
+    "想了解其他方面的内容吗？"
+)
+
+
+@lru_cache(maxsize=2048)
+def _generate_follow_up_suggestions(user_message: str) -> Tuple[str, ...]:
     """
     根据用户消息生成后续问题建议
     
@@ -256,39 +347,10 @@ def _generate_follow_up_suggestions(user_message: str) -> List[str]:
         user_message: 用户消息
         
     Returns:
-        建议问题列表
+        建议问题元组
     """
-    # 基于关键词生成相关建议
-    if "ESG" in user_message.upper():
-        return [
-            "ESG评估的具体流程是什么？",
-            "公司在ESG方面有哪些改进计划？",
-            "如何提高ESG评分？"
-        ]
-    elif any(keyword in user_message for keyword in ["环境", "环保", "绿色"]):
-        return [
-            "公司的碳减排目标是什么？",
-            "有哪些环保技术和措施？",
-            "环境管理体系如何运作？"
-        ]
-    elif any(keyword in user_message for keyword in ["社会", "员工", "社区"]):
-        return [
-            "员工培训和发展计划如何？",
-            "公司如何参与社区建设？",
-            "多元化和包容性政策是什么？"
-        ]
-    elif any(keyword in user_message for keyword in ["治理", "管理", "风险"]):
-        return [
-            "公司治理结构是怎样的？",
-            "风险管理机制如何？",
-            "合规管理体系如何运作？"
-        ]
-    else:
-        return [
-            "还有其他相关问题吗？",
-            "需要更详细的信息吗？",
-            "想了解其他方面的内容吗？"
-        ]
+    match = _SUGGESTION_PATTERN.match(user_message)
+    return _SUGGESTIONS[match.lastgroup] if match else _DEFAULT_SUGGESTIONS
 
 
 async def _handle_regular_chat(message: str, user_id: str) -> str:
@@ -303,9 +365,9 @@ async def _handle_regular_chat(message: str, user_id: str) -> str:
         AI回复
     """
     # 这里可以调用基础的LLM API来生成回答
-    # 暂时返回一个简单的回复
+    # 暂时返回一个简单的回复（回显的问题限制长度）
     return (
-        f"您好！我是ESG智能助手。关于您的问题「{message}」，"
+        f"您好！我是ESG智能助手。关于您的问题「{message[:MAX_ECHO_CHARS]}」，"
         "我可以为您提供帮助。如果您有关于公司文档、政策或ESG相关的具体问题，"
         "我可以搜索您的知识库来提供更准确的答案。请告诉我您想了解什么？"
     ) 
\ No newline at end of file
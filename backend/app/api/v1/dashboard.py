@@ -2,16 +2,25 @@
 提供ESG评分、关键指标、系统状态等数据
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional, Dict, Any
 import logging
 from datetime import datetime, timedelta
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 
-from app.core.response import APIResponse, create_response
+from app.core.response import (
+    APIResponse, content_etag, create_raw_response, etag_matches, fill_now, not_modified_response, now_placeholder
+)
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+# 接口均为 async def：只拼接内存中的数据、没有阻塞I/O，直接在事件循环上执行，
+# 省去线程池调度；接入数据库查询时需改用异步驱动，或将接口改为 def 交给线程池
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], default_response_class=ORJSONResponse)
+
+# 静态数据允许客户端/代理缓存30秒，之后以 If-None-Match 重新验证
+DASHBOARD_CACHE_CONTROL = "public, max-age=30"
 
 
 # ========== 请求/响应模型 ==========
@@ -24,6 +33,8 @@ class ESGScore(BaseModel):
     governance: float = Field(..., description="治理评分")
     last_updated: datetime = Field(..., description="最后更新时间")
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 class MetricCard(BaseModel):
     """指标卡片模型"""
     title: str = Field(..., description="指标标题")
@@ -33,6 +44,8 @@ class MetricCard(BaseModel):
     value_change: Optional[str] = Field(None, description="数值变化")
     color: str = Field(..., description="颜色主题", pattern="^(green|yellow|blue|red)$")
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 class SystemStatus(BaseModel):
     """系统状态模型"""
     service_name: str = Field(..., description="服务名称")
@@ -41,6 +54,8 @@ class SystemStatus(BaseModel):
     last_check: datetime = Field(..., description="最后检查时间")
     details: Optional[str] = Field(None, description="详细信息")
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 class RecentActivity(BaseModel):
     """最近活动模型"""
     id: str = Field(..., description="活动ID")
@@ -51,6 +66,8 @@ class RecentActivity(BaseModel):
     status: str = Field(..., description="状态")
     icon: str = Field(..., description="图标")
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 class DashboardData(BaseModel):
     """仪表板数据模型"""
     esg_scores: ESGScore = Field(..., description="ESG评分")
@@ -59,360 +76,216 @@ class DashboardData(BaseModel):
     recent_activities: List[RecentActivity] = Field(..., description="最近活动")
     last_updated: datetime = Field(..., description="数据最后更新时间")
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+
+# ========== 静态数据（模拟） ==========
+# 数据在导入时一次性序列化为JSON字节，请求时只替换时间占位符，
+# 字段顺序与上方模型保持一致；后续接入数据库时替换为实际查询
+
+_NOW = now_placeholder()
+
+# 模拟ESG评分数据（后续可从数据库获取）
+_ESG_SCORES = {
+    "overall": 85.0,
+    "environmental": 87.0,
+    "social": 82.0,
+    "governance": 88.0,
+    "last_updated": _NOW
+}
+
+# 模拟关键指标数据
+_KEY_METRICS = (
+    {"title": "ESG综合评分", "value": "85", "change": "+5分", "trend": "up", "value_change": None, "color": "green"},
+    {"title": "环境表现", "value": "A-", "change": "提升1级", "trend": "up", "value_change": None, "color": "green"},
+    {"title": "社会责任", "value": "82", "change": "+3分", "trend": "up", "value_change": None, "color": "blue"},
+    {"title": "公司治理", "value": "88", "change": "持平", "trend": "stable", "value_change": None, "color": "yellow"},
+    {"title": "风险等级", "value": "中低", "change": "降低", "trend": "up", "value_change": None, "color": "green"},
+    {"title": "合规状态", "value": "100%", "change": "满分", "trend": "stable", "value_change": None, "color": "green"}
+)
+
+# 模拟系统状态数据
+_SYSTEM_STATUS = (
+    {"service_name": "AI Agent服务", "status": "healthy", "response_time": 150.0, "last_check": _NOW, "details": "正常运行"},
+    {"service_name": "数据库连接", "status": "healthy", "response_time": 50.0, "last_check": _NOW, "details": "连接正常"},
+    {"service_name": "API响应时间", "status": "healthy", "response_time": 180.0, "last_check": _NOW, "details": "< 200ms"},
+    {"service_name": "向量数据库", "status": "healthy", "response_time": 120.0, "last_check": _NOW, "details": "ChromaDB正常"}
+)
+
+# 模拟最近活动数据
+_RECENT_ACTIVITIES = (
+    {
+        "id": "activity_1",
+        "type": "profile_generation",
+        "title": "企业画像生成",
+        "description": "已完成基础信息收集，正在进行ESG风险评估...",
+        "timestamp": now_placeholder(timedelta(hours=2)),
+        "status": "in_progress",
+        "icon": "🤖"
+    },
+    {
+        "id": "activity_2",
+        "type": "report_analysis",
+        "title": "ESG报告分析",
+        "description": "环境指标表现良好，建议加强社会责任投入...",
+        "timestamp": now_placeholder(timedelta(days=1)),
+        "status": "completed",
+        "icon": "📊"
+    },
+    {
+        "id": "activity_3",
+        "type": "compliance_check",
+        "title": "合规性检查",
+        "description": "完成GRI标准合规性检查，发现3个改进点...",
+        "timestamp": now_placeholder(timedelta(days=2)),
+        "status": "completed",
+        "icon": "✅"
+    },
+    {
+        "id": "activity_4",
+        "type": "risk_assessment",
+        "title": "风险评估",
+        "description": "识别出2个高风险项目，已生成改进建议...",
+        "timestamp": now_placeholder(timedelta(days=3)),
+        "status": "completed",
+        "icon": "⚠️"
+    }
+)
+
+_ESG_SCORES_JSON = orjson.dumps(_ESG_SCORES)
+_KEY_METRICS_JSON = orjson.dumps(_KEY_METRICS)
+_SYSTEM_STATUS_JSON = orjson.dumps(_SYSTEM_STATUS)
+_KEY_METRICS_ETAG = content_etag(_KEY_METRICS_JSON)
+_SYSTEM_STATUS_ETAG = content_etag(_SYSTEM_STATUS_JSON)
+# 最近活动按条序列化，limit 只需截取字节片段再拼接
+_RECENT_ACTIVITY_ROWS_JSON = tuple(orjson.dumps(activity) for activity in _RECENT_ACTIVITIES)
+# 概览展示前三项系统状态和前两条最近活动
+_OVERVIEW_JSON = orjson.dumps({
+    "esg_scores": _ESG_SCORES,
+    "key_metrics": _KEY_METRICS,
+    "system_status": _SYSTEM_STATUS[:3],
+    "recent_activities": _RECENT_ACTIVITIES[:2],
+    "last_updated": _NOW
+})
+
 
 # ========== API接口 ==========
 
-@router.get("/overview", response_model=APIResponse[DashboardData])
+@router.get("/overview", responses={200: {"model": APIResponse[DashboardData]}})
 async def get_dashboard_overview(
     company_id: Optional[str] = Query(None, description="企业ID")
-) -> APIResponse[DashboardData]:
+):
     """获取仪表板概览数据"""
     try:
-        logger.info(f"获取仪表板数据，企业ID: {company_id}")
-        
-        # 模拟ESG评分数据（后续可从数据库获取）
-        esg_scores = ESGScore(
-            overall=85.0,
-            environmental=87.0,
-            social=82.0,
-            governance=88.0,
-            last_updated=datetime.now()
-        )
-        
-        # 模拟关键指标数据
-        key_metrics = [
-            MetricCard(
-                title="ESG综合评分",
-                value="85",
-                change="+5分",
-                trend="up",
-                icon="🎯",
-                color="green"
-            ),
-            MetricCard(
-                title="环境表现",
-                value="A-",
-                change="提升1级",
-                trend="up",
-                icon="🌱",
-                color="green"
-            ),
-            MetricCard(
-                title="社会责任",
-                value="82",
-                change="+3分",
-                trend="up",
-                icon="👥",
-                color="blue"
-            ),
-            MetricCard(
-                title="公司治理",
-                value="88",
-                change="持平",
-                trend="stable",
-                icon="⚖️",
-                color="yellow"
-            ),
-            MetricCard(
-                title="风险等级",
-                value="中低",
-                change="降低",
-                trend="up",
-                icon="🛡️",
-                color="green"
-            ),
-            MetricCard(
-                title="合规状态",
-                value="100%",
-                change="满分",
-                trend="stable",
-                icon="✅",
-                color="green"
-            )
-        ]
-        
-        # 模拟系统状态数据
-        system_status = [
-            SystemStatus(
-                service_name="AI Agent服务",
-                status="healthy",
-                response_time=150.0,
-                last_check=datetime.now(),
-                details="正常运行"
-            ),
-            SystemStatus(
-                service_name="数据库连接",
-                status="healthy",
-                response_time=50.0,
-                last_check=datetime.now(),
-                details="连接正常"
-            ),
-            SystemStatus(
-                service_name="API响应时间",
-                status="healthy",
-                response_time=180.0,
-                last_check=datetime.now(),
-                details="< 200ms"
-            )
-        ]
-        
-        # 模拟最近活动数据
-        recent_activities = [
-            RecentActivity(
-                id="activity_1",
-                type="profile_generation",
-                title="企业画像生成",
-                description="已完成基础信息收集，正在进行ESG风险评估...",
-                timestamp=datetime.now() - timedelta(hours=2),
-                status="in_progress",
-                icon="🤖"
-            ),
-            RecentActivity(
-                id="activity_2",
-                type="report_analysis",
-                title="ESG报告分析",
-                description="环境指标表现良好，建议加强社会责任投入...",
-                timestamp=datetime.now() - timedelta(days=1),
-                status="completed",
-                icon="📊"
-            )
-        ]
+        logger.info("获取仪表板数据，企业ID: %s", company_id)
         
-        dashboard_data = DashboardData(
-            esg_scores=esg_scores,
-            key_metrics=key_metrics,
-            system_status=system_status,
-            recent_activities=recent_activities,
-            last_updated=datetime.now()
-        )
-        
-        return create_response(
-            data=dashboard_data,
+        return create_raw_response(
+            data=fill_now(_OVERVIEW_JSON),
             message="仪表板数据获取成功"
         )
         
     except Exception as e:
-        logger.error(f"获取仪表板数据失败: {str(e)}")
+        logger.error("获取仪表板数据失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"获取仪表板数据失败: {str(e)}"
         )
 
 
-@router.get("/esg-scores", response_model=APIResponse[ESGScore])
+@router.get("/esg-scores", responses={200: {"model": APIResponse[ESGScore]}})
 async def get_esg_scores(
     company_id: Optional[str] = Query(None, description="企业ID")
-) -> APIResponse[ESGScore]:
+):
     """获取ESG评分数据"""
     try:
-        logger.info(f"获取ESG评分，企业ID: {company_id}")
-        
-        # 模拟ESG评分数据（后续可从数据库获取）
-        esg_scores = ESGScore(
-            overall=85.0,
-            environmental=87.0,
-            social=82.0,
-            governance=88.0,
-            last_updated=datetime.now()
-        )
+        logger.info("获取ESG评分，企业ID: %s", company_id)
         
-        return create_response(
-            data=esg_scores,
+        return create_raw_response(
+            data=fill_now(_ESG_SCORES_JSON),
             message="ESG评分获取成功"
         )
         
     except Exception as e:
-        logger.error(f"获取ESG评分失败: {str(e)}")
+        logger.error("获取ESG评分失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"获取ESG评分失败: {str(e)}"
         )
 
 
-@router.get("/metrics", response_model=APIResponse[List[MetricCard]])
+@router.get("/metrics", responses={200: {"model": APIResponse[List[MetricCard]]}})
 async def get_key_metrics(
+    request: Request,
     company_id: Optional[str] = Query(None, description="企业ID")
-) -> APIResponse[List[MetricCard]]:
+):
     """获取关键指标数据"""
     try:
-        logger.info(f"获取关键指标，企业ID: {company_id}")
+        logger.info("获取关键指标，企业ID: %s", company_id)
         
-        # 模拟关键指标数据
-        metrics = [
-            MetricCard(
-                title="ESG综合评分",
-                value="85",
-                change="+5分",
-                trend="up",
-                icon="🎯",
-                color="green"
-            ),
-            MetricCard(
-                title="环境表现",
-                value="A-",
-                change="提升1级",
-                trend="up",
-                icon="🌱",
-                color="green"
-            ),
-            MetricCard(
-                title="社会责任",
-                value="82",
-                change="+3分",
-                trend="up",
-                icon="👥",
-                color="blue"
-            ),
-            MetricCard(
-                title="公司治理",
-                value="88",
-                change="持平",
-                trend="stable",
-                icon="⚖️",
-                color="yellow"
-            ),
-            MetricCard(
-                title="风险等级",
-                value="中低",
-                change="降低",
-                trend="up",
-                icon="🛡️",
-                color="green"
-            ),
-            MetricCard(
-                title="合规状态",
-                value="100%",
-                change="满分",
-                trend="stable",
-                icon="✅",
-                color="green"
-            )
-        ]
+        if etag_matches(request, _KEY_METRICS_ETAG):
+            return not_modified_response(_KEY_METRICS_ETAG, DASHBOARD_CACHE_CONTROL)
         
-        return create_response(
-            data=metrics,
+        response = create_raw_response(
+            data=_KEY_METRICS_JSON,
             message="关键指标获取成功"
         )
+        response.headers["ETag"] = _KEY_METRICS_ETAG
+        response.headers["Cache-Control"] = DASHBOARD_CACHE_CONTROL
+        return response
         
     except Exception as e:
-        logger.error(f"获取关键指标失败: {str(e)}")
+        logger.error("获取关键指标失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"获取关键指标失败: {str(e)}"
         )
 
 
-@router.get("/system-status", response_model=APIResponse[List[SystemStatus]])
-async def get_system_status() -> APIResponse[List[SystemStatus]]:
+@router.get("/system-status", responses={200: {"model": APIResponse[List[SystemStatus]]}})
+async def get_system_status(request: Request):
     """获取系统状态"""
     try:
         logger.info("获取系统状态")
         
-        # 模拟系统状态数据
-        status_list = [
-            SystemStatus(
-                service_name="AI Agent服务",
-                status="healthy",
-                response_time=150.0,
-                last_check=datetime.now(),
-                details="正常运行"
-            ),
-            SystemStatus(
-                service_name="数据库连接",
-                status="healthy",
-                response_time=50.0,
-                last_check=datetime.now(),
-                details="连接正常"
-            ),
-            SystemStatus(
-                service_name="API响应时间",
-                status="healthy",
-                response_time=180.0,
-                last_check=datetime.now(),
-                details="< 200ms"
-            ),
-            SystemStatus(
-                service_name="向量数据库",
-                status="healthy",
-                response_time=120.0,
-                last_check=datetime.now(),
-                details="ChromaDB正常"
-            )
-        ]
+        if etag_matches(request, _SYSTEM_STATUS_ETAG):
+            return not_modified_response(_SYSTEM_STATUS_ETAG, DASHBOARD_CACHE_CONTROL)
         
-        return create_response(
-            data=status_list,
+        response = create_raw_response(
+            data=fill_now(_SYSTEM_STATUS_JSON),
             message="系统状态获取成功"
         )
+        response.headers["ETag"] = _SYSTEM_STATUS_ETAG
+        response.headers["Cache-Control"] = DASHBOARD_CACHE_CONTROL
+        return response
         
     except Exception as e:
-        logger.error(f"获取系统状态失败: {str(e)}")
+        logger.error("获取系统状态失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"获取系统状态失败: {str(e)}"
         )
 
 
-@router.get("/activities", response_model=APIResponse[List[RecentActivity]])
+@router.get("/activities", responses={200: {"model": APIResponse[List[RecentActivity]]}})
 async def get_recent_activities(
-    limit: int = Query(10, description="返回数量限制"),
+    limit: int = Query(10, ge=1, le=100, description="返回数量限制"),
     company_id: Optional[str] = Query(None, description="企业ID")
-) -> APIResponse[List[RecentActivity]]:
+):
     """获取最近活动"""
     try:
-        logger.info(f"获取最近活动，限制: {limit}，企业ID: {company_id}")
-        
-        # 模拟最近活动数据
-        activities = [
-            RecentActivity(
-                id="activity_1",
-                type="profile_generation",
-                title="企业画像生成",
-                description="已完成基础信息收集，正在进行ESG风险评估...",
-                timestamp=datetime.now() - timedelta(hours=2),
-                status="in_progress",
-                icon="🤖"
-            ),
-            RecentActivity(
-                id="activity_2",
-                type="report_analysis",
-                title="ESG报告分析",
-                description="环境指标表现良好，建议加强社会责任投入...",
-                timestamp=datetime.now() - timedelta(days=1),
-                status="completed",
-                icon="📊"
-            ),
-            RecentActivity(
-                id="activity_3",
-                type="compliance_check",
-                title="合规性检查",
-                description="完成GRI标准合规性检查，发现3个改进点...",
-                timestamp=datetime.now() - timedelta(days=2),
-                status="completed",
-                icon="✅"
-            ),
-            RecentActivity(
-                id="activity_4",
-                type="risk_assessment",
-                title="风险评估",
-                description="识别出2个高风险项目，已生成改进建议...",
-                timestamp=datetime.now() - timedelta(days=3),
-                status="completed",
-                icon="⚠️"
-            )
-        ]
+        logger.info("获取最近活动，限制: %s，企业ID: %s", limit, company_id)
         
         # 应用限制
-        limited_activities = activities[:limit]
+        limited_activities = b"[" + b",".join(_RECENT_ACTIVITY_ROWS_JSON[:limit]) + b"]"
         
-        return create_response(
-            data=limited_activities,
+        return create_raw_response(
+            data=fill_now(limited_activities),
             message="最近活动获取成功"
         )
         
     except Exception as e:
-        logger.error(f"获取最近活动失败: {str(e)}")
+        logger.error("获取最近活动失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"获取最近活动失败: {str(e)}"
-        )
\ No newline at end of file
+        )
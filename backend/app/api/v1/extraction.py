@@ -4,16 +4,80 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from typing import List, Optional, Dict, Any
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
 import logging
+import orjson
+import uuid
+from collections import OrderedDict
 from datetime import datetime
 
-from app.services.extraction_service import get_extraction_service, InformationExtractionService
-from app.core.response import APIResponse, create_response
-from pydantic import BaseModel, Field
+from app.core.cache import hybrid_cache
+from app.core.config import settings
+from app.services.extraction_service import ExtractionResult, get_extraction_service, InformationExtractionService
+from app.core.response import APIResponse, create_raw_response, create_response
+from pydantic import BaseModel, Field, field_validator
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/extraction", tags=["Information Extraction"])
+# 提取结果包含大量实体和长文本摘要，使用 orjson 编码响应
+router = APIRouter(prefix="/extraction", tags=["Information Extraction"], default_response_class=ORJSONResponse)
+
+# 批量任务状态保留时间（7天）
+BATCH_STATUS_TTL = 7 * 86400
+
+
+# /analyze 序列化结果的进程内缓存条数
+ANALYZE_PAYLOAD_CACHE_SIZE = 128
+# (文档ID, 用户ID) -> (提取时间, 序列化后的提取结果)，按LRU淘汰；
+# 提取时间不同说明缓存的提取结果已失效重建，序列化结果随之作废
+_analyze_payload_cache: "OrderedDict[Tuple[str, str], Tuple[datetime, bytes]]" = OrderedDict()
+
+# 流式分析时每个事件包含的实体/关键信息条数
+ANALYZE_STREAM_CHUNK_SIZE = 50
+
+# 进度推送时检查任务状态的间隔（秒）
+BATCH_STREAM_POLL_INTERVAL = 0.5
+
+
+def _batch_status_key(task_id: str) -> str:
+    """批量任务状态的缓存键（Redis可用时多个进程共享）"""
+    return f"batch_extraction:{task_id}"
+
+
+def _analyze_payload(user_id: str, extraction_result: ExtractionResult) -> bytes:
+    """
+    提取结果的JSON字节，同一次提取只序列化一次
+    
+    ExtractionResult 的字段与 ExtractionResultResponse 一一对应，orjson 可直接序列化 dataclass，
+    省去逐条构建响应模型和 response_model 校验
+    """
+    key = (extraction_result.document_id, user_id)
+    cached = _analyze_payload_cache.get(key)
+    if cached is not None and cached[0] == extraction_result.extraction_timestamp:
+        _analyze_payload_cache.move_to_end(key)
+        return cached[1]
+    
+    payload = orjson.dumps(extraction_result)
+    _analyze_payload_cache[key] = (extraction_result.extraction_timestamp, payload)
+    _analyze_payload_cache.move_to_end(key)
+    while len(_analyze_payload_cache) > ANALYZE_PAYLOAD_CACHE_SIZE:
+        _analyze_payload_cache.popitem(last=False)
+    return payload
+
+
+def _batch_progress(state: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """由任务状态生成进度信息"""
+    total_count = state["total_count"]
+    return {
+        "task_id": state["task_id"],
+        "status": state["status"],  # processing, completed, failed
+        "progress": state["processed_count"] * 100 // total_count if total_count else 100,  # 0-100
+        "processed_count": state["processed_count"],
+        "total_count": total_count,
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 # ========== 请求/响应模型 ==========
@@ -30,13 +94,19 @@ class ExtractionRequest(BaseModel):
 
 class BatchExtractionRequest(BaseModel):
     """批量信息提取请求模型"""
-    document_ids: List[str] = Field(..., description="文档ID列表", max_length=10)
+    document_ids: List[str] = Field(..., description="文档ID列表", min_length=1, max_length=10)
     user_id: str = Field(..., description="用户ID")
     extraction_types: List[str] = Field(
         ["summary", "entities", "keywords"], 
         description="提取类型列表"
     )
 
+    @field_validator("document_ids")
+    @classmethod
+    def dedupe_document_ids(cls, v: List[str]) -> List[str]:
+        """去除重复的文档ID（保持原有顺序），避免同一文档重复提取"""
+        return list(dict.fromkeys(v))
+
 
 class DocumentSummaryResponse(BaseModel):
     """文档摘要响应模型"""
@@ -83,7 +153,7 @@ class ExtractionResultResponse(BaseModel):
 
 # ========== API接口 ==========
 
-@router.post("/analyze", response_model=APIResponse[ExtractionResultResponse])
+@router.post("/analyze", responses={200: {"model": APIResponse[ExtractionResultResponse]}})
 async def analyze_document(
     request: ExtractionRequest,
     extraction_service: InformationExtractionService = Depends(get_extraction_service)
@@ -106,54 +176,75 @@ async def analyze_document(
             user_id=request.user_id
         )
         
-        # 转换为响应格式
-        response = ExtractionResultResponse(
-            document_id=extraction_result.document_id,
-            document_name=extraction_result.document_name,
-            summary=DocumentSummaryResponse(
-                title=extraction_result.summary.title,
-                brief_summary=extraction_result.summary.brief_summary,
-                detailed_summary=extraction_result.summary.detailed_summary,
-                key_points=extraction_result.summary.key_points,
-                structure_summary=extraction_result.summary.structure_summary,
-                confidence=extraction_result.summary.confidence
-            ),
-            key_information=[
-                KeyInformationResponse(
-                    content=info.content,
-                    importance=info.importance,
-                    category=info.category,
-                    keywords=info.keywords,
-                    source_section=info.source_section
-                )
-                for info in extraction_result.key_information
-            ],
-            entities=[
-                ExtractedEntityResponse(
-                    text=entity.text,
-                    type=entity.type,
-                    confidence=entity.confidence,
-                    context=entity.context,
-                    position=entity.position
-                )
-                for entity in extraction_result.entities
-            ],
-            tags=extraction_result.tags,
-            word_count=extraction_result.word_count,
-            paragraph_count=extraction_result.paragraph_count,
-            section_count=extraction_result.section_count,
-            extraction_timestamp=extraction_result.extraction_timestamp.isoformat(),
-            processing_time=extraction_result.processing_time
-        )
+        # 提取结果来自服务内部，直接拼接已序列化的字节，跳过响应模型的构建和校验
+        payload = _analyze_payload(request.user_id, extraction_result)
         
         logger.info(f"✅ Document analysis completed in {extraction_result.processing_time:.2f}s")
-        return create_response(response)
+        return create_raw_response(payload)
         
     except Exception as e:
         logger.error(f"❌ Document analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"文档分析失败: {str(e)}")
 
 
+@router.post("/analyze-stream")
+async def analyze_document_stream(
+    request: ExtractionRequest,
+    extraction_service: InformationExtractionService = Depends(get_extraction_service)
+):
+    """
+    流式分析单个文档（NDJSON）
+    
+    每行一个事件，依次推送 summary、tags、分批的 entities 和 key_information，
+    最后以 done（文档统计信息）结束；摘要就绪即可开始渲染，无需等待完整结果。
+    出错时推送 error 事件并结束。
+    """
+    logger.info(f"📊 Starting streamed document analysis: {request.document_id} (user: {request.user_id})")
+    
+    def event(name: str, data: Any) -> bytes:
+        return orjson.dumps({"event": name, "data": data}) + b"\n"
+    
+    async def analysis_events():
+        try:
+            summary = await extraction_service.extract_summary_only(request.document_id, request.user_id)
+            yield event("summary", summary)
+            
+            tags = await extraction_service.extract_tags_only(request.document_id, request.user_id)
+            yield event("tags", tags)
+            
+            extraction_result = await extraction_service.extract_information(
+                document_id=request.document_id,
+                user_id=request.user_id
+            )
+            for name, items in (
+                ("entities", extraction_result.entities),
+                ("key_information", extraction_result.key_information)
+            ):
+                for start in range(0, len(items), ANALYZE_STREAM_CHUNK_SIZE):
+                    yield event(name, items[start:start + ANALYZE_STREAM_CHUNK_SIZE])
+            
+            yield event("done", {
+                "document_id": extraction_result.document_id,
+                "document_name": extraction_result.document_name,
+                "word_count": extraction_result.word_count,
+                "paragraph_count": extraction_result.paragraph_count,
+                "section_count": extraction_result.section_count,
+                "extraction_timestamp": extraction_result.extraction_timestamp,
+                "processing_time": extraction_result.processing_time
+            })
+            logger.info(f"✅ Streamed document analysis completed: {request.document_id}")
+            
+        except Exception as e:
+            logger.error(f"❌ Streamed document analysis failed: {e}")
+            yield event("error", f"文档分析失败: {str(e)}")
+    
+    return StreamingResponse(
+        analysis_events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/summary/{document_id}", response_model=APIResponse[DocumentSummaryResponse])
 async def get_document_summary(
     document_id: str,
@@ -168,23 +259,16 @@ async def get_document_summary(
     try:
         logger.info(f"📝 Generating summary for document: {document_id}")
         
-        # 执行信息提取（仅摘要部分）
-        extraction_result = await extraction_service.extract_information(
+        # 仅执行摘要提取
+        summary = await extraction_service.extract_summary_only(
             document_id=document_id,
             user_id=user_id
         )
         
         # 返回摘要信息
-        summary_response = DocumentSummaryResponse(
-            title=extraction_result.summary.title,
-            brief_summary=extraction_result.summary.brief_summary,
-            detailed_summary=extraction_result.summary.detailed_summary,
-            key_points=extraction_result.summary.key_points,
-            structure_summary=extraction_result.summary.structure_summary,
-            confidence=extraction_result.summary.confidence
-        )
+        summary_response = DocumentSummaryResponse.model_construct(**vars(summary))
         
-        logger.info(f"✅ Summary generated (confidence: {extraction_result.summary.confidence:.2%})")
+        logger.info(f"✅ Summary generated (confidence: {summary.confidence:.2%})")
         return create_response(summary_response)
         
     except Exception as e:
@@ -208,32 +292,16 @@ async def get_document_entities(
     try:
         logger.info(f"🏷️ Extracting entities for document: {document_id}")
         
-        # 执行信息提取
-        extraction_result = await extraction_service.extract_information(
+        # 在服务层完成过滤
+        entities = await extraction_service.query_entities(
             document_id=document_id,
-            user_id=user_id
+            user_id=user_id,
+            entity_type=entity_type,
+            min_confidence=min_confidence
         )
         
-        # 过滤实体
-        entities = extraction_result.entities
-        
-        if entity_type:
-            entities = [e for e in entities if e.type == entity_type]
-        
-        if min_confidence > 0:
-            entities = [e for e in entities if e.confidence >= min_confidence]
-        
         # 转换为响应格式
-        entity_responses = [
-            ExtractedEntityResponse(
-                text=entity.text,
-                type=entity.type,
-                confidence=entity.confidence,
-                context=entity.context,
-                position=entity.position
-            )
-            for entity in entities
-        ]
+        entity_responses = [ExtractedEntityResponse.model_construct(**vars(entity)) for entity in entities]
         
         logger.info(f"✅ Extracted {len(entity_responses)} entities")
         return create_response(entity_responses)
@@ -260,35 +328,17 @@ async def get_key_information(
     try:
         logger.info(f"🔑 Extracting key information for document: {document_id}")
         
-        # 执行信息提取
-        extraction_result = await extraction_service.extract_information(
+        # 在服务层完成过滤和数量限制
+        key_info = await extraction_service.query_key_information(
             document_id=document_id,
-            user_id=user_id
+            user_id=user_id,
+            category=category,
+            min_importance=min_importance,
+            limit=limit
         )
         
-        # 过滤关键信息
-        key_info = extraction_result.key_information
-        
-        if category:
-            key_info = [info for info in key_info if info.category == category]
-        
-        if min_importance > 0:
-            key_info = [info for info in key_info if info.importance >= min_importance]
-        
-        # 限制数量
-        key_info = key_info[:limit]
-        
         # 转换为响应格式
-        key_info_responses = [
-            KeyInformationResponse(
-                content=info.content,
-                importance=info.importance,
-                category=info.category,
-                keywords=info.keywords,
-                source_section=info.source_section
-            )
-            for info in key_info
-        ]
+        key_info_responses = [KeyInformationResponse.model_construct(**vars(info)) for info in key_info]
         
         logger.info(f"✅ Extracted {len(key_info_responses)} key information points")
         return create_response(key_info_responses)
@@ -312,20 +362,20 @@ async def get_document_tags(
     try:
         logger.info(f"🏷️ Generating tags for document: {document_id}")
         
-        # 执行信息提取
-        extraction_result = await extraction_service.extract_information(
+        # 仅执行标签生成
+        tags = await extraction_service.extract_tags_only(
             document_id=document_id,
             user_id=user_id
         )
         
         result = {
             "document_id": document_id,
-            "tags": extraction_result.tags,
-            "tag_count": len(extraction_result.tags),
+            "tags": tags,
+            "tag_count": len(tags),
             "timestamp": datetime.now().isoformat()
         }
         
-        logger.info(f"✅ Generated {len(extraction_result.tags)} tags")
+        logger.info(f"✅ Generated {len(tags)} tags")
         return create_response(result)
         
     except Exception as e:
@@ -348,7 +398,20 @@ async def batch_analyze_documents(
         logger.info(f"📊 Starting batch analysis for {len(request.document_ids)} documents")
         
         # 创建批处理任务
-        task_id = f"batch_{datetime.now().timestamp()}"
+        task_id = f"batch_{uuid.uuid4().hex}"
+        
+        # 先写入初始状态，任务启动前查询状态也能得到结果
+        await hybrid_cache.set(
+            _batch_status_key(task_id),
+            {
+                "task_id": task_id,
+                "status": "processing",
+                "processed_count": 0,
+                "total_count": len(request.document_ids),
+                "results": []
+            },
+            BATCH_STATUS_TTL
+        )
         
         # 添加后台任务
         background_tasks.add_task(
@@ -384,32 +447,56 @@ async def get_batch_status(task_id: str):
     查询批量分析任务的执行状态和进度。
     """
     try:
-        # 这里应该从数据库或缓存中查询任务状态
-        # 暂时返回示例状态
-        result = {
-            "task_id": task_id,
-            "status": "completed",  # processing, completed, failed
-            "progress": 100,  # 0-100
-            "processed_count": 5,
-            "total_count": 5,
-            "results": [
-                {
-                    "document_id": f"doc_{i}",
-                    "status": "success",
-                    "extraction_time": 2.5
-                }
-                for i in range(1, 6)
-            ],
-            "timestamp": datetime.now().isoformat()
-        }
+        state = await hybrid_cache.get(_batch_status_key(task_id))
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"任务不存在或已过期: {task_id}")
         
-        return create_response(result)
+        return create_response(_batch_progress(state, state["results"]))
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Batch status query failed: {e}")
         raise HTTPException(status_code=500, detail=f"任务状态查询失败: {str(e)}")
 
 
+@router.get("/batch-stream/{task_id}")
+async def stream_batch_status(task_id: str):
+    """
+    订阅批量任务进度（Server-Sent Events）
+    
+    每处理完一个文档推送一次进度事件（只包含新完成的结果），任务结束后关闭连接，
+    客户端无需轮询 /batch-status。
+    """
+    status_key = _batch_status_key(task_id)
+    if await hybrid_cache.get(status_key) is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在或已过期: {task_id}")
+    
+    async def progress_events():
+        sent_results = 0
+        last_processed = None
+        while True:
+            state = await hybrid_cache.get(status_key)
+            if state is None:
+                break
+            
+            if state["processed_count"] != last_processed or state["status"] != "processing":
+                last_processed = state["processed_count"]
+                results = state["results"][sent_results:]
+                sent_results += len(results)
+                yield b"data: " + orjson.dumps(_batch_progress(state, results)) + b"\n\n"
+            
+            if state["status"] != "processing":
+                break
+            await asyncio.sleep(BATCH_STREAM_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        progress_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/statistics/{user_id}")
 async def get_extraction_statistics(
     user_id: str,
@@ -477,37 +564,76 @@ async def _process_batch_extraction(
     extraction_types: List[str],
     extraction_service: InformationExtractionService
 ):
-    """处理批量提取任务"""
+    """
+    处理批量提取任务，最多 BATCH_EXTRACTION_CONCURRENCY 个文档并发提取，每完成一个文档更新任务状态
+    
+    状态写入合并进行：写入尚未完成时又有文档完成，只在当前写入结束后再写一次最新状态，
+    而不是每个文档各写一次
+    """
+    status_key = _batch_status_key(task_id)
+    state = {
+        "task_id": task_id,
+        "status": "processing",
+        "processed_count": 0,
+        "total_count": len(document_ids),
+        "results": []
+    }
+    
     try:
         logger.info(f"🔄 Processing batch extraction task: {task_id}")
         
-        results = []
-        for i, doc_id in enumerate(document_ids):
+        semaphore = asyncio.Semaphore(settings.BATCH_EXTRACTION_CONCURRENCY)
+        flushing = False
+        dirty = False
+        
+        async def flush_state() -> None:
+            nonlocal flushing, dirty
+            dirty = True
+            if flushing:
+                return  # 正在写入的协程结束后会再写一次最新状态
+            flushing = True
             try:
-                # 执行单个文档提取
-                extraction_result = await extraction_service.extract_information(
-                    document_id=doc_id,
-                    user_id=user_id
-                )
-                
-                results.append({
-                    "document_id": doc_id,
-                    "status": "success",
-                    "extraction_time": extraction_result.processing_time
-                })
-                
-                logger.info(f"✅ Batch progress: {i+1}/{len(document_ids)} completed")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to process document {doc_id}: {e}")
-                results.append({
-                    "document_id": doc_id,
-                    "status": "failed",
-                    "error": str(e)
-                })
-        
-        # 这里应该将结果保存到数据库或缓存
+                while dirty:
+                    dirty = False
+                    await hybrid_cache.set(status_key, state, BATCH_STATUS_TTL)
+            finally:
+                flushing = False
+        
+        async def process_document(doc_id: str) -> None:
+            async with semaphore:
+                try:
+                    # 执行单个文档提取
+                    extraction_result = await extraction_service.extract_information(
+                        document_id=doc_id,
+                        user_id=user_id
+                    )
+                    result = {
+                        "document_id": doc_id,
+                        "status": "success",
+                        "extraction_time": extraction_result.processing_time
+                    }
+                    
+                except Exception as e:
+                    logger.error(f"❌ Failed to process document {doc_id}: {e}")
+                    result = {
+                        "document_id": doc_id,
+                        "status": "failed",
+                        "error": str(e)
+                    }
+            
+            # 状态只由本任务写入，结果按完成顺序追加
+            state["results"].append(result)
+            state["processed_count"] += 1
+            await flush_state()
+            logger.info(f"✅ Batch progress: {state['processed_count']}/{len(document_ids)} completed")
+        
+        await asyncio.gather(*(process_document(doc_id) for doc_id in document_ids))
+        
+        state["status"] = "completed"
+        await hybrid_cache.set(status_key, state, BATCH_STATUS_TTL)
         logger.info(f"✅ Batch extraction task completed: {task_id}")
         
     except Exception as e:
-        logger.error(f"❌ Batch extraction task failed: {task_id}, error: {e}") 
+        logger.error(f"❌ Batch extraction task failed: {task_id}, error: {e}")
+        state["status"] = "failed"
+        await hybrid_cache.set(status_key, state, BATCH_STATUS_TTL)
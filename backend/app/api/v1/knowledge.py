@@ -5,6 +5,7 @@
 Now uses KnowledgeServiceV2 with proper database sessions.
 """
 
+import re
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import JSONResponse
@@ -276,9 +277,10 @@ async def search_documents(
     limit: int = Query(20, ge=1, le=100, description="返回数量限制"),
     offset: int = Query(0, ge=0, description="偏移量"),
     current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
     service = Depends(get_knowledge_service_v2)
 ):
-    """搜索文档"""
+    """搜索文档（sort_by 仅支持有索引的字段：created_at）"""
     try:
         # 构建搜索过滤条件
         filters = {
@@ -294,7 +296,7 @@ async def search_documents(
         # 移除空值
         filters = {k: v for k, v in filters.items() if v is not None}
         
-        documents = await service.search_documents(current_user["id"], q, filters)
+        documents = await service.search_documents(db, current_user["user_id"], q, filters)
         
         return {
             "query": q,
@@ -324,14 +326,17 @@ async def get_supported_document_types(
 async def batch_delete_documents(
     document_ids: List[str],
     current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
     service = Depends(get_knowledge_service_v2)
 ):
     """批量删除文档"""
     try:
         results = []
+        # 逐个删除：各文档共用同一个同步数据库会话，删除过程中的文件/数据库操作都是阻塞调用，
+        # 并发执行既不会重叠等待时间，还会让一个文档的回滚影响到其它文档
         for document_id in document_ids:
             try:
-                success = await service.delete_document(document_id, current_user["id"])
+                success = await service.delete_document(db, document_id, current_user["user_id"])
                 results.append({
                     "document_id": document_id,
                     "success": success,
@@ -400,6 +405,43 @@ async def get_knowledge_stats(
 
 # ========== 智能分类建议API ==========
 
+# 分类建议规则，同一来源按顺序取第一条命中的规则；
+# 每条规则的关键词在导入时编译为一个正则，匹配时一次扫描完成
+_FILENAME_CATEGORY_RULES = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), {"category": category, "confidence": confidence, "reason": reason})
+    for keywords, category, confidence, reason in (
+        (("esg", "环境", "可持续"), "ESG报告", 0.8, "文件名包含ESG相关关键词"),
+        (("financial", "财务", "finance"), "财务报告", 0.7, "文件名包含财务相关关键词"),
+        (("policy", "政策", "制度"), "政策文件", 0.6, "文件名包含政策相关关键词"),
+    )
+)
+_CONTENT_CATEGORY_RULES = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), {"category": category, "confidence": confidence, "reason": reason})
+    for keywords, category, confidence, reason in (
+        (("碳排放", "绿色", "环保", "sustainability"), "环境保护", 0.9, "内容包含环保相关关键词"),
+        (("投资", "收益", "profit", "revenue"), "投资分析", 0.8, "内容包含投资相关关键词"),
+    )
+)
+_DEFAULT_CATEGORY_SUGGESTION = {"category": "通用文档", "confidence": 0.5, "reason": "未找到特定分类特征"}
+
+
+def _suggest_categories(filename: str, preview: Optional[str]) -> List[Dict[str, Any]]:
+    """基于文件名和内容预览的关键词匹配给出分类建议（后续可以集成更复杂的AI分类）"""
+    sources = [(_FILENAME_CATEGORY_RULES, filename.lower())]
+    # 基于内容的建议（简化版）
+    if preview and len(preview) > 100:
+        sources.append((_CONTENT_CATEGORY_RULES, preview.lower()))
+
+    suggestions = []
+    for rules, text in sources:
+        suggestion = next((suggestion for pattern, suggestion in rules if pattern.search(text)), None)
+        if suggestion is not None:
+            suggestions.append(dict(suggestion))
+
+    # 如果没有匹配的建议，返回通用分类
+    return suggestions or [dict(_DEFAULT_CATEGORY_SUGGESTION)]
+
+
 @router.post("/documents/{document_id}/suggest-category")
 async def suggest_document_category(
     document_id: str,
@@ -419,29 +461,7 @@ async def suggest_document_category(
         # 获取文档预览内容
         preview = await service.get_document_preview(document_id, 1000)
         
-        # 简单的关键词匹配逻辑（后续可以集成更复杂的AI分类）
-        suggestions = []
-        
-        # 基于文件名的建议
-        filename_lower = document.filename.lower()
-        if any(keyword in filename_lower for keyword in ["esg", "环境", "可持续"]):
-            suggestions.append({"category": "ESG报告", "confidence": 0.8, "reason": "文件名包含ESG相关关键词"})
-        elif any(keyword in filename_lower for keyword in ["financial", "财务", "finance"]):
-            suggestions.append({"category": "财务报告", "confidence": 0.7, "reason": "文件名包含财务相关关键词"})
-        elif any(keyword in filename_lower for keyword in ["policy", "政策", "制度"]):
-            suggestions.append({"category": "政策文件", "confidence": 0.6, "reason": "文件名包含政策相关关键词"})
-        
-        # 基于内容的建议（简化版）
-        if preview and len(preview) > 100:
-            content_lower = preview.lower()
-            if any(keyword in content_lower for keyword in ["碳排放", "绿色", "环保", "sustainability"]):
-                suggestions.append({"category": "环境保护", "confidence": 0.9, "reason": "内容包含环保相关关键词"})
-            elif any(keyword in content_lower for keyword in ["投资", "收益", "profit", "revenue"]):
-                suggestions.append({"category": "投资分析", "confidence": 0.8, "reason": "内容包含投资相关关键词"})
-        
-        # 如果没有匹配的建议，返回通用分类
-        if not suggestions:
-            suggestions.append({"category": "通用文档", "confidence": 0.5, "reason": "未找到特定分类特征"})
+        suggestions = _suggest_categories(document.filename, preview)
         
         return {
             "document_id": document_id,
@@ -4,7 +4,9 @@ RAG API - 基于文档内容的智能问答接口
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional, Dict, Any
+from fastapi.responses import ORJSONResponse
+from typing import List, Mapping, Optional, Dict, Any, Tuple
+from types import MappingProxyType
 import logging
 from datetime import datetime
 
@@ -13,7 +15,69 @@ from app.core.response import APIResponse, create_response
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/rag", tags=["RAG"])
+# 答案携带多个来源片段（长文本+相似度分数），使用 orjson 编码响应
+router = APIRouter(prefix="/rag", tags=["RAG"], default_response_class=ORJSONResponse)
+
+
+# ========== 问题建议 ==========
+
+# 每次最多返回的建议数量
+MAX_QUESTION_SUGGESTIONS = 8
+
+
+def _suggestion_list(*suggestions: str) -> Tuple[Tuple[str, ...], int]:
+    """(截取后的建议, 建议总数)，在导入时一次性计算"""
+    return suggestions[:MAX_QUESTION_SUGGESTIONS], len(suggestions)
+
+
+# 针对特定文档的问题建议
+_DOCUMENT_SUGGESTIONS = _suggestion_list(
+    "这份文档的核心内容是什么？",
+    "文档中提到的关键信息有哪些？",
+    "文档涉及的主要流程或步骤是什么？",
+    "文档中的重要数据或指标是什么？",
+    "文档的结论或建议是什么？",
+    "文档适用的范围或对象是什么？",
+    "文档中提到的注意事项有哪些？"
+)
+
+# 针对特定类型文档的问题建议
+_TYPE_SUGGESTIONS: Mapping[str, Tuple[Tuple[str, ...], int]] = MappingProxyType({
+    "pdf": _suggestion_list(
+        "这份PDF文档的主要内容是什么？",
+        "文档中的关键政策或规定有哪些？",
+        "文档提到的重要流程是什么？"
+    ),
+    "docx": _suggestion_list(
+        "这份Word文档讲述了什么？",
+        "文档中的主要观点是什么？",
+        "文档的结构和章节安排如何？"
+    ),
+    "xlsx": _suggestion_list(
+        "这份表格数据反映了什么？",
+        "数据中的关键指标有哪些？",
+        "数据趋势如何？"
+    )
+})
+_DEFAULT_TYPE_SUGGESTIONS = _suggestion_list(
+    "这类文档通常包含什么信息？",
+    "文档的主要内容是什么？",
+    "有哪些关键信息需要关注？"
+)
+
+# 通用问题建议
+_GENERIC_SUGGESTIONS = _suggestion_list(
+    "我们公司的ESG政策是什么？",
+    "环境保护措施有哪些？",
+    "公司治理结构是怎样的？",
+    "社会责任项目有哪些？",
+    "可持续发展目标是什么？",
+    "合规管理制度如何运作？",
+    "风险管理机制是什么？",
+    "员工培训和发展计划如何？",
+    "公司的核心价值观是什么？",
+    "业务流程和操作规范有哪些？"
+)
 
 
 # ========== 请求/响应模型 ==========
@@ -77,7 +141,7 @@ async def ask_question(
         
         # 转换为响应格式
         response = RAGAnswerResponse(
-            question=rag_answer.question,
+            question=request.question,  # 缓存命中时答案可能来自书写格式不同的同一问题
             answer=rag_answer.answer,
             confidence=rag_answer.confidence,
             reasoning=rag_answer.reasoning,
@@ -116,7 +180,7 @@ async def ask_document_question(
         
         # 转换为响应格式
         response = RAGAnswerResponse(
-            question=rag_answer.question,
+            question=request.question,  # 缓存命中时答案可能来自书写格式不同的同一问题
             answer=rag_answer.answer,
             confidence=rag_answer.confidence,
             reasoning=rag_answer.reasoning,
@@ -219,67 +283,24 @@ async def get_question_suggestions(
     帮助用户更好地探索和理解文档内容。
     """
     try:
-        # 根据不同场景生成问题建议
+        # 根据不同场景选择问题建议
         if document_id:
-            # 针对特定文档的问题建议
-            suggestions = [
-                "这份文档的核心内容是什么？",
-                "文档中提到的关键信息有哪些？",
-                "文档涉及的主要流程或步骤是什么？",
-                "文档中的重要数据或指标是什么？",
-                "文档的结论或建议是什么？",
-                "文档适用的范围或对象是什么？",
-                "文档中提到的注意事项有哪些？"
-            ]
+            suggestions, total_suggestions = _DOCUMENT_SUGGESTIONS
         elif document_type:
-            # 针对特定类型文档的问题建议
-            type_specific_suggestions = {
-                "pdf": [
-                    "这份PDF文档的主要内容是什么？",
-                    "文档中的关键政策或规定有哪些？",
-                    "文档提到的重要流程是什么？"
-                ],
-                "docx": [
-                    "这份Word文档讲述了什么？",
-                    "文档中的主要观点是什么？",
-                    "文档的结构和章节安排如何？"
-                ],
-                "xlsx": [
-                    "这份表格数据反映了什么？",
-                    "数据中的关键指标有哪些？",
-                    "数据趋势如何？"
-                ]
-            }
-            suggestions = type_specific_suggestions.get(document_type.lower(), [
-                "这类文档通常包含什么信息？",
-                "文档的主要内容是什么？",
-                "有哪些关键信息需要关注？"
-            ])
+            suggestions, total_suggestions = _TYPE_SUGGESTIONS.get(document_type.lower(), _DEFAULT_TYPE_SUGGESTIONS)
         else:
-            # 通用问题建议
-            suggestions = [
-                "我们公司的ESG政策是什么？",
-                "环境保护措施有哪些？",
-                "公司治理结构是怎样的？",
-                "社会责任项目有哪些？",
-                "可持续发展目标是什么？",
-                "合规管理制度如何运作？",
-                "风险管理机制是什么？",
-                "员工培训和发展计划如何？",
-                "公司的核心价值观是什么？",
-                "业务流程和操作规范有哪些？"
-            ]
+            suggestions, total_suggestions = _GENERIC_SUGGESTIONS
         
         result = {
             "user_id": user_id,
             "document_id": document_id,
             "document_type": document_type,
-            "suggestions": suggestions[:8],  # 限制返回8个建议
-            "total_suggestions": len(suggestions),
+            "suggestions": suggestions,
+            "total_suggestions": total_suggestions,
             "timestamp": datetime.now().isoformat()
         }
         
-        logger.info(f"✅ Generated {len(suggestions)} question suggestions")
+        logger.info(f"✅ Generated {total_suggestions} question suggestions")
         return create_response(result)
         
     except Exception as e:
@@ -301,13 +322,14 @@ async def get_conversation_history(
     try:
         # 这里应该从数据库查询历史记录
         # 暂时返回示例数据
+        now = datetime.now().isoformat()
         history = [
             {
                 "id": f"qa_{i}",
                 "question": f"示例问题 {i}",
                 "answer": f"示例答案 {i}",
                 "confidence": 0.8,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now,
                 "sources_count": 3
             }
             for i in range(offset + 1, offset + limit + 1)
@@ -319,7 +341,7 @@ async def get_conversation_history(
             "total": len(history),
             "limit": limit,
             "offset": offset,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
         logger.info(f"✅ Retrieved {len(history)} conversation records")
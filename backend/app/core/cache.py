@@ -8,6 +8,7 @@ import time
 import logging
 import hashlib
 import asyncio
+import inspect
 import pickle
 from typing import Any, Dict, Optional, TypeVar, Generic, Callable, Union
 from datetime import datetime, timedelta
@@ -122,10 +123,10 @@ class BaseCache(Generic[T], ABC):
         logger.debug(f"Cache miss: {key}")
         start_time = time.time()
         
-        if asyncio.iscoroutinefunction(factory):
-            result = await factory()
-        else:
-            result = factory()
+        result = factory()
+        # 工厂可能是返回协程的普通函数（如 cached 装饰器中的lambda），需要等待其结果
+        if inspect.isawaitable(result):
+            result = await result
             
         execution_time = time.time() - start_time
         
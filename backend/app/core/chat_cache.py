@@ -0,0 +1,185 @@
+"""
+聊天语义缓存 - 知识库增强回答的近似重复问题缓存
+
+- 按用户分区，不同用户之间不会互相命中，避免跨租户泄露私有知识库内容
+- 问题向量做L2归一化后以内积（余弦相似度）匹配，超过阈值且未过期即复用之前生成的回答
+- 缓存中的向量按条目量化为int8（附带float32缩放系数），内存约为float32的1/4
+- 每个分区按LRU淘汰，条目数有上限；分区数量同样按LRU淘汰
+- 用户的知识库文档变更时整体失效该用户的分区
+"""
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+# 缓存条目有效期（5分钟）
+CHAT_CACHE_TTL = 300
+# 问题之间的余弦相似度阈值
+CHAT_SIMILARITY_THRESHOLD = 0.85
+# 每个用户分区保留的条目上限
+CHAT_CACHE_MAX_ENTRIES = 1000
+# 用户分区数量上限
+CHAT_CACHE_MAX_PARTITIONS = 1000
+
+
+@dataclass
+class ChatCacheProbe:
+    """一次缓存查询的上下文，未命中时交给 store() 复用已计算的向量"""
+    user_id: str
+    vector: Optional[np.ndarray] = None
+    response: Optional[Dict[str, Any]] = None
+
+
+def quantize(vector: np.ndarray) -> Tuple[np.ndarray, np.float32]:
+    """对称量化为int8，返回 (量化向量, 缩放系数)，vector ≈ q * scale"""
+    peak = float(np.abs(vector).max())
+    scale = np.float32(peak / 127 if peak else 1.0)
+    return np.round(vector / scale).astype(np.int8), scale
+
+
+class _UserPartition:
+    """单个用户的缓存分区：条目按LRU顺序保存，相似度矩阵在变更后按需重建"""
+
+    def __init__(self):
+        # 条目ID -> (int8向量, 缩放系数, 回答, 写入时间)
+        self.entries: "OrderedDict[int, Tuple[np.ndarray, np.float32, Dict[str, Any], float]]" = OrderedDict()
+        self.next_id = 0
+        self._ids: Tuple[int, ...] = ()
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+    def matrix(self, ttl: float) -> Tuple[Tuple[int, ...], Optional[np.ndarray], Optional[np.ndarray]]:
+        """返回 (条目ID, 向量矩阵, 缩放系数)，先清理已过期的条目"""
+        deadline = time.monotonic() - ttl
+        expired = [entry_id for entry_id, entry in self.entries.items() if entry[3] < deadline]
+        if expired:
+            for entry_id in expired:
+                del self.entries[entry_id]
+            self.invalidate()
+        if not self.entries:
+            return (), None, None
+        if self._matrix is None:
+            self._ids = tuple(self.entries)
+            self._matrix = np.stack([vec for vec, _, _, _ in self.entries.values()])
+            self._scales = np.array([scale for _, scale, _, _ in self.entries.values()], dtype=np.float32)
+        return self._ids, self._matrix, self._scales
+
+    def invalidate(self) -> None:
+        self._matrix = None
+
+
+class ChatSemanticCache:
+    """
+    聊天回答语义缓存
+
+    依赖嵌入模型（与知识库使用同一套配置）；
+    嵌入模型不可用时自动关闭，不影响正常问答。
+    """
+
+    def __init__(self, ttl: int = CHAT_CACHE_TTL,
+                 similarity_threshold: float = CHAT_SIMILARITY_THRESHOLD,
+                 max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+                 max_partitions: int = CHAT_CACHE_MAX_PARTITIONS):
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_partitions = max_partitions
+        self.stats = CacheStats()
+        self._embedding_model = None
+        self._enabled = True
+        # 用户ID -> 分区，按LRU顺序保存
+        self._partitions: "OrderedDict[str, _UserPartition]" = OrderedDict()
+
+    def _get_embedding_model(self):
+        """延迟初始化嵌入模型，失败时关闭缓存"""
+        if self._embedding_model is None and self._enabled:
+            try:
+                from app.core.llm_factory import llm_factory
+                self._embedding_model = llm_factory.create_embedding_model()
+            except Exception as e:
+                logger.warning(f"⚠️ Chat semantic cache disabled: {e}")
+                self._enabled = False
+        return self._embedding_model
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """将问题向量化并归一化"""
+        model = self._get_embedding_model()
+        if model is None:
+            return None
+        try:
+            vector = await asyncio.to_thread(model.embed_query, text)
+        except Exception as e:
+            logger.warning(f"Chat semantic cache embedding failed: {e}")
+            return None
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+
+    async def lookup(self, user_id: str, question: str) -> ChatCacheProbe:
+        """
+        在该用户的分区中查找相似问题的回答
+
+        Returns:
+            查询上下文；命中时 response 为回答的副本
+        """
+        probe = ChatCacheProbe(user_id=str(user_id))
+        probe.vector = await self._embed(question)
+        partition = self._partitions.get(probe.user_id)
+        if probe.vector is None or partition is None:
+            self.stats.record_miss()
+            return probe
+
+        self._partitions.move_to_end(probe.user_id)
+        ids, matrix, scales = partition.matrix(self.ttl)
+        if matrix is not None:
+            # int8 x int8 -> int32 内积，再乘回两侧缩放系数
+            query, query_scale = quantize(probe.vector)
+            scores = np.matmul(matrix, query, dtype=np.int32) * (scales * query_scale)
+            best = int(np.argmax(scores))
+            entry_id = ids[best]
+            if scores[best] >= self.similarity_threshold:
+                partition.entries.move_to_end(entry_id)
+                self.stats.record_hit()
+                probe.response = copy.deepcopy(partition.entries[entry_id][2])
+                return probe
+
+        self.stats.record_miss()
+        return probe
+
+    def store(self, probe: ChatCacheProbe, response: Dict[str, Any]) -> None:
+        """写入缓存，复用 lookup() 阶段已计算的向量"""
+        if probe.vector is None:
+            return
+        partition = self._partitions.get(probe.user_id)
+        if partition is None:
+            partition = self._partitions[probe.user_id] = _UserPartition()
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+        self._partitions.move_to_end(probe.user_id)
+        vector, scale = quantize(probe.vector)
+        partition.entries[partition.next_id] = (vector, scale, copy.deepcopy(response), time.monotonic())
+        partition.next_id += 1
+        while len(partition.entries) > self.max_entries:
+            partition.entries.popitem(last=False)
+        partition.invalidate()
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """丢弃该用户的全部缓存回答（知识库文档上传或删除后调用）"""
+        self._partitions.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        """清空所有分区"""
+        self._partitions.clear()
+
+
+# 单例聊天语义缓存
+chat_cache = ChatSemanticCache()
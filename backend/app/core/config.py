@@ -95,6 +95,12 @@ class Settings(BaseSettings):
     DEEPSEEK_API_KEY: Optional[SecretStr] = None
     DEEPSEEK_BASE_URL: str = "https://api.deepseek.com"
     DEEPSEEK_MODEL: str = "deepseek-reasoner"
+    # 同时进行的LLM调用上限（报告微批次计为一次调用）
+    LLM_MAX_CONCURRENCY: int = 8
+    # 批量信息提取时同时处理的文档数
+    BATCH_EXTRACTION_CONCURRENCY: int = 5
+    # ESG评估进程池的工作进程数（默认占用一半CPU核心）
+    ASSESSMENT_POOL_SIZE: int = max(1, (os.cpu_count() or 1) // 2)
     
     # --- Embedding Settings (DashScope / Qwen3, OpenAI-compatible API) ---
     # All values configurable via env vars. API key MUST be set in env; never hardcode.
@@ -0,0 +1,236 @@
+"""
+ESG报告缓存模块 - LLM报告生成结果的两级缓存
+
+- 精确缓存：标准 + 规范化企业画像 + 评估结果 → SHA-256 键，存入 Redis（不可用时使用有界的进程内LRU）
+- 语义缓存：对规范化画像做向量化，进程内余弦相似度匹配，超过阈值即复用已生成的报告。
+  候选仅限同一报告标准、同一企业、同一评估结果，避免把一家企业的报告返回给另一家企业
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from app.core.cache import CacheStats, hybrid_cache
+
+logger = logging.getLogger(__name__)
+
+# 精确缓存过期时间（24小时）
+REPORT_CACHE_TTL = 24 * 60 * 60
+# 语义命中的余弦相似度阈值
+SEMANTIC_SIMILARITY_THRESHOLD = 0.95
+# 每个语义分区保留的条目上限
+SEMANTIC_MAX_ENTRIES = 64
+# 语义分区数量上限（按LRU淘汰）
+SEMANTIC_MAX_BUCKETS = 256
+# Redis不可用时，进程内精确缓存的条目上限
+LOCAL_MAX_ENTRIES = 256
+
+# 语义分区键：(报告标准, 企业标识, 评估结果哈希)
+SemanticBucket = Tuple[str, str, str]
+
+# 规范化序列化选项：键排序保证同一内容得到同一字节串
+_CANONICAL_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+def _canonical_bytes(value: Any) -> bytes:
+    return orjson.dumps(value, option=_CANONICAL_OPTIONS, default=str)
+
+
+def canonicalize(value: Any) -> str:
+    """生成稳定的JSON表示（键排序），用于缓存键和向量化"""
+    return _canonical_bytes(value).decode("utf-8")
+
+
+def _sha256(value: Any) -> str:
+    return hashlib.sha256(_canonical_bytes(value)).hexdigest()
+
+
+def build_report_key(standard: str, company_profile: Dict[str, Any],
+                     assessment_results: Dict[str, Any]) -> str:
+    """构建报告精确缓存键"""
+    return "esg_report:" + _sha256({
+        "standard": standard,
+        "company_profile": company_profile,
+        "assessment_results": assessment_results,
+    })
+
+
+def build_semantic_bucket(standard: str, company_profile: Dict[str, Any],
+                          assessment_results: Dict[str, Any]) -> SemanticBucket:
+    """构建语义分区键：只有同一标准、同一企业、同一评估结果的报告才能互相复用"""
+    company = str(company_profile.get("company_id") or company_profile.get("company_name") or "")
+    return standard, company, _sha256(assessment_results)
+
+
+@dataclass
+class ReportCacheProbe:
+    """一次缓存查询的上下文，未命中时交给 store() 复用已计算的键和向量"""
+    key: str
+    bucket: SemanticBucket
+    company_profile: Dict[str, Any]
+    vector: Optional[np.ndarray] = None
+    content: Optional[Dict[str, Any]] = None
+
+
+class ReportCache:
+    """
+    报告两级缓存
+
+    语义层依赖嵌入模型（与向量库使用同一套配置）；
+    嵌入模型不可用时自动降级为仅精确缓存。
+    """
+
+    def __init__(self, ttl: int = REPORT_CACHE_TTL,
+                 similarity_threshold: float = SEMANTIC_SIMILARITY_THRESHOLD,
+                 max_entries: int = SEMANTIC_MAX_ENTRIES,
+                 max_buckets: int = SEMANTIC_MAX_BUCKETS,
+                 local_max_entries: int = LOCAL_MAX_ENTRIES):
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.max_buckets = max_buckets
+        self.local_max_entries = local_max_entries
+        self.stats = CacheStats()
+        self._redis = hybrid_cache.redis_cache
+        # Redis不可用时的有界精确缓存：key -> (过期时间, 报告内容)
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._embedding_model = None
+        self._semantic_enabled = True
+        # 语义分区（LRU）：bucket -> [(过期时间, 向量, 报告内容)]，条目按写入顺序排列
+        self._semantic_index: "OrderedDict[SemanticBucket, Deque[Tuple[float, np.ndarray, Dict[str, Any]]]]" = OrderedDict()
+
+    def _get_embedding_model(self):
+        """延迟初始化嵌入模型，失败时关闭语义层"""
+        if self._embedding_model is None and self._semantic_enabled:
+            try:
+                from app.core.llm_factory import llm_factory
+                self._embedding_model = llm_factory.create_embedding_model()
+            except Exception as e:
+                logger.warning(f"⚠️ Report semantic cache disabled: {e}")
+                self._semantic_enabled = False
+        return self._embedding_model
+
+    async def _embed_profile(self, company_profile: Dict[str, Any]) -> Optional[np.ndarray]:
+        """将规范化画像向量化并归一化"""
+        model = self._get_embedding_model()
+        if model is None:
+            return None
+        try:
+            vector = await asyncio.to_thread(model.embed_query, canonicalize(company_profile))
+        except Exception as e:
+            logger.warning(f"Report semantic cache embedding failed: {e}")
+            return None
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+
+    async def _get_exact(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._redis.is_available:
+            return await self._redis.get(key)
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, content = entry
+        if time.monotonic() > expires_at:
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return content
+
+    async def _set_exact(self, key: str, content: Dict[str, Any]) -> None:
+        if self._redis.is_available:
+            await self._redis.set(key, content, self.ttl)
+            return
+        self._local[key] = (time.monotonic() + self.ttl, content)
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+    def _live_entries(self, bucket: SemanticBucket) -> Optional[Deque[Tuple[float, np.ndarray, Dict[str, Any]]]]:
+        """返回分区内未过期的条目，顺带清理过期条目和空分区"""
+        entries = self._semantic_index.get(bucket)
+        if entries is None:
+            return None
+        # 条目按写入顺序排列且TTL相同，过期条目总在队首
+        now = time.monotonic()
+        while entries and entries[0][0] <= now:
+            entries.popleft()
+        if not entries:
+            del self._semantic_index[bucket]
+            return None
+        self._semantic_index.move_to_end(bucket)
+        return entries
+
+    def _semantic_lookup(self, bucket: SemanticBucket, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """在同一分区内查找最相似的已缓存报告"""
+        entries = self._live_entries(bucket)
+        if not entries:
+            return None
+        matrix = np.stack([vec for _, vec, _ in entries])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return entries[best][2]
+        return None
+
+    async def lookup(self, standard: str, company_profile: Dict[str, Any],
+                     assessment_results: Dict[str, Any]) -> ReportCacheProbe:
+        """
+        查询缓存：先精确匹配，再在同一分区内语义匹配
+
+        Returns:
+            查询上下文；命中时 content 为报告内容的副本
+        """
+        probe = ReportCacheProbe(
+            key=build_report_key(standard, company_profile, assessment_results),
+            bucket=build_semantic_bucket(standard, company_profile, assessment_results),
+            company_profile=company_profile,
+        )
+        content = await self._get_exact(probe.key)
+
+        if content is None and self._live_entries(probe.bucket):
+            probe.vector = await self._embed_profile(company_profile)
+            if probe.vector is not None:
+                content = self._semantic_lookup(probe.bucket, probe.vector)
+                if content is not None:
+                    logger.info(f"Report semantic cache hit for standard {standard}")
+
+        if content is None:
+            self.stats.record_miss()
+        else:
+            self.stats.record_hit()
+            probe.content = copy.deepcopy(content)
+        return probe
+
+    async def store(self, probe: ReportCacheProbe, content: Dict[str, Any]) -> None:
+        """写入两级缓存，复用 lookup() 阶段已计算的向量"""
+        content = copy.deepcopy(content)
+        await self._set_exact(probe.key, content)
+
+        vector = probe.vector
+        if vector is None:
+            vector = await self._embed_profile(probe.company_profile)
+        if vector is not None:
+            entries = self._semantic_index.get(probe.bucket)
+            if entries is None:
+                entries = self._semantic_index[probe.bucket] = deque(maxlen=self.max_entries)
+            self._semantic_index.move_to_end(probe.bucket)
+            entries.append((time.monotonic() + self.ttl, vector, content))
+            while len(self._semantic_index) > self.max_buckets:
+                self._semantic_index.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空进程内的缓存层"""
+        self._local.clear()
+        self._semantic_index.clear()
+
+
+# 单例报告缓存
+report_cache = ReportCache()
@@ -1,11 +1,30 @@
 """统一API响应格式模块"""
 
-from typing import Optional, Any, TypeVar, Generic
+import hashlib
+import re
+from typing import Optional, Any, Dict, TypeVar, Generic, Tuple
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
+from time import time_ns
 
 T = TypeVar('T')
 
+# 最近一次格式化的（秒, ISO字符串），同一秒内的响应复用同一个时间戳
+_last_iso: Tuple[int, str] = (0, "")
+
+
+def iso_now() -> str:
+    """当前本地时间的ISO字符串（秒级精度，每秒只格式化一次）"""
+    global _last_iso
+    second = time_ns() // 1_000_000_000
+    if second != _last_iso[0]:
+        _last_iso = (second, datetime.fromtimestamp(second).isoformat())
+    return _last_iso[1]
+
+
 class APIResponse(BaseModel, Generic[T]):
     """统一API响应格式"""
     success: bool
@@ -16,7 +35,7 @@ class APIResponse(BaseModel, Generic[T]):
     
     def __init__(self, **data):
         if 'timestamp' not in data:
-            data['timestamp'] = datetime.now().isoformat()
+            data['timestamp'] = iso_now()
         super().__init__(**data)
 
 def create_response(
@@ -33,6 +52,84 @@ def create_response(
         data=data
     )
 
+def create_orjson_response(
+    data: Any = None,
+    success: bool = True,
+    code: int = 200,
+    message: str = "操作成功"
+) -> ORJSONResponse:
+    """
+    创建统一响应格式的ORJSONResponse
+    
+    结构与 APIResponse 相同；data 为普通 dict/list（可含datetime），
+    直接由orjson序列化，不经过Pydantic校验和jsonable_encoder
+    """
+    return ORJSONResponse({
+        "success": success,
+        "code": code,
+        "message": message,
+        "data": data,
+        "timestamp": iso_now()
+    })
+
+# 预序列化payload中的时间占位符："__NOW-<秒>__" 表示请求时刻往前偏移若干秒
+_NOW_PLACEHOLDER = re.compile(rb'"__NOW-(\d+)__"')
+
+def now_placeholder(offset: timedelta = timedelta(0)) -> str:
+    """生成时间占位符，由 fill_now() 在每次请求时替换为实际时间"""
+    return f"__NOW-{int(offset.total_seconds())}__"
+
+def fill_now(template: bytes) -> bytes:
+    """将预序列化JSON中的时间占位符替换为本次请求的时间（同一请求内共用一个now）"""
+    now = datetime.now()
+    # 同一偏移量只格式化一次
+    rendered: Dict[bytes, bytes] = {}
+
+    def render(match: "re.Match[bytes]") -> bytes:
+        offset = match.group(1)
+        value = rendered.get(offset)
+        if value is None:
+            value = rendered[offset] = orjson.dumps(now - timedelta(seconds=int(offset)))
+        return value
+
+    return _NOW_PLACEHOLDER.sub(render, template)
+
+def create_raw_response(
+    data: bytes,
+    success: bool = True,
+    code: int = 200,
+    message: str = "操作成功"
+) -> Response:
+    """
+    创建统一响应格式的原始字节响应
+    
+    data 为已序列化好的JSON字节，直接拼接进与 APIResponse 相同的信封
+    """
+    body = b"".join((
+        b'{"success":', b"true" if success else b"false",
+        b',"code":', b"%d" % code,
+        b',"message":', orjson.dumps(message),
+        b',"data":', data,
+        b',"timestamp":', orjson.dumps(iso_now()),
+        b"}"
+    ))
+    return Response(content=body, media_type="application/json")
+
+def content_etag(data: bytes) -> str:
+    """基于内容摘要的弱ETag（响应信封中的时间戳不参与计算）"""
+    return f'W/"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """请求的 If-None-Match 是否命中给定ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (etag, "*") for tag in if_none_match.split(","))
+
+def not_modified_response(etag: str, cache_control: str) -> Response:
+    """304 Not Modified 响应，客户端继续使用本地缓存"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
 def create_error_response(
     message: str = "操作失败",
     code: int = 500,
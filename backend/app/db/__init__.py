@@ -13,7 +13,9 @@ from .session import (
     create_tables,
     drop_tables,
     close_database,
-    init_database
+    init_database,
+    init_async_database,
+    close_async_database
 )
 
 # ✅ Import all SQLAlchemy ORM models (must be imported BEFORE create_tables)
@@ -33,6 +35,8 @@ __all__ = [
     "drop_tables",
     "close_database",
     "init_database",
+    "init_async_database",
+    "close_async_database",
     # Models
     "User",
     "Conversation",
@@ -3,8 +3,10 @@ Database session management
 Provides SQLAlchemy session factory and dependency injection for FastAPI
 """
 import logging
-from typing import Generator
+from typing import Generator, Optional, Tuple
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool, QueuePool
 
@@ -17,6 +19,10 @@ logger = logging.getLogger(__name__)
 engine = None
 SessionLocal = None
 
+# Async engine for async read paths (PostgreSQL + asyncpg only)
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
 def init_database():
     """Initialize database engine and session factory"""
     global engine, SessionLocal
@@ -73,6 +79,40 @@ engine, SessionLocal = init_database()
 # Base is imported from base_class.py to avoid duplication
 
 
+def init_async_database() -> Tuple[Optional[AsyncEngine], Optional[async_sessionmaker]]:
+    """
+    Initialize the asyncpg-backed engine and session factory.
+
+    Only PostgreSQL gets an async engine; for SQLite both stay None and
+    async callers fall back to the sync session in a worker thread.
+    """
+    global async_engine, AsyncSessionLocal
+
+    if async_engine is not None:
+        return async_engine, AsyncSessionLocal
+
+    database_url = settings.SQLALCHEMY_DATABASE_URI
+    if not database_url or not database_url.startswith("postgresql"):
+        return None, None
+
+    async_engine = create_async_engine(
+        make_url(database_url).set(drivername="postgresql+asyncpg"),
+        pool_size=5,
+        max_overflow=15,  # Up to 20 connections under load
+        pool_pre_ping=True,
+        pool_recycle=300,  # Recycle idle connections after 5 minutes
+        echo=False,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+    logger.info("🗄️  Async database engine created: PostgreSQL + asyncpg (pool_size=5, max_overflow=15)")
+    return async_engine, AsyncSessionLocal
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency function for FastAPI to get database sessions.
@@ -118,3 +158,12 @@ def close_database():
     if engine:
         engine.dispose()
         logger.info("🔒 Database connections closed")
+
+
+async def close_async_database():
+    """Dispose the async engine's connection pool"""
+    global async_engine, AsyncSessionLocal
+    if async_engine:
+        await async_engine.dispose()
+        async_engine, AsyncSessionLocal = None, None
+        logger.info("🔒 Async database connections closed")
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import sys
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -16,13 +18,30 @@ logger = logging.getLogger(__name__)
 from app.api.v1 import api_router
 from app.bus.message_bus import get_message_bus
 from app.core.cache import get_cache_stats, start_cache_cleanup, stop_cache_cleanup
-from app.db.session import create_tables, close_database
+from app.db.session import create_tables, close_database, init_async_database, close_async_database
+
+
+def configure_event_loop() -> None:
+    """
+    调整事件循环的任务调度
+
+    uvicorn[standard] 已自带 uvloop，并在创建事件循环时自动选用（--loop auto）；
+    Python 3.12+ 再启用 eager task factory，create_task() 会同步执行协程直到第一次真正挂起，
+    省去一次事件循环调度。
+    """
+    loop = asyncio.get_running_loop()
+    if sys.version_info >= (3, 12):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    logger.info(f"⚙️  Event loop: {type(loop).__module__}.{type(loop).__name__}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 Application startup...")
     try:
+        # 0. 配置事件循环
+        configure_event_loop()
+
         # 1. 初始化数据库表（如果不存在）
         logger.info("📊 Initializing database tables...")
         try:
@@ -32,6 +51,12 @@ async def lifespan(app: FastAPI):
             logger.warning(f"⚠️  Database initialization warning: {db_error}")
             # Continue even if database fails (for development without DB)
 
+        # 1.1 初始化异步数据库连接池（仅PostgreSQL）
+        try:
+            init_async_database()
+        except Exception as async_db_error:
+            logger.warning(f"⚠️  Async database initialization warning: {async_db_error}")
+
         # 2. 初始化并启动消息总线
         logger.info("📨 Initializing message bus...")
         message_bus = get_message_bus()
@@ -81,6 +106,7 @@ async def lifespan(app: FastAPI):
         # 4. 关闭数据库连接
         logger.info("📊 Closing database connections...")
         close_database()
+        await close_async_database()
         logger.info("✅ Database connections closed")
         logger.info("✅ Application shutdown complete")
 
@@ -147,4 +173,5 @@ def health_check():
 # 如果直接运行此文件
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 与 Dockerfile 保持一致：缺少 uvloop/httptools 时直接报错，而不是静默退回纯Python实现
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
@@ -193,7 +193,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 # Predefined endpoint-specific limits
 ENDPOINT_LIMITS = {
     "/api/v1/rag/answer": (20, 60),  # 20 req/min for expensive LLM calls
-    "/api/v1/extraction/extract": (30, 60),  # 30 req/min for extraction
+    "/api/v1/extraction/analyze": (30, 60),  # 30 req/min for extraction (also matches analyze-stream)
+    "/api/v1/extraction/batch-analyze": (5, 60),  # 5 batches/min, up to 10 documents each
     "/api/v1/auth/login": (5, 60),  # 5 login attempts per minute
     "/api/v1/auth/register": (3, 300),  # 3 registrations per 5 minutes
 }
@@ -89,9 +89,6 @@ class KnowledgeDocumentDB(Base):
 
     # ✅ Week 3: Composite indexes for query optimization
     __table_args__ = (
-        # Most common query: list documents by user + status
-        Index('ix_user_status', 'user_id', 'status'),
-
         # Query: list documents by user + category + status
         Index('ix_user_category_status', 'user_id', 'category_id', 'status'),
 
@@ -101,6 +98,13 @@ class KnowledgeDocumentDB(Base):
         # Query: pagination with date sorting (user + created_at)
         Index('ix_user_created', 'user_id', 'created_at'),
 
+        # Query: filtered pagination (equality filter, then ORDER BY created_at
+        # DESC LIMIT) - one index scan, no in-memory sort
+        # (user_id, status, created_at) also covers plain user + status lookups
+        Index('ix_user_category_created', 'user_id', 'category_id', 'created_at'),
+        Index('ix_user_status_created', 'user_id', 'status', 'created_at'),
+        Index('ix_user_type_created', 'user_id', 'file_type', 'created_at'),
+
         # Query: find vector indexed documents for user
         Index('ix_user_vector', 'user_id', 'vector_indexed'),
     )
@@ -0,0 +1,378 @@
+"""
+ESG评估引擎 - 4D评估模型（发现、诊断、设计、交付）
+
+纯计算模块，仅依赖标准库，以便评估进程池的工作进程能低成本导入。
+"""
+
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping
+
+# ESG评估框架（只读，所有引擎实例共享）
+_ASSESSMENT_FRAMEWORK: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "环境维度": MappingProxyType({
+        "climate_change": MappingProxyType({"name": "气候变化", "indicators": ("碳足迹", "能源效率", "气候风险适应")}),
+        "resource_management": MappingProxyType({"name": "资源管理", "indicators": ("水资源", "废物管理", "循环经济")}),
+        "biodiversity": MappingProxyType({"name": "生物多样性", "indicators": ("生态影响", "自然资本保护")}),
+        "pollution_control": MappingProxyType({"name": "污染防控", "indicators": ("排放管理", "化学品安全")})
+    }),
+    "社会维度": MappingProxyType({
+        "employee_rights": MappingProxyType({"name": "员工权益", "indicators": ("劳工标准", "多样性包容", "健康安全")}),
+        "community_relations": MappingProxyType({"name": "社区关系", "indicators": ("社区投资", "当地就业", "文化尊重")}),
+        "customer_responsibility": MappingProxyType({"name": "客户责任", "indicators": ("产品安全", "数据隐私", "负责任营销")}),
+        "supply_chain": MappingProxyType({"name": "供应链管理", "indicators": ("供应商ESG标准", "人权尽职调查")})
+    }),
+    "治理维度": MappingProxyType({
+        "corporate_governance": MappingProxyType({"name": "公司治理", "indicators": ("董事会独立性", "透明度", "问责制")}),
+        "business_ethics": MappingProxyType({"name": "商业伦理", "indicators": ("反腐败", "反贿赂", "公平竞争")}),
+        "risk_management": MappingProxyType({"name": "风险管理", "indicators": ("ESG风险识别", "管理体系", "应急响应")}),
+        "stakeholder_engagement": MappingProxyType({"name": "利益相关方参与", "indicators": ("沟通机制", "反馈处理", "参与决策")})
+    })
+})
+
+# 行业基准数据（简化版本，只读）
+_INDUSTRY_BENCHMARKS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    "制造业": MappingProxyType({
+        "environmental_score": 6.5,
+        "social_score": 7.0,
+        "governance_score": 7.5,
+        "key_challenges": ("碳减排", "供应链管理", "员工安全")
+    }),
+    "金融业": MappingProxyType({
+        "environmental_score": 7.5,
+        "social_score": 8.0,
+        "governance_score": 8.5,
+        "key_challenges": ("负责任投资", "数据安全", "金融包容性")
+    }),
+    "服务业": MappingProxyType({
+        "environmental_score": 7.0,
+        "social_score": 7.5,
+        "governance_score": 7.8,
+        "key_challenges": ("数据隐私", "员工福利", "客户权益")
+    }),
+    "科技业": MappingProxyType({
+        "environmental_score": 7.2,
+        "social_score": 7.8,
+        "governance_score": 8.0,
+        "key_challenges": ("算法伦理", "数字鸿沟", "数据安全")
+    })
+})
+
+
+class ESGAssessmentEngine:
+    """
+    ESG 评估引擎 - 智能评估和风险分析专家
+    
+    功能特性:
+    - 基于企业画像的智能评估
+    - 4D评估模型：发现、诊断、设计、交付
+    - 行业基准对比分析
+    - 风险机会识别
+    - 可操作的改进建议
+    """
+    
+    __slots__ = ("assessment_framework", "industry_benchmarks")
+
+    def __init__(self):
+        self.assessment_framework = _ASSESSMENT_FRAMEWORK
+        self.industry_benchmarks = _INDUSTRY_BENCHMARKS
+
+    def conduct_4d_assessment(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行4D评估模型：发现、诊断、设计、交付
+        
+        Args:
+            company_profile: 企业画像
+            
+        Returns:
+            完整的ESG评估报告
+        """
+        # Step 1: Discover - 发现关键议题和风险点
+        key_issues = self._discover_key_issues(company_profile)
+        
+        # Step 2: Diagnose - 诊断当前ESG管理成熟度
+        maturity_diagnosis = self._diagnose_maturity(company_profile, key_issues)
+        
+        # Step 3: Design - 设计改进方案
+        improvement_design = self._design_improvements(company_profile, maturity_diagnosis)
+        
+        # Step 4: Deliver - 交付可执行路径
+        execution_plan = self._deliver_execution_plan(improvement_design)
+        
+        return {
+            "assessment_summary": {
+                "overall_score": self._calculate_overall_score(maturity_diagnosis),
+                "maturity_level": self._determine_maturity_level(maturity_diagnosis),
+                "top_risks": key_issues["high_risk_issues"][:3],
+                "top_opportunities": key_issues["opportunities"][:3]
+            },
+            "detailed_assessment": {
+                "key_issues_identified": key_issues,
+                "maturity_diagnosis": maturity_diagnosis,
+                "benchmark_comparison": self._compare_with_benchmarks(company_profile, maturity_diagnosis),
+                "risk_opportunity_analysis": self._analyze_risks_opportunities(company_profile, key_issues)
+            },
+            "improvement_roadmap": {
+                "improvement_design": improvement_design,
+                "execution_plan": execution_plan,
+                "quick_wins": execution_plan["quick_wins"],
+                "medium_term": execution_plan["medium_term"],
+                "long_term": execution_plan["long_term"]
+            },
+            "assessment_metadata": {
+                "assessment_date": datetime.now().isoformat(),
+                "assessment_framework": "4D模型",
+                "industry_context": company_profile.get("basic_profile", {}).get("industry_category", "未知"),
+                "data_completeness": company_profile.get("data_completeness", 0)
+            }
+        }
+
+    def _discover_key_issues(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """发现关键ESG议题和风险点"""
+        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
+        risk_mapping = company_profile.get("esg_risk_mapping", {})
+        
+        high_risk_issues = []
+        medium_risk_issues = []
+        opportunities = []
+        
+        # 分析环境风险
+        env_risks = risk_mapping.get("environmental_risks", {})
+        if env_risks.get("level") == "高":
+            high_risk_issues.extend(env_risks.get("specific_risks", []))
+        elif env_risks.get("level") == "中":
+            medium_risk_issues.extend(env_risks.get("specific_risks", []))
+        
+        # 分析社会风险
+        social_risks = risk_mapping.get("social_risks", {})
+        if social_risks.get("level") == "高":
+            high_risk_issues.extend(social_risks.get("specific_risks", []))
+        elif social_risks.get("level") == "中":
+            medium_risk_issues.extend(social_risks.get("specific_risks", []))
+        
+        # 分析治理风险
+        gov_risks = risk_mapping.get("governance_risks", {})
+        if gov_risks.get("level") == "高":
+            high_risk_issues.extend(gov_risks.get("specific_risks", []))
+        elif gov_risks.get("level") == "中":
+            medium_risk_issues.extend(gov_risks.get("specific_risks", []))
+        
+        # 识别机会
+        maturity = company_profile.get("esg_maturity_assessment", {})
+        if maturity.get("improvement_potential") == "高":
+            opportunities.extend([
+                "建立ESG管理体系",
+                "制定可持续发展战略",
+                "提升ESG披露透明度"
+            ])
+        
+        return {
+            "high_risk_issues": high_risk_issues,
+            "medium_risk_issues": medium_risk_issues,
+            "opportunities": opportunities,
+            "materiality_matrix": self._create_materiality_matrix(company_profile)
+        }
+
+    def _diagnose_maturity(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> Dict[str, Any]:
+        """诊断ESG管理成熟度"""
+        maturity_assessment = company_profile.get("esg_maturity_assessment", {})
+        
+        # 基于现有成熟度评估扩展
+        current_stage = maturity_assessment.get("maturity_stage", "起步阶段")
+        
+        # 各维度成熟度评分（0-4分）
+        environmental_maturity = self._assess_dimension_maturity("环境", company_profile)
+        social_maturity = self._assess_dimension_maturity("社会", company_profile)
+        governance_maturity = self._assess_dimension_maturity("治理", company_profile)
+        
+        return {
+            "overall_maturity": current_stage,
+            "dimension_scores": {
+                "environmental": environmental_maturity,
+                "social": social_maturity,
+                "governance": governance_maturity
+            },
+            "strengths": self._identify_strengths(company_profile),
+            "gaps": self._identify_gaps(company_profile, key_issues),
+            "improvement_priorities": self._prioritize_improvements(environmental_maturity, social_maturity, governance_maturity)
+        }
+
+    def _assess_dimension_maturity(self, dimension: str, company_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """评估单个维度的成熟度"""
+        # 简化的成熟度评估逻辑
+        maturity_indicators = company_profile.get("esg_maturity_assessment", {}).get("supporting_evidence", [])
+        
+        score = 1  # 基础分
+        if any("政策" in evidence for evidence in maturity_indicators):
+            score += 1
+        if any("实施" in evidence for evidence in maturity_indicators):
+            score += 1
+        if any("监控" in evidence for evidence in maturity_indicators):
+            score += 1
+        
+        levels = ["无意识", "初步意识", "系统化管理", "整合管理", "领先实践"]
+        
+        return {
+            "score": min(score, 4),
+            "level": levels[min(score, 4)],
+            "description": f"{dimension}维度处于{levels[min(score, 4)]}阶段"
+        }
+
+    def _create_materiality_matrix(self, company_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """创建重要性议题矩阵"""
+        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
+        
+        # 基于行业特点设定议题重要性
+        if industry == "制造业":
+            high_impact_issues = ["碳排放管理", "供应链管理", "员工健康安全"]
+            medium_impact_issues = ["水资源管理", "社区关系", "公司治理"]
+        elif industry == "金融业":
+            high_impact_issues = ["负责任投资", "数据安全", "公司治理"]
+            medium_impact_issues = ["员工多样性", "客户隐私", "气候风险"]
+        else:
+            high_impact_issues = ["合规管理", "员工权益", "环境影响"]
+            medium_impact_issues = ["客户关系", "供应商管理", "社区参与"]
+        
+        return {
+            "high_impact_high_concern": high_impact_issues,
+            "medium_impact_medium_concern": medium_impact_issues,
+            "matrix_explanation": "基于行业特点和利益相关方关注度生成的重要性矩阵"
+        }
+
+    def _compare_with_benchmarks(self, company_profile: Dict[str, Any], maturity_diagnosis: Dict[str, Any]) -> Dict[str, Any]:
+        """与行业基准对比"""
+        industry = company_profile.get("basic_profile", {}).get("industry_category", "")
+        benchmarks = self.industry_benchmarks
+        benchmark = benchmarks.get(industry) or benchmarks["服务业"]
+        
+        current_scores = maturity_diagnosis["dimension_scores"]
+        
+        return {
+            "industry_benchmark": {**benchmark, "key_challenges": list(benchmark["key_challenges"])},
+            "performance_gaps": {
+                "environmental": benchmark["environmental_score"] - current_scores["environmental"]["score"],
+                "social": benchmark["social_score"] - current_scores["social"]["score"],
+                "governance": benchmark["governance_score"] - current_scores["governance"]["score"]
+            },
+            "relative_position": "需要改进" if any(gap > 1 for gap in [
+                benchmark["environmental_score"] - current_scores["environmental"]["score"],
+                benchmark["social_score"] - current_scores["social"]["score"],
+                benchmark["governance_score"] - current_scores["governance"]["score"]
+            ]) else "接近行业平均水平"
+        }
+
+    def _analyze_risks_opportunities(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> Dict[str, Any]:
+        """分析风险和机会"""
+        risks = []
+        opportunities = []
+        
+        # 短期风险（1年内）
+        for risk in key_issues["high_risk_issues"]:
+            risks.append({
+                "risk": risk,
+                "timeframe": "短期",
+                "impact": "高",
+                "likelihood": "中",
+                "mitigation": f"建立{risk}管理制度"
+            })
+        
+        # 机会识别
+        for opp in key_issues["opportunities"]:
+            opportunities.append({
+                "opportunity": opp,
+                "value_potential": "中",
+                "timeframe": "中期",
+                "implementation_difficulty": "中"
+            })
+        
+        return {
+            "risk_register": risks,
+            "opportunity_register": opportunities,
+            "risk_heat_map": "高风险议题需要优先关注",
+            "opportunity_value_assessment": "中等价值创造潜力"
+        }
+
+    def _design_improvements(self, company_profile: Dict[str, Any], maturity_diagnosis: Dict[str, Any]) -> Dict[str, Any]:
+        """设计改进方案"""
+        priorities = maturity_diagnosis["improvement_priorities"]
+        gaps = maturity_diagnosis["gaps"]
+        
+        return {
+            "strategic_recommendations": [
+                "建立ESG治理架构",
+                "制定ESG政策体系",
+                "建立ESG绩效监测机制"
+            ],
+            "operational_improvements": [
+                "开展ESG培训",
+                "建立数据收集系统",
+                "制定ESG报告流程"
+            ],
+            "capability_building": [
+                "建立ESG专业团队",
+                "引入ESG管理工具",
+                "建立利益相关方沟通机制"
+            ]
+        }
+
+    def _deliver_execution_plan(self, improvement_design: Dict[str, Any]) -> Dict[str, Any]:
+        """交付执行计划"""
+        return {
+            "quick_wins": [
+                {"action": "制定ESG政策声明", "timeline": "1个月", "resource": "低", "impact": "中"},
+                {"action": "开展ESG现状调研", "timeline": "2个月", "resource": "中", "impact": "高"},
+                {"action": "建立ESG工作小组", "timeline": "1个月", "resource": "低", "impact": "中"}
+            ],
+            "medium_term": [
+                {"action": "建立ESG管理体系", "timeline": "6个月", "resource": "高", "impact": "高"},
+                {"action": "开展ESG培训项目", "timeline": "3个月", "resource": "中", "impact": "中"},
+                {"action": "建立ESG数据系统", "timeline": "4个月", "resource": "高", "impact": "高"}
+            ],
+            "long_term": [
+                {"action": "发布ESG报告", "timeline": "12个月", "resource": "高", "impact": "高"},
+                {"action": "获得ESG认证", "timeline": "18个月", "resource": "高", "impact": "中"},
+                {"action": "建立ESG文化", "timeline": "24个月", "resource": "中", "impact": "高"}
+            ]
+        }
+
+    def _calculate_overall_score(self, maturity_diagnosis: Dict[str, Any]) -> float:
+        """计算总体ESG得分"""
+        scores = maturity_diagnosis["dimension_scores"]
+        env_score = scores["environmental"]["score"]
+        social_score = scores["social"]["score"]
+        gov_score = scores["governance"]["score"]
+        
+        # 加权平均（可根据行业调整权重）
+        return round((env_score + social_score + gov_score) / 3 * 2.5, 1)  # 转换为10分制
+
+    def _determine_maturity_level(self, maturity_diagnosis: Dict[str, Any]) -> str:
+        """确定整体成熟度水平"""
+        return maturity_diagnosis["overall_maturity"]
+
+    def _identify_strengths(self, company_profile: Dict[str, Any]) -> List[str]:
+        """识别优势"""
+        return ["有ESG意识", "愿意改进", "具备基础条件"]
+
+    def _identify_gaps(self, company_profile: Dict[str, Any], key_issues: Dict[str, Any]) -> List[str]:
+        """识别差距"""
+        return key_issues["high_risk_issues"] + key_issues["medium_risk_issues"]
+
+    def _prioritize_improvements(self, env_maturity: Dict, social_maturity: Dict, governance_maturity: Dict) -> List[str]:
+        """优先级排序"""
+        scores = [
+            ("环境", env_maturity["score"]),
+            ("社会", social_maturity["score"]),
+            ("治理", governance_maturity["score"])
+        ]
+        
+        # 按得分从低到高排序，得分低的优先改进
+        sorted_scores = sorted(scores, key=lambda x: x[1])
+        return [dimension for dimension, score in sorted_scores]
+
+# 模块级评估引擎：引擎无实例状态，工作进程中各自持有一份
+_assessment_engine = ESGAssessmentEngine()
+
+
+def run_4d_assessment(company_profile: Dict[str, Any]) -> Dict[str, Any]:
+    """在评估进程池中执行4D评估（模块级函数，可被pickle）"""
+    return _assessment_engine.conduct_4d_assessment(company_profile)
@@ -10,14 +10,39 @@ import re
 from typing import Dict, List, Any, Optional, Tuple, Set
 from datetime import datetime
 from dataclasses import dataclass, asdict
+from itertools import islice
 import asyncio
 
 from app.vector_store.chroma_db import get_chroma_manager
 from app.core.config import settings
-from app.core.cache import cached  # ✅ Week 3: Add caching support
+from app.core.cache import CacheKey, hybrid_cache
 
 logger = logging.getLogger(__name__)
 
+# 提取结果缓存有效期（24小时，同一文档重复分析可省去2-5秒）
+EXTRACTION_CACHE_TTL = 86400
+# 提取逻辑变更时递增，使旧版本的缓存结果失效
+EXTRACTION_CACHE_VERSION = 1
+# 可单独提取的部分，名称与 ExtractionResult 的字段一致
+PARTIAL_EXTRACTION_PARTS = ("summary", "tags")
+
+
+def _extraction_cache_key(document_id: str, user_id: str, part: str = "full") -> str:
+    """提取结果的缓存键，不含服务实例信息，多个进程共享Redis时可互相命中"""
+    return CacheKey.generate(
+        "doc_extraction",
+        document_id=document_id,
+        user_id=str(user_id),
+        part=part,
+        version=EXTRACTION_CACHE_VERSION
+    )
+
+
+async def invalidate_extraction(document_id: str, user_id: str) -> None:
+    """文档删除或更新后清除其完整及部分提取结果缓存"""
+    for part in ("full", *PARTIAL_EXTRACTION_PARTS):
+        await hybrid_cache.delete(_extraction_cache_key(document_id, user_id, part))
+
 
 @dataclass
 class ExtractedEntity:
@@ -91,6 +116,8 @@ class InformationExtractionService:
     def __init__(self):
         """初始化信息提取服务 - ✅ Week 3: Pre-compile regex patterns"""
         self.chroma_manager = None
+        # (文档ID, 用户ID, 提取部分) -> 正在进行的提取任务，并发的相同请求共享同一次提取
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
 
         # 预定义的实体类型和模式
         self.entity_patterns = {
@@ -148,10 +175,11 @@ class InformationExtractionService:
         if not self.chroma_manager:
             self.chroma_manager = get_chroma_manager()
 
-    @cached(ttl=86400, prefix="doc_extraction")  # ✅ Week 3: Cache for 24 hours (saves 2-5s per document)
     async def extract_information(self, document_id: str, user_id: str) -> ExtractionResult:
         """
-        提取文档的关键信息 - ✅ Week 3: Cached to avoid re-processing same documents
+        提取文档的关键信息 - 结果按 (文档ID, 用户ID) 缓存 EXTRACTION_CACHE_TTL 秒，
+        Redis可用时跨进程共享，否则退化为进程内缓存；
+        前端同时请求摘要/实体/标签等接口时，并发的相同提取只执行一次
 
         Args:
             document_id: 文档ID
@@ -160,6 +188,120 @@ class InformationExtractionService:
         Returns:
             ExtractionResult: 提取结果
         """
+        return await self._run_shared(
+            (document_id, str(user_id), "full"),
+            lambda: self._extract_with_cache(document_id, user_id)
+        )
+    
+    async def extract_summary_only(self, document_id: str, user_id: str) -> DocumentSummary:
+        """仅生成文档摘要，跳过实体、关键信息等其它提取步骤"""
+        return await self._extract_part(document_id, user_id, "summary", self._extract_summary)
+    
+    async def extract_tags_only(self, document_id: str, user_id: str) -> List[str]:
+        """仅生成文档标签，跳过实体、关键信息等其它提取步骤"""
+        return await self._extract_part(document_id, user_id, "tags", self._generate_tags)
+    
+    def _run_shared(self, key: Tuple[str, str, str], factory) -> "asyncio.Future":
+        """同一键只运行一个提取任务，并发请求等待同一结果"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield：单个请求被取消时不影响其它请求共享的提取任务
+        return asyncio.shield(task)
+    
+    async def _extract_part(self, document_id: str, user_id: str, part: str, stage) -> Any:
+        """单独执行某个提取步骤；完整提取正在进行时直接等待其结果"""
+        full_task = self._inflight.get((document_id, str(user_id), "full"))
+        if full_task is not None:
+            return getattr(await asyncio.shield(full_task), part)
+        return await self._run_shared(
+            (document_id, str(user_id), part),
+            lambda: self._extract_part_with_cache(document_id, user_id, part, stage)
+        )
+    
+
+    async def query_entities(
+        self,
+        document_id: str,
+        user_id: str,
+        entity_type: Optional[str] = None,
+        min_confidence: float = 0.0
+    ) -> List[ExtractedEntity]:
+        """
+        获取文档中满足条件的实体
+        
+        Args:
+            document_id: 文档ID
+            user_id: 用户ID
+            entity_type: 实体类型过滤
+            min_confidence: 最小置信度
+        """
+        extraction_result = await self.extract_information(document_id, user_id)
+        return [
+            entity for entity in extraction_result.entities
+            if (not entity_type or entity.type == entity_type) and entity.confidence >= min_confidence
+        ]
+    
+    async def query_key_information(
+        self,
+        document_id: str,
+        user_id: str,
+        category: Optional[str] = None,
+        min_importance: float = 0.0,
+        limit: Optional[int] = None
+    ) -> List[KeyInformation]:
+        """
+        获取文档中满足条件的关键信息（已按重要性降序）
+        
+        Args:
+            document_id: 文档ID
+            user_id: 用户ID
+            category: 信息类别过滤
+            min_importance: 最小重要性
+            limit: 返回数量上限，取满即停止扫描
+        """
+        extraction_result = await self.extract_information(document_id, user_id)
+        matches = (
+            info for info in extraction_result.key_information
+            if (not category or info.category == category) and info.importance >= min_importance
+        )
+        return list(islice(matches, limit))
+    
+    async def _extract_with_cache(self, document_id: str, user_id: str) -> ExtractionResult:
+        """先查缓存，未命中时执行提取并写入缓存"""
+        cache_key = _extraction_cache_key(document_id, user_id)
+        cached_result = await hybrid_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        extraction_result = await self._extract_information(document_id, user_id)
+        await hybrid_cache.set(cache_key, extraction_result, EXTRACTION_CACHE_TTL)
+        return extraction_result
+    
+    async def _extract_part_with_cache(self, document_id: str, user_id: str, part: str, stage) -> Any:
+        """优先取完整提取结果中的对应部分，其次取该部分的缓存，都未命中时只运行该步骤"""
+        full_result = await hybrid_cache.get(_extraction_cache_key(document_id, user_id))
+        if full_result is not None:
+            return getattr(full_result, part)
+        
+        cache_key = _extraction_cache_key(document_id, user_id, part)
+        cached_part = await hybrid_cache.get(cache_key)
+        if cached_part is not None:
+            return cached_part
+        
+        await self._init_components()
+        document_content = await self._get_document_content(document_id, user_id)
+        if not document_content:
+            raise ValueError(f"Document {document_id} not found or empty")
+        
+        part_result = await stage(document_content)
+        await hybrid_cache.set(cache_key, part_result, EXTRACTION_CACHE_TTL)
+        return part_result
+    
+    async def _extract_information(self, document_id: str, user_id: str) -> ExtractionResult:
+        """执行完整的信息提取流程（不经过缓存）"""
         start_time = datetime.now()
         
         try:
@@ -793,8 +935,13 @@ class InformationExtractionService:
 _extraction_service_instance = None
 
 
-def get_extraction_service() -> InformationExtractionService:
-    """获取信息提取服务实例（单例模式）"""
+async def get_extraction_service() -> InformationExtractionService:
+    """获取信息提取服务实例（单例模式）
+
+    作为接口依赖使用：定义为 async def 后在事件循环上直接解析，
+    不必每个请求调度到线程池，也避免多个线程并发创建出多个实例
+    （进行中的提取任务登记在实例上，实例唯一才能共享）
+    """
     global _extraction_service_instance
     if _extraction_service_instance is None:
         _extraction_service_instance = InformationExtractionService()
@@ -32,10 +32,18 @@ from app.models.knowledge import (
     DocumentUploadResponse
 )
 from app.models.knowledge_db import KnowledgeCategoryDB, KnowledgeDocumentDB
+from app.core.chat_cache import chat_cache
 from app.services.document_processor import get_document_processor, DocumentProcessorError
 
 logger = logging.getLogger(__name__)
 
+# Sortable columns for document search. Only columns that lead or follow the
+# equality columns of a compound index on knowledge_documents are allowed, so
+# filter + ORDER BY + LIMIT is served by a single index scan.
+SEARCH_SORT_COLUMNS = {
+    "created_at": KnowledgeDocumentDB.created_at,
+}
+
 
 class KnowledgeServiceError(Exception):
     """知识库服务异常"""
@@ -227,6 +235,9 @@ class KnowledgeServiceV2:
 
             logger.info(f"✅ Document record created: {db_document.id}")
 
+            # Cached chat answers no longer reflect the user's knowledge base
+            chat_cache.invalidate_user(user_id)
+
             return DocumentUploadResponse(
                 id=db_document.id,
                 filename=db_document.original_filename,
@@ -298,35 +309,15 @@ class KnowledgeServiceV2:
             List of documents
         """
         try:
-            # Base query with eager loading
-            query = db.query(KnowledgeDocumentDB).options(
-                joinedload(KnowledgeDocumentDB.category)
-            ).filter(
-                and_(
-                    KnowledgeDocumentDB.user_id == user_id,
-                    KnowledgeDocumentDB.status != DocumentStatus.DELETED.value
-                )
+            query = self._document_query(
+                db,
+                user_id,
+                category_id=query_params.category_id,
+                status=query_params.status.value if query_params.status else None,
+                file_type=query_params.file_type.value if query_params.file_type else None,
+                search=query_params.search
             )
 
-            # Apply filters
-            if query_params.category_id:
-                query = query.filter(KnowledgeDocumentDB.category_id == query_params.category_id)
-
-            if query_params.status:
-                query = query.filter(KnowledgeDocumentDB.status == query_params.status.value)
-
-            if query_params.file_type:
-                query = query.filter(KnowledgeDocumentDB.file_type == query_params.file_type.value)
-
-            if query_params.search:
-                search_pattern = f"%{query_params.search}%"
-                query = query.filter(
-                    or_(
-                        KnowledgeDocumentDB.filename.like(search_pattern),
-                        KnowledgeDocumentDB.original_filename.like(search_pattern)
-                    )
-                )
-
             # Apply sorting
             query = query.order_by(KnowledgeDocumentDB.created_at.desc())
 
@@ -343,6 +334,98 @@ class KnowledgeServiceV2:
             logger.error(f"❌ Failed to list documents: {e}")
             raise KnowledgeServiceError(f"获取文档列表失败: {e}")
 
+    async def search_documents(
+        self,
+        db: Session,
+        user_id: int,
+        search: str,
+        filters: Dict[str, Any]
+    ) -> List[KnowledgeDocument]:
+        """
+        ✅ Search documents by filename with optional filters and sorting
+
+        Args:
+            db: Database session
+            user_id: User ID
+            search: Filename keyword
+            filters: category_id / file_type / status, sort_by / sort_order, limit / offset
+
+        Returns:
+            List of documents
+        """
+        sort_column = SEARCH_SORT_COLUMNS.get(filters.get("sort_by", "created_at"))
+        if sort_column is None:
+            raise KnowledgeServiceError(
+                f"不支持的排序字段: {filters['sort_by']}，可选: {', '.join(SEARCH_SORT_COLUMNS)}"
+            )
+        sort_order = filters.get("sort_order", "desc")
+        if sort_order not in ("asc", "desc"):
+            raise KnowledgeServiceError(f"不支持的排序方向: {sort_order}")
+
+        try:
+            query = self._document_query(
+                db,
+                user_id,
+                category_id=filters.get("category_id"),
+                status=filters.get("status"),
+                file_type=filters.get("file_type"),
+                search=search
+            )
+            query = query.order_by(sort_column.desc() if sort_order == "desc" else sort_column.asc())
+            query = query.limit(filters.get("limit", 20)).offset(filters.get("offset", 0))
+
+            return [self._db_document_to_pydantic(doc) for doc in query.all()]
+
+        except Exception as e:
+            logger.error(f"❌ Failed to search documents: {e}")
+            raise KnowledgeServiceError(f"搜索文档失败: {e}")
+
+    def _document_query(
+        self,
+        db: Session,
+        user_id: int,
+        category_id: Optional[str] = None,
+        status: Optional[str] = None,
+        file_type: Optional[str] = None,
+        search: Optional[str] = None
+    ):
+        """
+        Build the filtered document query shared by list and search
+
+        Equality filters match the leading columns of the compound indexes on
+        knowledge_documents: (user_id, category_id, created_at),
+        (user_id, status, created_at) and (user_id, file_type, created_at).
+        """
+        # Base query with eager loading
+        query = db.query(KnowledgeDocumentDB).options(
+            joinedload(KnowledgeDocumentDB.category)
+        ).filter(
+            and_(
+                KnowledgeDocumentDB.user_id == user_id,
+                KnowledgeDocumentDB.status != DocumentStatus.DELETED.value
+            )
+        )
+
+        if category_id:
+            query = query.filter(KnowledgeDocumentDB.category_id == category_id)
+
+        if status:
+            query = query.filter(KnowledgeDocumentDB.status == status)
+
+        if file_type:
+            query = query.filter(KnowledgeDocumentDB.file_type == file_type)
+
+        if search:
+            search_pattern = f"%{search}%"
+            query = query.filter(
+                or_(
+                    KnowledgeDocumentDB.filename.like(search_pattern),
+                    KnowledgeDocumentDB.original_filename.like(search_pattern)
+                )
+            )
+
+        return query
+
     async def delete_document(
         self,
         db: Session,
@@ -397,6 +480,11 @@ class KnowledgeServiceV2:
                     logger.error(f"⚠️ Failed to delete vector embeddings: {vec_error}")
                     # Continue with database deletion even if vector cleanup fails
 
+            # Drop cached extraction results for the deleted document
+            from app.services.extraction_service import invalidate_extraction
+            await invalidate_extraction(document_id, str(user_id))
+            chat_cache.invalidate_user(user_id)
+
             # Delete database record
             db.delete(db_document)
             db.commit()
@@ -427,13 +515,22 @@ class KnowledgeServiceV2:
             Knowledge statistics
         """
         try:
-            # Total documents count
-            total_documents = db.query(func.count(KnowledgeDocumentDB.id)).filter(
+            # Documents and bytes by status; the totals are the sums over the
+            # status groups, so one GROUP BY replaces three separate scans
+            status_rows = db.query(
+                KnowledgeDocumentDB.status,
+                func.count(KnowledgeDocumentDB.id),
+                func.coalesce(func.sum(KnowledgeDocumentDB.file_size), 0)
+            ).filter(
                 and_(
                     KnowledgeDocumentDB.user_id == user_id,
                     KnowledgeDocumentDB.status != DocumentStatus.DELETED.value
                 )
-            ).scalar()
+            ).group_by(KnowledgeDocumentDB.status).all()
+
+            documents_by_status = {status: count for status, count, _ in status_rows}
+            total_documents = sum(documents_by_status.values())
+            total_size = sum(size for _, _, size in status_rows)
 
             # Total categories count
             total_categories = db.query(func.count(KnowledgeCategoryDB.id)).filter(
@@ -443,27 +540,6 @@ class KnowledgeServiceV2:
                 )
             ).scalar()
 
-            # Total file size
-            total_size = db.query(func.sum(KnowledgeDocumentDB.file_size)).filter(
-                and_(
-                    KnowledgeDocumentDB.user_id == user_id,
-                    KnowledgeDocumentDB.status != DocumentStatus.DELETED.value
-                )
-            ).scalar() or 0
-
-            # Documents by status
-            status_counts = db.query(
-                KnowledgeDocumentDB.status,
-                func.count(KnowledgeDocumentDB.id)
-            ).filter(
-                and_(
-                    KnowledgeDocumentDB.user_id == user_id,
-                    KnowledgeDocumentDB.status != DocumentStatus.DELETED.value
-                )
-            ).group_by(KnowledgeDocumentDB.status).all()
-
-            documents_by_status = {status: count for status, count in status_counts}
-
             # Documents by type
             type_counts = db.query(
                 KnowledgeDocumentDB.file_type,
@@ -478,13 +554,14 @@ class KnowledgeServiceV2:
             documents_by_type = {file_type: count for file_type, count in type_counts}
 
             # Documents by category
+            # Driven from the documents side so the (user_id, category_id, status)
+            # index narrows the rows before the join
             category_counts = db.query(
                 KnowledgeCategoryDB.name,
                 func.count(KnowledgeDocumentDB.id)
-            ).join(
-                KnowledgeDocumentDB,
-                KnowledgeCategoryDB.id == KnowledgeDocumentDB.category_id,
-                isouter=True
+            ).select_from(KnowledgeDocumentDB).join(
+                KnowledgeCategoryDB,
+                KnowledgeCategoryDB.id == KnowledgeDocumentDB.category_id
             ).filter(
                 and_(
                     KnowledgeDocumentDB.user_id == user_id,
@@ -7,6 +7,7 @@ RAG服务 - 检索增强生成智能问答系统
 
 import logging
 import re
+import unicodedata
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import asyncio
@@ -15,11 +16,36 @@ from app.vector_store.chroma_db import get_chroma_manager
 from app.services.document_processor import get_document_processor
 from app.core.config import settings
 from app.core.llm_factory import llm_factory
-from app.core.cache import cached  # ✅ Week 3: Add caching support
+from app.core.cache import CacheKey, cached, hybrid_cache  # ✅ Week 3: Add caching support
 from langchain.schema import HumanMessage, SystemMessage
 
 logger = logging.getLogger(__name__)
 
+# 问答结果缓存有效期（1小时，命中时省去检索和LLM生成的2-5秒）
+RAG_ANSWER_CACHE_TTL = 3600
+_QUESTION_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    问题归一化：全角转半角、统一大小写、合并空白、去掉句末标点，
+    使只在书写格式上不同的同一问题（如"？"与"?"）命中同一缓存
+    """
+    text = unicodedata.normalize("NFKC", question).lower()
+    return _QUESTION_WHITESPACE.sub(" ", text).strip().rstrip("?!.。~ ")
+
+
+def _answer_cache_key(question: str, user_id: str, document_id: Optional[str],
+                      document_type: Optional[str]) -> str:
+    """问答结果的缓存键，Redis可用时多个进程共享"""
+    return CacheKey.generate(
+        "rag_answer",
+        question=normalize_question(question),
+        user_id=str(user_id),
+        document_id=document_id,
+        document_type=document_type
+    )
+
 
 class DocumentChunk:
     """文档分块数据结构"""
@@ -94,6 +120,9 @@ class RAGService:
         self.min_similarity_threshold = 0.3  # 最小相似度阈值
         self.max_retrieved_chunks = 5  # 最大检索分块数
         
+        # 缓存键 -> 正在进行的问答任务，并发的相同问题只检索和生成一次
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
         logger.info("🧠 RAG Service initialized")
     
     async def _init_components(self):
@@ -103,13 +132,15 @@ class RAGService:
         if not self.document_processor:
             self.document_processor = get_document_processor()
 
-    @cached(ttl=3600, prefix="rag_answer")  # ✅ Week 3: Cache for 1 hour (saves 2-5s per request)
     async def answer_question(self, question: str, user_id: str,
                             document_id: Optional[str] = None,
                             document_type: Optional[str] = None) -> RAGAnswer:
         """
         基于文档内容回答问题 - ✅ Week 3: Cached to save expensive LLM calls
 
+        有来源依据的答案按归一化后的问题缓存 RAG_ANSWER_CACHE_TTL 秒；
+        未找到相关内容或处理出错的答案不缓存，文档上传或故障恢复后可立即重新作答
+
         Args:
             question: 用户问题
             user_id: 用户ID
@@ -119,45 +150,73 @@ class RAGService:
         Returns:
             RAGAnswer: 包含答案、来源和置信度的结果
         """
-        try:
-            await self._init_components()
-            
-            logger.info(f"🤔 RAG Question: '{question}' (user: {user_id})")
-            
-            # 1. 检索相关文档片段
-            relevant_chunks = await self._retrieve_relevant_chunks(
-                question, user_id, document_id, document_type
-            )
-            
-            if not relevant_chunks:
-                return self._generate_no_context_answer(question)
-            
-            # 2. 组装上下文
-            context = await self._assemble_context(relevant_chunks, question)
-            
-            # 3. 生成答案
-            answer_text = await self._generate_answer(question, context, relevant_chunks)
-            
-            # 4. 计算置信度
-            confidence = self._calculate_confidence(relevant_chunks, answer_text)
-            
-            # 5. 生成推理解释
-            reasoning = self._generate_reasoning(question, relevant_chunks, confidence)
-            
-            rag_answer = RAGAnswer(
-                question=question,
-                answer=answer_text,
-                sources=relevant_chunks,
-                confidence=confidence,
-                reasoning=reasoning
+        cache_key = _answer_cache_key(question, user_id, document_id, document_type)
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._answer_with_cache(cache_key, question, user_id, document_id, document_type)
             )
-            
-            logger.info(f"✅ RAG Answer generated (confidence: {confidence:.2%})")
-            return rag_answer
-            
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # shield：单个请求被取消时不影响其它请求共享的问答任务
+        return await asyncio.shield(task)
+    
+    async def _answer_with_cache(self, cache_key: str, question: str, user_id: str,
+                                 document_id: Optional[str],
+                                 document_type: Optional[str]) -> RAGAnswer:
+        """先查缓存，未命中时执行检索和生成，只缓存有来源依据的答案"""
+        cached_answer = await hybrid_cache.get(cache_key)
+        if cached_answer is not None:
+            return cached_answer
+        
+        try:
+            rag_answer = await self._answer_question(question, user_id, document_id, document_type)
         except Exception as e:
             logger.error(f"❌ RAG question answering failed: {e}")
             return self._generate_error_answer(question, str(e))
+        
+        if rag_answer.sources:
+            await hybrid_cache.set(cache_key, rag_answer, RAG_ANSWER_CACHE_TTL)
+        return rag_answer
+    
+    async def _answer_question(self, question: str, user_id: str,
+                               document_id: Optional[str] = None,
+                               document_type: Optional[str] = None) -> RAGAnswer:
+        """执行完整的检索增强问答流程（不经过缓存，出错时抛出异常）"""
+        await self._init_components()
+        
+        logger.info(f"🤔 RAG Question: '{question}' (user: {user_id})")
+        
+        # 1. 检索相关文档片段
+        relevant_chunks = await self._retrieve_relevant_chunks(
+            question, user_id, document_id, document_type
+        )
+        
+        if not relevant_chunks:
+            return self._generate_no_context_answer(question)
+        
+        # 2. 组装上下文
+        context = await self._assemble_context(relevant_chunks, question)
+        
+        # 3. 生成答案
+        answer_text = await self._generate_answer(question, context, relevant_chunks)
+        
+        # 4. 计算置信度
+        confidence = self._calculate_confidence(relevant_chunks, answer_text)
+        
+        # 5. 生成推理解释
+        reasoning = self._generate_reasoning(question, relevant_chunks, confidence)
+        
+        rag_answer = RAGAnswer(
+            question=question,
+            answer=answer_text,
+            sources=relevant_chunks,
+            confidence=confidence,
+            reasoning=reasoning
+        )
+        
+        logger.info(f"✅ RAG Answer generated (confidence: {confidence:.2%})")
+        return rag_answer
     
     @cached(ttl=1800, prefix="rag_chunks")  # ✅ Week 3: Cache vector search for 30 min
     async def _retrieve_relevant_chunks(self, question: str, user_id: str,
@@ -4,16 +4,27 @@ Service layer for handling business logic related to ESG reports.
 ✅ Week 2: Updated to use ReportDB ORM model
 Now uses proper SQLAlchemy ORM instead of non-existent db_models.
 """
+import asyncio
+import logging
 import uuid
+from concurrent.futures import Executor
 from datetime import datetime, timezone
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import Depends
 
 from app.models.report_db import ReportDB
 from app.models import report as report_models
+from app.db import session as db_session
 from app.db.session import get_db
 
+logger = logging.getLogger(__name__)
+
+# Write batching: ops queued within this window share one transaction
+REPORT_WRITE_BATCH_WINDOW = 0.02  # seconds
+REPORT_WRITE_BATCH_MAX_SIZE = 64
+
 class ReportService:
     """
     ✅ ORM-based Report Service
@@ -62,6 +73,52 @@ class ReportService:
         """
         return self.db.query(ReportDB).filter(ReportDB.id == report_id).first()
 
+    def find_completed_report(self, conversation_id: str, standard: str,
+                              company_profile: dict) -> Optional[ReportDB]:
+        """
+        ✅ Find a completed report generated from the same request
+
+        Args:
+            conversation_id: Conversation ID
+            standard: Report standard (GRI, SASB, ...)
+            company_profile: Company profile the report was generated from
+
+        Returns:
+            Most recent matching ReportDB object or None
+        """
+        candidates = (
+            self.db.query(ReportDB)
+            .filter(
+                ReportDB.conversation_id == conversation_id,
+                ReportDB.standard == standard,
+                ReportDB.status == "completed",
+            )
+            .order_by(ReportDB.completed_at.desc())
+        )
+        for db_report in candidates:
+            if db_report.company_profile == company_profile:
+                return db_report
+        return None
+
+    def append_section(self, report_id: str, section_name: str, section_json: Any) -> Optional[ReportDB]:
+        """
+        ✅ Store one finished report section while the rest is still generating
+
+        Args:
+            report_id: Report ID
+            section_name: Top-level report key (executive_summary, ...)
+            section_json: Parsed section value
+
+        Returns:
+            Updated ReportDB object or None
+        """
+        db_report = self.get_report(report_id)
+        if db_report:
+            db_report.content = {**(db_report.content or {}), section_name: section_json}
+            self.db.commit()
+            self.db.refresh(db_report)
+        return db_report
+
     def update_report_status(self, report_id: str, status: str, error_message: Optional[str] = None) -> Optional[ReportDB]:
         """
         ✅ Update the status of a report
@@ -103,6 +160,208 @@ class ReportService:
             self.db.refresh(db_report)
         return db_report
 
+class ReportWriteBatcher:
+    """
+    ✅ Batched async writer for report records
+
+    create/section/update calls are queued and every op that arrives within
+    REPORT_WRITE_BATCH_WINDOW is written in a single transaction
+    (bulk INSERT, section merges, bulk UPDATE by primary key), so concurrent report
+    generation pays for one commit instead of one per write.
+    The sync session is only ever used from the flusher, one batch at a time.
+    """
+    def __init__(self, db: Session,
+                 window: float = REPORT_WRITE_BATCH_WINDOW,
+                 max_size: int = REPORT_WRITE_BATCH_MAX_SIZE,
+                 executor: Optional[Executor] = None):
+        self.db = db
+        # Thread pool the commits run in (None = the loop's default executor)
+        self.executor = executor
+        self.window = window
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def create_report(self, report_in: report_models.ReportCreate, user_id: Optional[int] = None) -> str:
+        """Queue a new report record and return its ID once committed"""
+        now = datetime.now(timezone.utc)
+        report_id = f"report_{uuid.uuid4()}"
+        await self._submit("insert", {
+            "id": report_id,
+            "conversation_id": report_in.conversation_id,
+            "company_name": report_in.company_name,
+            "standard": report_in.standard,
+            "company_profile": report_in.company_profile,
+            "user_id": user_id,
+            "status": "generating",
+            "created_at": now,
+            "updated_at": now,
+        })
+        return report_id
+
+    async def update_report_content(self, report_id: str, content: dict) -> None:
+        """Queue the generated content and mark the report completed"""
+        now = datetime.now(timezone.utc)
+        await self._submit("update", {
+            "id": report_id,
+            "content": content,
+            "status": "completed",
+            "completed_at": now,
+            "updated_at": now,
+        })
+
+    async def append_section(self, report_id: str, section_name: str, section_json: Any) -> None:
+        """Queue a partial section merge into the report content"""
+        await self._submit("section", {"id": report_id, "section": (section_name, section_json)})
+
+    async def update_report_status(self, report_id: str, status: str, error_message: Optional[str] = None) -> None:
+        """Queue a status change"""
+        values = {"id": report_id, "status": status, "updated_at": datetime.now(timezone.utc)}
+        if error_message:
+            values["error_message"] = error_message
+        await self._submit("update", values)
+
+    async def _submit(self, op: str, values: Dict[str, Any]) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, values, future))
+        await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Flusher: collect ops for one window, then commit them together"""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                try:
+                    await loop.run_in_executor(self.executor, self._flush, batch)
+                except Exception as e:
+                    logger.error(f"Report write batch of {len(batch)} ops failed, retrying per report: {e}")
+                    await self._retry_per_report(batch)
+                else:
+                    _resolve(batch)
+        except asyncio.CancelledError:
+            _fail(batch, RuntimeError("Report writer closed"))
+            raise
+
+    async def _retry_per_report(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        """Re-run a failed batch one report at a time so only the failing report's ops fail"""
+        loop = asyncio.get_running_loop()
+        by_report: Dict[str, List[Tuple[str, Dict[str, Any], asyncio.Future]]] = {}
+        for item in batch:
+            by_report.setdefault(item[1]["id"], []).append(item)
+        for report_id, ops in by_report.items():
+            try:
+                await loop.run_in_executor(self.executor, self._flush, ops)
+            except Exception as e:
+                logger.error(f"Report write for {report_id} failed: {e}")
+                _fail(ops, e)
+            else:
+                _resolve(ops)
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        inserts = [values for op, values, _ in batch if op == "insert"]
+        updates = [values for op, values, _ in batch if op == "update"]
+        sections: Dict[str, Dict[str, Any]] = {}
+        for op, values, _ in batch:
+            if op == "section":
+                name, section_json = values["section"]
+                sections.setdefault(values["id"], {})[name] = section_json
+        try:
+            if inserts:
+                self.db.execute(insert(ReportDB), inserts)
+            for report_id, merged in sections.items():
+                db_report = self.db.get(ReportDB, report_id)
+                if db_report is not None:
+                    db_report.content = {**(db_report.content or {}), **merged}
+            if updates:
+                self.db.execute(update(ReportDB), updates)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    async def close(self) -> None:
+        """Stop the flusher and fail every op not yet committed; committed ops are unaffected"""
+        if self._queue is not None:
+            error = RuntimeError("Report writer closed")
+            while not self._queue.empty():
+                _fail([self._queue.get_nowait()], error)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def _resolve(ops: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+    for _, _, future in ops:
+        if not future.done():
+            future.set_result(None)
+
+
+def _fail(ops: List[Tuple[str, Dict[str, Any], asyncio.Future]], error: BaseException) -> None:
+    for _, _, future in ops:
+        if not future.done():
+            future.set_exception(error)
+
+
+async def fetch_report(report_id: str) -> Optional[ReportDB]:
+    """
+    ✅ Async lookup of a report by ID
+
+    Uses the asyncpg connection pool when PostgreSQL is configured;
+    otherwise runs the sync ORM lookup in a worker thread.
+    """
+    if db_session.AsyncSessionLocal is not None:
+        async with db_session.AsyncSessionLocal() as db:
+            return await db.get(ReportDB, report_id)
+    return await asyncio.to_thread(_fetch_report_sync, report_id)
+
+
+def _fetch_report_sync(report_id: str) -> Optional[ReportDB]:
+    db = db_session.SessionLocal()
+    try:
+        return ReportService(db).get_report(report_id)
+    finally:
+        db.close()
+
+
+async def fetch_report_version(report_id: str) -> Optional[Tuple[datetime, str]]:
+    """
+    ✅ Async lookup of only (updated_at, status) for a report
+
+    Cheap enough to run on every poll to decide whether the full row
+    needs to be loaded at all.
+    """
+    stmt = select(ReportDB.updated_at, ReportDB.status).where(ReportDB.id == report_id)
+    if db_session.AsyncSessionLocal is not None:
+        async with db_session.AsyncSessionLocal() as db:
+            row = (await db.execute(stmt)).first()
+    else:
+        row = await asyncio.to_thread(_fetch_row_sync, stmt)
+    return tuple(row) if row is not None else None
+
+
+def _fetch_row_sync(stmt):
+    db = db_session.SessionLocal()
+    try:
+        return db.execute(stmt).first()
+    finally:
+        db.close()
+
+
 def get_report_service(db: Session = Depends(get_db)):
     """
     ✅ Dependency injector for the ReportService
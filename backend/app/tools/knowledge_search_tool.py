@@ -3,14 +3,126 @@
 为Agent提供从私有知识库中检索相关信息的能力
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
 from abc import ABC, abstractmethod
 
+import numpy as np
+import orjson
+
 from app.vector_store.chroma_db import get_chroma_manager
 
 logger = logging.getLogger(__name__)
 
+# 查询向量缓存条目上限
+QUERY_EMBEDDING_CACHE_SIZE = 10_000
+
+# 向量检索微批：收集窗口（秒）与单批最大查询数
+SEARCH_BATCH_WINDOW = 0.005
+SEARCH_BATCH_MAX_SIZE = 8
+
+# ChromaDB查询结果中按查询分列的字段（其余字段如 included 为整批共享）
+_PER_QUERY_FIELDS = ("ids", "embeddings", "documents", "uris", "data", "metadatas", "distances")
+
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def embed_query(text: str) -> np.ndarray:
+    """
+    将查询文本向量化（与知识库使用同一嵌入模型）
+    
+    向量与用户无关，按文本缓存；以只读float32数组保存，重复查询不再调用嵌入接口。
+    """
+    embedding_model = get_chroma_manager().embedding_function._langchain_embedding
+    vector = np.asarray(embedding_model.embed_query(text), dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+class KnowledgeSearchBatcher:
+    """
+    向量检索微批处理器
+    
+    同一窗口内到达的检索按（集合、过滤条件、结果数）分组，每组只发起一次
+    携带多个query_embeddings的collection.query，再把结果按查询拆分返回，
+    并发聊天请求共享一次往返。查询在线程中执行，不阻塞事件循环。
+    """
+    
+    def __init__(self, window: float = SEARCH_BATCH_WINDOW,
+                 max_size: int = SEARCH_BATCH_MAX_SIZE):
+        self.window = window
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 正在执行的分组查询，保留引用避免任务被回收
+        self._flushes: Set[asyncio.Task] = set()
+    
+    async def query(self, collection: Any, query_vector: np.ndarray,
+                    n_results: int, where: Dict[str, Any]) -> Dict[str, Any]:
+        """排队一次向量查询，返回该查询自己的ChromaDB结果"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue))
+        future = loop.create_future()
+        key = (id(collection), n_results, orjson.dumps(where, option=orjson.OPT_SORT_KEYS))
+        await self._queue.put((key, collection, query_vector, n_results, where, future))
+        return await future
+    
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """收集一个窗口内的查询，按分组合并执行；查询在后台进行，不阻塞下一个窗口的收集"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            groups: Dict[Tuple, List[Tuple]] = {}
+            for item in batch:
+                groups.setdefault(item[0], []).append(item)
+            for group in groups.values():
+                task = asyncio.create_task(self._flush(group))
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+    
+    async def _flush(self, group: List[Tuple]) -> None:
+        _, collection, _, n_results, where, _ = group[0]
+        futures = [item[5] for item in group]
+        try:
+            results = await asyncio.to_thread(
+                collection.query,
+                query_embeddings=[item[2].tolist() for item in group],
+                n_results=n_results,
+                where=where
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for i, future in enumerate(futures):
+            if not future.done():
+                future.set_result({
+                    field: [value[i]] if field in _PER_QUERY_FIELDS and value is not None else value
+                    for field, value in results.items()
+                })
+
+
+# 进程内共享的检索批处理器
+search_batcher = KnowledgeSearchBatcher()
+
 
 class KnowledgeSearchTool:
     """
@@ -48,7 +160,8 @@ class KnowledgeSearchTool:
     
     async def search(self, query: str, n_results: int = 5,
                     document_types: Optional[List[str]] = None,
-                    category_filter: Optional[str] = None) -> str:
+                    category_filter: Optional[str] = None,
+                    format: bool = True) -> Union[str, Dict[str, Any]]:
         """
         执行知识库搜索
         
@@ -57,9 +170,40 @@ class KnowledgeSearchTool:
             n_results: 返回结果数量
             document_types: 文档类型过滤
             category_filter: 分类过滤
+            format: 是否格式化为文本；为False时返回 {"found", "chunks"} 结构
+            
+        Returns:
+            格式化的搜索结果字符串，或结构化的搜索结果
+        """
+        try:
+            query_vector = await asyncio.to_thread(embed_query, query)
+        except Exception as e:
+            logger.error(f"❌ Knowledge search failed: {e}")
+            result = {"found": False, "chunks": [], "error": str(e)}
+            return self.format_results(result, query) if format else result
+        
+        return await self.search_by_vector(
+            query_vector, query, n_results, document_types, category_filter, format
+        )
+    
+    async def search_by_vector(self, query_vector: np.ndarray, query: str = "",
+                               n_results: int = 5,
+                               document_types: Optional[List[str]] = None,
+                               category_filter: Optional[str] = None,
+                               format: bool = True) -> Union[str, Dict[str, Any]]:
+        """
+        使用已计算的查询向量执行知识库搜索
+        
+        Args:
+            query_vector: 查询向量
+            query: 原始查询文本（用于结果格式化）
+            n_results: 返回结果数量
+            document_types: 文档类型过滤
+            category_filter: 分类过滤
+            format: 是否格式化为文本；为False时返回 {"found", "chunks"} 结构
             
         Returns:
-            格式化的搜索结果字符串
+            格式化的搜索结果字符串，或结构化的搜索结果
         """
         try:
             await self._ainit_components()
@@ -68,31 +212,74 @@ class KnowledgeSearchTool:
             
             # 执行向量搜索
             search_results = await self._vector_search(
-                query, n_results, document_types, category_filter
+                query_vector, n_results, document_types, category_filter
             )
             
-            if not search_results or len(search_results.get('documents', [[]])[0]) == 0:
+            chunks = self._extract_chunks(search_results)
+            if chunks:
+                logger.info(f"✅ Knowledge search completed: {len(chunks)} results found")
+            else:
                 logger.info(f"📭 No relevant documents found for query: '{query}'")
-                return self._format_no_results_response(query)
-            
-            # 格式化搜索结果
-            formatted_results = await self._format_search_results(search_results, query)
-            
-            logger.info(f"✅ Knowledge search completed: {len(search_results['documents'][0])} results found")
-            return formatted_results
+            result = {"found": bool(chunks), "chunks": chunks}
             
         except Exception as e:
             logger.error(f"❌ Knowledge search failed: {e}")
-            return f"抱歉，在搜索知识库时遇到错误：{str(e)}"
+            result = {"found": False, "chunks": [], "error": str(e)}
+        
+        return self.format_results(result, query) if format else result
     
-    async def _vector_search(self, query: str, n_results: int,
+    def format_results(self, result: Dict[str, Any], query: str) -> str:
+        """
+        将结构化搜索结果格式化为可读文本
+        
+        Args:
+            result: search(format=False) 返回的结构化结果
+            query: 原始查询
+            
+        Returns:
+            格式化的结果字符串
+        """
+        if "error" in result:
+            return f"抱歉，在搜索知识库时遇到错误：{result['error']}"
+        if not result["found"]:
+            return self._format_no_results_response(query)
+        return self._format_chunks(result["chunks"], query)
+    
+    @staticmethod
+    def _extract_chunks(search_results: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        将ChromaDB查询结果整理为文档片段列表
+        
+        Args:
+            search_results: ChromaDB查询结果
+            
+        Returns:
+            片段列表，每项包含 content、metadata、similarity
+        """
+        if not search_results:
+            return []
+        documents = search_results.get('documents', [[]])[0]
+        metadatas = search_results.get('metadatas', [[]])[0]
+        distances = search_results.get('distances', [[]])[0]
+        
+        return [
+            {
+                "content": doc,
+                "metadata": metadata or {},
+                # 计算相似度得分（距离越小，相似度越高）
+                "similarity": max(0, 1 - distance) if distance is not None else 0
+            }
+            for doc, metadata, distance in zip(documents, metadatas, distances)
+        ]
+    
+    async def _vector_search(self, query_vector: np.ndarray, n_results: int,
                            document_types: Optional[List[str]] = None,
                            category_filter: Optional[str] = None) -> Dict[str, Any]:
         """
         执行向量相似度搜索
         
         Args:
-            query: 搜索查询
+            query_vector: 查询向量
             n_results: 结果数量
             document_types: 文档类型过滤
             category_filter: 分类过滤
@@ -116,15 +303,10 @@ class KnowledgeSearchTool:
             # 只搜索已完成处理的文档
             where_filter["status"] = "completed"
             
-            # 执行向量搜索
-            if where_filter:
-                results = self.chroma_manager.collection.query(
-                    query_texts=[query],
-                    n_results=n_results,
-                    where=where_filter
-                )
-            else:
-                results = self.chroma_manager.query(query, n_results)
+            # 执行向量搜索（与并发的同条件查询合并为一次请求）
+            results = await search_batcher.query(
+                self.chroma_manager.collection, query_vector, n_results, where_filter
+            )
             
             return results
             
@@ -132,33 +314,26 @@ class KnowledgeSearchTool:
             logger.error(f"向量搜索失败: {e}")
             raise
     
-    async def _format_search_results(self, search_results: Dict[str, Any], query: str) -> str:
+    def _format_chunks(self, chunks: List[Dict[str, Any]], query: str) -> str:
         """
-        格式化搜索结果为可读的文本
+        格式化文档片段为可读的文本
         
         Args:
-            search_results: ChromaDB搜索结果
+            chunks: 文档片段列表
             query: 原始查询
             
         Returns:
             格式化的结果字符串
         """
         try:
-            documents = search_results.get('documents', [[]])[0]
-            metadatas = search_results.get('metadatas', [[]])[0]
-            distances = search_results.get('distances', [[]])[0]
-            
-            if not documents:
-                return self._format_no_results_response(query)
-            
             # 构建结果字符串
             result_parts = [
                 f"基于知识库搜索 \"{query}\"，找到以下相关信息：\n"
             ]
             
-            for i, (doc, metadata, distance) in enumerate(zip(documents, metadatas, distances)):
-                # 计算相似度得分（距离越小，相似度越高）
-                similarity_score = max(0, 1 - distance) if distance is not None else 0
+            for i, chunk in enumerate(chunks):
+                doc = chunk["content"]
+                metadata = chunk["metadata"]
                 
                 # 获取文档信息
                 filename = metadata.get('filename', '未知文档')
@@ -170,7 +345,7 @@ class KnowledgeSearchTool:
                 
                 result_parts.append(
                     f"📄 **来源{i+1}**: {filename} ({doc_type}) {page_info}\n"
-                    f"🎯 **相关度**: {similarity_score:.2%}\n"
+                    f"🎯 **相关度**: {chunk['similarity']:.2%}\n"
                     f"📝 **内容摘录**:\n{content}\n"
                     f"{'─' * 50}\n"
                 )
@@ -199,9 +374,15 @@ class KnowledgeSearchTool:
         )
 
 
+# 缓存的用户搜索工具数量上限
+SEARCH_TOOL_POOL_SIZE = 512
+
+_tool_pool: "OrderedDict[Optional[str], KnowledgeSearchTool]" = OrderedDict()
+
+
 def create_knowledge_search_tool(user_id: Optional[str] = None) -> KnowledgeSearchTool:
     """
-    创建知识库搜索工具实例
+    获取知识库搜索工具实例（每个用户一个，按LRU复用）
     
     Args:
         user_id: 用户ID
@@ -209,4 +390,12 @@ def create_knowledge_search_tool(user_id: Optional[str] = None) -> KnowledgeSear
     Returns:
         KnowledgeSearchTool实例
     """
-    return KnowledgeSearchTool(user_id=user_id) 
+    tool = _tool_pool.get(user_id)
+    if tool is None:
+        tool = _tool_pool[user_id] = KnowledgeSearchTool(user_id=user_id)
+        if len(_tool_pool) > SEARCH_TOOL_POOL_SIZE:
+            _tool_pool.popitem(last=False)
+    else:
+        _tool_pool.move_to_end(user_id)
+    return tool
+
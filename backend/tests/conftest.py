@@ -46,6 +46,31 @@ class SyncASGITestClient:
         return self.request("POST", url, **kwargs)
 
 
+class StubEmbeddings:
+    """Embedding model stand-in: maps text to a fixed vector and counts calls."""
+
+    def __init__(self, vectors=None, default=(0.0, 0.0, 1.0)):
+        self.vectors = vectors or {}
+        self.default = list(default)
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self.vectors.get(text, self.default)
+
+
+@pytest.fixture
+def stub_embeddings():
+    return StubEmbeddings
+
+
+@pytest.fixture
+def app_env(monkeypatch):
+    """Test settings with the ORM models registered (app.db must load before app.models)."""
+    monkeypatch.setenv("ENV_STATE", "test")
+    import app.db  # noqa: F401
+
+
 def _clear_app_modules() -> None:
     for module_name in list(sys.modules):
         if module_name == "app" or module_name.startswith("app."):
@@ -0,0 +1,31 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.assessment_engine import run_4d_assessment
+
+
+SAMPLE_PROFILE = {
+    "basic_profile": {"industry_category": "制造业"},
+    "esg_risk_mapping": {
+        "environmental_risks": {"level": "高", "specific_risks": ["碳排放", "废水"]},
+        "social_risks": {"level": "中", "specific_risks": ["员工安全"]},
+    },
+    "esg_maturity_assessment": {
+        "maturity_stage": "起步阶段",
+        "improvement_potential": "高",
+        "supporting_evidence": ["已制定环境政策"],
+    },
+    "data_completeness": 0.8,
+}
+
+
+def test_run_4d_assessment_in_process_pool():
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver")) as pool:
+        result = pool.submit(run_4d_assessment, SAMPLE_PROFILE).result(timeout=60)
+
+    assert result["assessment_summary"]["top_risks"] == ["碳排放", "废水"]
+    benchmark = result["detailed_assessment"]["benchmark_comparison"]["industry_benchmark"]
+    assert benchmark["key_challenges"] == ["碳减排", "供应链管理", "员工安全"]
+    # The result crosses the process boundary again when cached or forwarded.
+    assert pickle.loads(pickle.dumps(result)) == result
@@ -0,0 +1,87 @@
+import pytest
+
+from app.core.chat_cache import ChatSemanticCache
+
+
+@pytest.fixture
+def cache(stub_embeddings):
+    chat_cache = ChatSemanticCache(max_entries=2)
+    chat_cache._embedding_model = stub_embeddings({
+        "公司的ESG政策是什么？": [1.0, 0.0, 0.0],
+        "公司ESG政策是什么": [0.95, 0.1, 0.0],
+        "员工培训计划": [0.0, 1.0, 0.0],
+        "社区项目": [0.0, 0.7, 0.7],
+    })
+    return chat_cache
+
+
+async def test_similar_question_hits_same_user_only(cache):
+    probe = await cache.lookup("u1", "公司的ESG政策是什么？")
+    assert probe.response is None
+    cache.store(probe, {"response": "policy"})
+
+    hit = await cache.lookup("u1", "公司ESG政策是什么")
+    assert hit.response == {"response": "policy"}
+    hit.response["response"] = "mutated"
+    assert (await cache.lookup("u1", "公司ESG政策是什么")).response == {"response": "policy"}
+
+    assert (await cache.lookup("u2", "公司ESG政策是什么")).response is None
+    assert (await cache.lookup("u1", "员工培训计划")).response is None
+
+
+async def test_expired_entries_miss(cache):
+    cache.ttl = -1
+    probe = await cache.lookup("u1", "公司的ESG政策是什么？")
+    cache.store(probe, {"response": "policy"})
+
+    assert (await cache.lookup("u1", "公司的ESG政策是什么？")).response is None
+    assert cache._partitions["u1"].entries == {}
+
+
+async def test_partition_evicts_least_recently_used(cache):
+    for question in ("公司的ESG政策是什么？", "员工培训计划"):
+        probe = await cache.lookup("u1", question)
+        cache.store(probe, {"response": question})
+    # Touch the first entry so the second becomes least recently used.
+    await cache.lookup("u1", "公司的ESG政策是什么？")
+    probe = await cache.lookup("u1", "社区项目")
+    cache.store(probe, {"response": "社区项目"})
+
+    assert (await cache.lookup("u1", "公司的ESG政策是什么？")).response is not None
+    assert (await cache.lookup("u1", "员工培训计划")).response is None
+
+
+async def test_partitions_are_bounded(cache):
+    cache.max_partitions = 2
+    for user_id in ("u1", "u2", "u3"):
+        probe = await cache.lookup(user_id, "员工培训计划")
+        cache.store(probe, {"response": user_id})
+
+    assert list(cache._partitions) == ["u2", "u3"]
+
+
+async def test_invalidate_user_drops_only_that_partition(cache):
+    for user_id in ("1", "2"):
+        probe = await cache.lookup(user_id, "员工培训计划")
+        cache.store(probe, {"response": user_id})
+
+    cache.invalidate_user(1)
+
+    assert (await cache.lookup("1", "员工培训计划")).response is None
+    assert (await cache.lookup("2", "员工培训计划")).response == {"response": "2"}
+
+
+def test_quantized_vectors_preserve_cosine_similarity():
+    import numpy as np
+    from app.core.chat_cache import quantize
+
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal((2, 1536)).astype(np.float32)
+    a /= np.linalg.norm(a)
+    b = a + 0.3 * b / np.linalg.norm(b)
+    b /= np.linalg.norm(b)
+
+    (qa, sa), (qb, sb) = quantize(a), quantize(b)
+    assert qa.dtype == np.int8
+    approx = int(np.matmul(qa, qb, dtype=np.int32)) * sa * sb
+    assert abs(approx - float(a @ b)) < 0.01
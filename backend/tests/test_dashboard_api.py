@@ -0,0 +1,41 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(app_env):
+    from app.api.v1 import dashboard
+
+    app = FastAPI()
+    app.include_router(dashboard.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/dashboard/metrics", "/api/v1/dashboard/system-status"])
+def test_static_endpoints_revalidate_with_etag(client, path):
+    first = client.get(path)
+    assert first.json()["success"] is True
+    etag = first.headers["etag"]
+
+    second = client.get(path, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+
+def test_overview_timestamps_are_filled(client):
+    data = client.get("/api/v1/dashboard/overview").json()["data"]
+    assert "__NOW" not in str(data)
+    assert [a["id"] for a in data["recent_activities"]] == ["activity_1", "activity_2"]
+
+
+def test_static_payloads_match_response_models(app_env):
+    import orjson
+    from app.api.v1 import dashboard
+    from app.core.response import fill_now
+
+    dashboard.DashboardData.model_validate(orjson.loads(fill_now(dashboard._OVERVIEW_JSON)))
+    for row in orjson.loads(fill_now(dashboard._SYSTEM_STATUS_JSON)):
+        dashboard.SystemStatus.model_validate(row)
+    for row in dashboard._RECENT_ACTIVITY_ROWS_JSON:
+        dashboard.RecentActivity.model_validate(orjson.loads(fill_now(row)))
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def esg(app_env):
+    from app.api.v1 import esg
+
+    esg._assessment_cache.clear()
+    yield esg
+    esg._assessment_cache.clear()
+
+
+@pytest.fixture
+def client(esg):
+    app = FastAPI()
+    app.include_router(esg.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def test_sibling_routes_share_cached_assessment(esg, client, monkeypatch):
+    calls = []
+    build = esg._build_assessment
+
+    def counting_build(assessment_id):
+        calls.append(assessment_id)
+        return build(assessment_id)
+
+    monkeypatch.setattr(esg, "_build_assessment", counting_build)
+
+    categories = client.get("/api/v1/esg/categories", params={"company_id": "c1"})
+    assert [c["code"] for c in categories.json()["data"]] == ["E", "S", "G"]
+
+    summary = client.get("/api/v1/esg/summary", params={"company_id": "c1"}).json()["data"]
+    assert summary["total_indicators"] == sum(summary["status_distribution"].values())
+
+    indicator = client.get("/api/v1/esg/indicators/e1-1", params={"company_id": "c1"})
+    assert indicator.json()["data"]["code"] == "E1-1"
+
+    assert calls == [None]
+
+
+def test_unknown_indicator_returns_404(client):
+    response = client.get("/api/v1/esg/indicators/missing")
+    assert response.status_code == 404
+
+
+def test_constructed_assessment_passes_validation(esg):
+    data = esg._build_assessment("a1")
+    assert esg.ESGAssessmentData.model_validate(data.model_dump()) == data
+
+
+def test_assessment_revalidates_with_etag(client):
+    first = client.get("/api/v1/esg/assessment", params={"company_id": "c1"})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, max-age=30"
+
+    second = client.get(
+        "/api/v1/esg/assessment", params={"company_id": "c1"}, headers={"If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.content == b""
@@ -0,0 +1,298 @@
+import asyncio
+import json
+
+import pytest
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """Streams one report for single-company prompts and an array for batched prompts."""
+
+    def __init__(self, single_report='{"executive_summary": "single"}', chunk_size=7):
+        self.calls = 0
+        self.single_report = single_report
+        self.chunk_size = chunk_size
+
+    async def astream(self, messages):
+        self.calls += 1
+        user_prompt = messages[-1].content
+        if "JSON数组" in user_prompt:
+            size = int(user_prompt.split("以下是")[1].split("家")[0])
+            content = json.dumps([{"index": i} for i in range(size)])
+        else:
+            content = self.single_report
+        for start in range(0, len(content), self.chunk_size):
+            yield _Chunk(content[start:start + self.chunk_size])
+
+
+@pytest.fixture
+async def agent(app_env, monkeypatch):
+    from app.agents.esg_report_agent import ESGReportAgent
+    from app.core.report_cache import report_cache
+
+    monkeypatch.setattr(report_cache, "_semantic_enabled", False)
+    report_cache.clear()
+    agent = ESGReportAgent()
+    agent.llm = FakeLLM()
+    await agent.initialize()
+    yield agent
+    await agent.cleanup()
+    report_cache.clear()
+
+
+async def test_concurrent_reports_share_one_llm_call(agent):
+    results = await asyncio.gather(*[
+        agent._generate_report_content({"company_name": f"c{i}"}, {}, "GRI")
+        for i in range(5)
+    ])
+
+    assert results == [{"index": i} for i in range(5)]
+    assert agent.llm.calls == 1
+
+
+async def test_single_report_uses_single_prompt(agent):
+    result = await agent._generate_report_content({"company_name": "solo"}, {}, "GRI")
+
+    assert result == {"executive_summary": "single"}
+    assert agent.llm.calls == 1
+
+
+async def test_report_locks_are_bounded(agent, monkeypatch):
+    from app.agents import esg_report_agent
+
+    monkeypatch.setattr(esg_report_agent, "REPORT_LOCKS_MAX_SIZE", 2)
+    busy = agent._get_report_lock("busy")
+    await busy.acquire()
+    for cid in ("a", "b", "c"):
+        agent._get_report_lock(cid)
+
+    assert len(agent._report_locks) == 2
+    assert agent._report_locks.get("busy") is busy
+    busy.release()
+
+
+async def test_report_locks_with_waiters_are_not_evicted(agent, monkeypatch):
+    from app.agents import esg_report_agent
+
+    monkeypatch.setattr(esg_report_agent, "REPORT_LOCKS_MAX_SIZE", 2)
+    handed_off = agent._get_report_lock("handed-off")
+    await handed_off.acquire()
+    waiter = asyncio.create_task(handed_off.acquire())
+    await asyncio.sleep(0)
+    handed_off.release()
+    assert not handed_off.locked()
+
+    for cid in ("a", "b"):
+        agent._get_report_lock(cid)
+
+    assert agent._report_locks.get("handed-off") is handed_off
+    await waiter
+    handed_off.release()
+
+
+async def test_duplicate_report_request_reuses_inflight_task(agent):
+    from app.bus import A2AMessage, MessageType
+
+    class FakeReportService:
+        def find_completed_report(self, *args):
+            return None
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+    generated, sent = [], []
+
+    async def fake_generate(message):
+        generated.append(message)
+        started.set()
+        await release.wait()
+        return agent._build_success_message(message, "report_1", "Acme")
+
+    async def fake_send(message):
+        sent.append(message)
+
+    agent.report_service = FakeReportService()
+    agent.generate_report_and_notify = fake_generate
+    agent.send_message = fake_send
+
+    def request(sender):
+        return A2AMessage(
+            conversation_id="conv", task_id=f"task-{sender}", from_agent=sender, to_agent=agent.agent_id,
+            message_type=MessageType.REQUEST, action="generate_esg_report",
+            payload={"company_profile": {"company_name": "Acme"}, "standard": "GRI"},
+        )
+
+    await agent.handle_generate_report_request(request("first"))
+    await started.wait()
+    await agent.handle_generate_report_request(request("second"))
+    release.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert len(generated) == 1
+    (forwarded,) = sent
+    assert (forwarded.to_agent, forwarded.task_id) == ("second", "task-second")
+    assert forwarded.action == "report_generated_success"
+    assert forwarded.payload["report_id"] == "report_1"
+    assert forwarded.payload["company_profile_ref"] == {"report_id": "report_1"}
+    assert "company_profile" not in forwarded.payload
+    assert agent._inflight == {}
+
+
+async def test_concurrent_duplicate_report_requests_share_one_generation(agent):
+    from app.bus import A2AMessage, MessageType
+
+    lookups = []
+
+    class FakeReportService:
+        def find_completed_report(self, *args):
+            lookups.append(args)
+            return None
+
+    generated, sent = [], []
+
+    async def fake_generate(message):
+        generated.append(message)
+        await asyncio.sleep(0)
+        return agent._build_success_message(message, "report_1", "Acme")
+
+    async def fake_send(message):
+        sent.append(message)
+
+    agent.report_service = FakeReportService()
+    agent.generate_report_and_notify = fake_generate
+    agent.send_message = fake_send
+
+    def request(sender):
+        return A2AMessage(
+            conversation_id="conv", task_id=f"task-{sender}", from_agent=sender, to_agent=agent.agent_id,
+            message_type=MessageType.REQUEST, action="generate_esg_report",
+            payload={"company_profile": {"company_name": "Acme"}, "standard": "GRI"},
+        )
+
+    await asyncio.gather(
+        agent.handle_generate_report_request(request("first")),
+        agent.handle_generate_report_request(request("second")),
+    )
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    assert len(lookups) == 1
+    assert len(generated) == 1
+    assert [message.to_agent for message in sent] == ["second"]
+    assert agent._inflight == {}
+
+
+def test_section_scanner_emits_sections_as_they_close():
+    from app.agents.esg_report_agent import _ReportSectionScanner
+
+    scanner = _ReportSectionScanner()
+    text = '{"executive_summary": "a, \\"b\\" }", "risks": {"items": [1, {"x": "]"}]}, "score": 7}'
+    emitted = [section for i in range(0, len(text), 5) for section in scanner.feed(text[i:i + 5])]
+
+    assert emitted == [
+        (0, "executive_summary", 'a, "b" }'),
+        (0, "risks", {"items": [1, {"x": "]"}]}),
+        (0, "score", 7),
+    ]
+
+
+def test_section_scanner_tracks_reports_in_array():
+    from app.agents.esg_report_agent import _ReportSectionScanner
+
+    scanner = _ReportSectionScanner()
+    assert scanner.feed('[{"a": 1, "b": [2]}, {"a": 3}]') == [(0, "a", 1), (0, "b", [2]), (1, "a", 3)]
+
+
+def test_section_scanner_discards_consumed_text():
+    from app.agents.esg_report_agent import _ReportSectionScanner
+
+    scanner = _ReportSectionScanner()
+    scanner.feed("{")
+    for i in range(100):
+        assert scanner.feed(f'"s{i}": "{"x" * 50}", ') == [(0, f"s{i}", "x" * 50)]
+        assert len(scanner._text) < 10
+    assert scanner.feed('"last": {"a": ') == []
+    assert scanner.feed("1}}") == [(0, "last", {"a": 1})]
+
+
+async def test_streamed_sections_reach_callback(agent):
+    agent.llm = FakeLLM('{"executive_summary": "hello", "company_overview": {"name": "Acme"}}')
+    sections = []
+
+    async def on_section(name, value):
+        sections.append((name, value))
+
+    result = await agent._generate_report_content({"company_name": "Acme"}, {}, "GRI", on_section)
+
+    assert result == {"executive_summary": "hello", "company_overview": {"name": "Acme"}}
+    assert sections == list(result.items())
+
+
+async def test_section_writes_run_outside_llm_slot(agent):
+    agent.llm = FakeLLM('{"executive_summary": "hello", "company_overview": {"name": "Acme"}}')
+    agent._llm_sem = asyncio.Semaphore(1)
+    release = asyncio.Event()
+    started = []
+
+    async def on_section(name, value):
+        started.append(name)
+        await release.wait()
+
+    task = asyncio.create_task(agent._generate_report_content({"company_name": "Acme"}, {}, "GRI", on_section))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if len(started) == 2 and not agent._llm_sem.locked():
+            break
+
+    assert started == ["executive_summary", "company_overview"]
+    assert not agent._llm_sem.locked()
+    assert not task.done()
+    release.set()
+    assert await task == {"executive_summary": "hello", "company_overview": {"name": "Acme"}}
+
+
+async def test_llm_calls_are_bounded_by_semaphore(agent):
+    active = peak = 0
+
+    class SlowLLM(FakeLLM):
+        async def astream(self, messages):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            async for chunk in super().astream(messages):
+                yield chunk
+            active -= 1
+
+    agent.llm = SlowLLM()
+    agent._llm_sem = asyncio.Semaphore(2)
+    await asyncio.gather(*[
+        agent._generate_report_content({"company_name": f"c{i}"}, {}, standard)
+        for i, standard in enumerate(["GRI", "SASB", "TCFD", "GRI-2", "SASB-2"])
+    ])
+
+    assert agent.llm.calls == 5
+    assert peak == 2
+
+
+def test_notifications_are_built_from_templates(agent):
+    from app.bus import A2AMessage, MessageType
+
+    request = A2AMessage(
+        conversation_id="conv", task_id="t", from_agent="caller", to_agent=agent.agent_id,
+        message_type=MessageType.REQUEST, action="generate_esg_report", payload={},
+    )
+    first = agent._build_success_message(request, "r1", "Acme")
+    second = agent._build_success_message(request, "r2", "Acme")
+    failure = agent._build_failure_message(request, "r3", ValueError("boom"))
+
+    assert (first.from_agent, first.to_agent, first.message_type) == (agent.agent_id, "caller", MessageType.RESPONSE)
+    assert first.message_id != second.message_id
+    assert agent._success_template.payload == {}
+    assert (failure.message_type, failure.action, failure.payload["details"]) == (
+        MessageType.ERROR, "report_generated_failed", "boom"
+    )
@@ -0,0 +1,172 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def extraction(app_env):
+    from app.api.v1 import extraction
+
+    return extraction
+
+
+class FakeExtractionService:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = 0
+        self.peak = 0
+
+    async def extract_information(self, document_id, user_id):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if document_id in self.fail:
+            raise ValueError("boom")
+        return SimpleNamespace(processing_time=0.01)
+
+
+async def test_batch_extraction_runs_documents_concurrently(extraction, monkeypatch):
+    monkeypatch.setattr(extraction.settings, "BATCH_EXTRACTION_CONCURRENCY", 3)
+    service = FakeExtractionService(fail={"d2"})
+
+    await extraction._process_batch_extraction(
+        "task-concurrent", [f"d{i}" for i in range(6)], "u1", ["summary"], service
+    )
+
+    assert service.peak == 3
+
+    status = (await extraction.get_batch_status("task-concurrent")).data
+    assert status["status"] == "completed"
+    assert status["progress"] == 100
+    assert status["processed_count"] == status["total_count"] == 6
+    failed = [r["document_id"] for r in status["results"] if r["status"] == "failed"]
+    assert failed == ["d2"]
+
+
+async def test_unknown_batch_task_returns_404(extraction):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as excinfo:
+        await extraction.get_batch_status("missing-task")
+    assert excinfo.value.status_code == 404
+
+
+async def test_batch_stream_emits_progress_until_done(extraction):
+    import orjson
+
+    service = FakeExtractionService()
+    await extraction._process_batch_extraction("task-stream", ["a", "b"], "u1", ["summary"], service)
+
+    response = await extraction.stream_batch_status("task-stream")
+    assert response.media_type == "text/event-stream"
+    events = [chunk async for chunk in response.body_iterator]
+
+    assert len(events) == 1
+    assert events[0].startswith(b"data: ") and events[0].endswith(b"\n\n")
+    event = orjson.loads(events[0][len(b"data: "):])
+    assert event["status"] == "completed"
+    assert sorted(r["document_id"] for r in event["results"]) == ["a", "b"]
+
+
+async def test_analyze_stream_emits_summary_first(extraction, monkeypatch):
+    import orjson
+    from datetime import datetime
+    from app.services.extraction_service import DocumentSummary, ExtractedEntity
+
+    monkeypatch.setattr(extraction, "ANALYZE_STREAM_CHUNK_SIZE", 2)
+    service = FakeExtractionService()
+    summary = DocumentSummary("报告", "简要", "详细", [], "结构", 0.8)
+
+    async def summary_only(document_id, user_id):
+        return summary
+
+    async def tags_only(document_id, user_id):
+        return ["ESG"]
+
+    async def extract_information(document_id, user_id):
+        return SimpleNamespace(
+            document_id=document_id, document_name="报告", summary=summary, tags=["ESG"],
+            entities=[ExtractedEntity(f"e{i}", "组织机构", 0.9, "", i) for i in range(3)],
+            key_information=[], word_count=10, paragraph_count=2, section_count=1,
+            extraction_timestamp=datetime(2024, 1, 1), processing_time=0.1
+        )
+
+    service.extract_summary_only = summary_only
+    service.extract_tags_only = tags_only
+    service.extract_information = extract_information
+
+    request = extraction.ExtractionRequest(document_id="d1", user_id="u1")
+    response = await extraction.analyze_document_stream(request, service)
+    assert response.media_type == "application/x-ndjson"
+    events = [orjson.loads(line) async for line in response.body_iterator]
+
+    assert [e["event"] for e in events] == ["summary", "tags", "entities", "entities", "done"]
+    assert events[0]["data"]["title"] == "报告"
+    assert [e["text"] for e in events[3]["data"]] == ["e2"]
+    assert events[-1]["data"]["extraction_timestamp"] == "2024-01-01T00:00:00"
+
+
+def test_batch_request_dedupes_and_rejects_empty(extraction):
+    from pydantic import ValidationError
+
+    request = extraction.BatchExtractionRequest(document_ids=["a", "b", "a"], user_id="u1")
+    assert request.document_ids == ["a", "b"]
+
+    with pytest.raises(ValidationError):
+        extraction.BatchExtractionRequest(document_ids=[], user_id="u1")
+
+
+async def test_analyze_reuses_serialized_result(extraction):
+    import orjson
+    from datetime import datetime
+    from app.services.extraction_service import DocumentSummary, ExtractedEntity, ExtractionResult, KeyInformation
+
+    result = ExtractionResult(
+        document_id="d1", document_name="报告",
+        summary=DocumentSummary("报告", "简要", "详细", ["要点"], "结构", 0.8),
+        key_information=[KeyInformation("营收增长", 0.9, "财务状况", ["营收"], "第一章")],
+        entities=[ExtractedEntity("A公司", "组织机构", 0.9, "A公司发布报告", 0)],
+        tags=["ESG"], word_count=10, paragraph_count=2, section_count=1,
+        extraction_timestamp=datetime(2024, 1, 1, 8, 30, 0, 123456), processing_time=0.1
+    )
+    service = FakeExtractionService()
+
+    async def extract_information(document_id, user_id):
+        return result
+
+    service.extract_information = extract_information
+    extraction._analyze_payload_cache.clear()
+
+    request = extraction.ExtractionRequest(document_id="d1", user_id="u1")
+    first = await extraction.analyze_document(request, service)
+    body = orjson.loads(first.body)
+    data = extraction.ExtractionResultResponse.model_validate(body["data"])
+    assert data.extraction_timestamp == result.extraction_timestamp.isoformat()
+    assert data.entities[0].text == "A公司"
+
+    await extraction.analyze_document(request, service)
+    assert extraction._analyze_payload("u1", result) is extraction._analyze_payload_cache[("d1", "u1")][1]
+    assert len(extraction._analyze_payload_cache) == 1
+
+
+async def test_batch_status_writes_are_coalesced(extraction, monkeypatch):
+    monkeypatch.setattr(extraction.settings, "BATCH_EXTRACTION_CONCURRENCY", 6)
+    cache_set = extraction.hybrid_cache.set
+    writes = []
+
+    async def slow_set(key, value, ttl=None):
+        writes.append(value["processed_count"])
+        await asyncio.sleep(0.02)
+        return await cache_set(key, value, ttl)
+
+    monkeypatch.setattr(extraction.hybrid_cache, "set", slow_set)
+    await extraction._process_batch_extraction(
+        "task-coalesce", [f"d{i}" for i in range(6)], "u1", ["summary"], FakeExtractionService()
+    )
+
+    assert len(writes) < 7
+    status = (await extraction.get_batch_status("task-coalesce")).data
+    assert status["status"] == "completed"
+    assert status["processed_count"] == 6
@@ -0,0 +1,134 @@
+import pytest
+
+
+@pytest.fixture
+def service(app_env, monkeypatch):
+    from app.services.extraction_service import InformationExtractionService
+
+    service = InformationExtractionService()
+    calls = []
+
+    async def fake_extract(document_id, user_id):
+        calls.append((document_id, user_id))
+        return {"document_id": document_id, "run": len(calls)}
+
+    monkeypatch.setattr(service, "_extract_information", fake_extract)
+    service.calls = calls
+    return service
+
+
+async def test_cached_decorator_returns_awaited_result():
+    from app.core.cache import cached
+
+    @cached(ttl=60, prefix="test_cached_decorator")
+    async def double(value):
+        return value * 2
+
+    assert await double(21) == 42
+    assert await double(21) == 42
+
+
+async def test_extraction_is_cached_until_invalidated(service):
+    from app.services.extraction_service import invalidate_extraction
+
+    await invalidate_extraction("doc-cache", "u1")
+    first = await service.extract_information("doc-cache", "u1")
+    second = await service.extract_information("doc-cache", "u1")
+    assert first == second
+    assert service.calls == [("doc-cache", "u1")]
+
+    await invalidate_extraction("doc-cache", "u1")
+    await service.extract_information("doc-cache", "u1")
+    assert len(service.calls) == 2
+
+
+async def test_concurrent_extractions_share_one_run(service, monkeypatch):
+    import asyncio
+    from app.services.extraction_service import invalidate_extraction
+
+    release = asyncio.Event()
+
+    async def slow_extract(document_id, user_id):
+        service.calls.append((document_id, user_id))
+        await release.wait()
+        return {"document_id": document_id}
+
+    monkeypatch.setattr(service, "_extract_information", slow_extract)
+    await invalidate_extraction("doc-shared", "u1")
+
+    pending = [asyncio.create_task(service.extract_information("doc-shared", "u1")) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*pending)
+
+    assert service.calls == [("doc-shared", "u1")]
+    assert all(result is results[0] for result in results)
+    assert service._inflight == {}
+
+
+async def test_queries_filter_in_service(service, monkeypatch):
+    from types import SimpleNamespace
+    from app.services.extraction_service import ExtractedEntity, KeyInformation, invalidate_extraction
+
+    entities = [
+        ExtractedEntity("A公司", "组织机构", 0.9, "", 0),
+        ExtractedEntity("2024年", "时间日期", 0.9, "", 5),
+        ExtractedEntity("B公司", "组织机构", 0.3, "", 9),
+    ]
+    key_info = [
+        KeyInformation(f"info{i}", importance, "财务状况" if i % 2 else "核心业务", [], "")
+        for i, importance in enumerate([0.9, 0.8, 0.7, 0.6, 0.4])
+    ]
+
+    async def fake_extract(document_id, user_id):
+        return SimpleNamespace(entities=entities, key_information=key_info)
+
+    monkeypatch.setattr(service, "_extract_information", fake_extract)
+    await invalidate_extraction("doc-query", "u1")
+
+    orgs = await service.query_entities("doc-query", "u1", entity_type="组织机构", min_confidence=0.5)
+    assert [e.text for e in orgs] == ["A公司"]
+
+    finance = await service.query_key_information("doc-query", "u1", category="财务状况", min_importance=0.5)
+    assert [i.content for i in finance] == ["info1", "info3"]
+
+    top = await service.query_key_information("doc-query", "u1", min_importance=0.5, limit=2)
+    assert [i.content for i in top] == ["info0", "info1"]
+
+
+async def test_extraction_service_dependency_is_singleton(app_env):
+    from app.services.extraction_service import get_extraction_service
+
+    assert await get_extraction_service() is await get_extraction_service()
+
+
+async def test_summary_only_skips_full_pipeline(service, monkeypatch):
+    from types import SimpleNamespace
+    from app.services.extraction_service import invalidate_extraction
+
+    async def no_init():
+        pass
+
+    async def fake_content(document_id, user_id):
+        service.calls.append(("content", document_id))
+        return {"content": "本公司持续推进节能减排。\n\n董事会负责风险管理。", "name": "报告"}
+
+    monkeypatch.setattr(service, "_init_components", no_init)
+    monkeypatch.setattr(service, "_get_document_content", fake_content)
+    await invalidate_extraction("doc-part", "u1")
+
+    summary = await service.extract_summary_only("doc-part", "u1")
+    again = await service.extract_summary_only("doc-part", "u1")
+    assert summary.title == again.title == "报告"
+    assert service.calls == [("content", "doc-part")]
+
+    # 已有完整提取结果时直接取用其中的部分
+    await invalidate_extraction("doc-part", "u1")
+
+    async def fake_extract(document_id, user_id):
+        return SimpleNamespace(summary="full-summary", tags=["full"])
+
+    monkeypatch.setattr(service, "_extract_information", fake_extract)
+    await service.extract_information("doc-part", "u1")
+    assert await service.extract_tags_only("doc-part", "u1") == ["full"]
+    assert service.calls == [("content", "doc-part")]
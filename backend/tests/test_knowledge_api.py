@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.fixture
+def knowledge(app_env):
+    from app.api.v1 import knowledge
+
+    return knowledge
+
+
+def test_category_suggestions_follow_rule_order(knowledge):
+    content = "公司持续推进绿色发展，" * 10 + "投资收益稳步提升。" * 10
+
+    suggestions = knowledge._suggest_categories("2024_ESG_Financial.pdf", content)
+    assert [s["category"] for s in suggestions] == ["ESG报告", "环境保护"]
+
+    suggestions = knowledge._suggest_categories("policy.docx", "投资收益" * 30)
+    assert [s["category"] for s in suggestions] == ["政策文件", "投资分析"]
+
+
+def test_category_suggestions_fall_back_to_generic(knowledge):
+    # 预览过短时不参与匹配
+    suggestions = knowledge._suggest_categories("notes.txt", "绿色")
+    assert suggestions == [{"category": "通用文档", "confidence": 0.5, "reason": "未找到特定分类特征"}]
+
+    suggestions[0]["confidence"] = 0
+    assert knowledge._suggest_categories("notes.txt", None)[0]["confidence"] == 0.5
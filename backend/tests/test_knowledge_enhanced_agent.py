@@ -0,0 +1,219 @@
+import pytest
+
+
+class FakeSearchTool:
+    def __init__(self, user_id="u1"):
+        self.user_id = user_id
+        self.calls = 0
+        self.vectors = []
+
+    async def search(self, query, n_results=5, format=True, **kwargs):
+        self.calls += 1
+        result = {"found": True, "chunks": [{"content": "ESG政策", "metadata": {}, "similarity": 0.9}]}
+        return self.format_results(result, query) if format else result
+
+    async def search_by_vector(self, query_vector, query="", n_results=5, **kwargs):
+        self.vectors.append(query_vector)
+        return await self.search(query, n_results, **kwargs)
+
+    def format_results(self, result, query):
+        return f"基于知识库搜索 \"{query}\"，找到以下相关信息：..."
+
+
+@pytest.fixture
+def agent(app_env, monkeypatch, stub_embeddings):
+    from app.agents.knowledge_enhanced_agent import KnowledgeEnhancedAgent
+    from app.core.chat_cache import chat_cache
+
+    monkeypatch.setattr(chat_cache, "_embedding_model", stub_embeddings(default=(1.0, 0.0)))
+    chat_cache.clear()
+    agent = KnowledgeEnhancedAgent("test_agent")
+    agent._tools["u1"] = FakeSearchTool()
+    yield agent
+    chat_cache.clear()
+
+
+def chat_message(question, user_id="u1"):
+    from app.bus.schemas import A2AMessage, MessageType
+
+    return A2AMessage(
+        conversation_id="c", task_id="t", from_agent="user", to_agent="test_agent",
+        message_type=MessageType.REQUEST, action="enhanced_chat",
+        payload={"question": question, "user_id": user_id}, context={"user_id": user_id},
+    )
+
+
+async def test_repeated_question_is_served_from_semantic_cache(agent):
+    first = await agent._handle_enhanced_chat(chat_message("公司的ESG政策是什么？"))
+    second = await agent._handle_enhanced_chat(chat_message("公司的ESG政策是什么？"))
+
+    assert first["type"] == second["type"] == "enhanced_chat_response"
+    assert second["response"] == first["response"]
+    assert agent._tools["u1"].calls == 1
+    # 检索复用了缓存查询阶段的问题向量
+    assert len(agent._tools["u1"].vectors) == 1
+
+
+async def test_regular_question_skips_embedding_and_search(agent, monkeypatch):
+    from app.core.chat_cache import chat_cache
+
+    async def fail_lookup(*args):
+        raise AssertionError("cache lookup should not run")
+
+    monkeypatch.setattr(chat_cache, "lookup", fail_lookup)
+    result = await agent._handle_enhanced_chat(chat_message("你好"))
+
+    assert result["type"] == "regular_chat_response"
+    assert agent._tools["u1"].calls == 0
+
+
+def test_should_search_knowledge_matches_keywords_case_insensitively(app_env):
+    from app.agents.knowledge_enhanced_agent import should_search_knowledge
+
+    assert should_search_knowledge("我们的esg评分怎么样")
+    assert should_search_knowledge("介绍一下内控体系")
+    assert not should_search_knowledge("你好")
+
+
+def test_search_tools_are_reused_per_user(app_env, monkeypatch):
+    from app.tools import knowledge_search_tool
+
+    monkeypatch.setattr(knowledge_search_tool, "SEARCH_TOOL_POOL_SIZE", 2)
+    monkeypatch.setattr(knowledge_search_tool, "_tool_pool", knowledge_search_tool.OrderedDict())
+    create = knowledge_search_tool.create_knowledge_search_tool
+
+    first = create("u1")
+    assert create("u1") is first
+    create("u2")
+    create("u3")
+    assert create("u1") is not first
+
+
+async def test_search_tool_returns_structured_results_without_formatting(app_env):
+    import numpy as np
+    from app.tools.knowledge_search_tool import KnowledgeSearchTool
+
+    class StubCollection:
+        def __init__(self, documents):
+            self.documents = documents
+
+        def query(self, **kwargs):
+            n = len(self.documents)
+            return {
+                "documents": [self.documents],
+                "metadatas": [[{"filename": "policy.pdf", "file_type": "pdf"}] * n],
+                "distances": [[0.25] * n],
+            }
+
+    tool = KnowledgeSearchTool(user_id="u1")
+    tool.chroma_manager = type("Manager", (), {"collection": StubCollection(["ESG政策全文"])})()
+    vector = np.ones(2, dtype=np.float32)
+
+    result = await tool.search_by_vector(vector, "ESG政策", format=False)
+    assert result == {
+        "found": True,
+        "chunks": [{
+            "content": "ESG政策全文",
+            "metadata": {"filename": "policy.pdf", "file_type": "pdf"},
+            "similarity": 0.75,
+        }],
+    }
+    assert "policy.pdf" in tool.format_results(result, "ESG政策")
+
+    tool.chroma_manager.collection = StubCollection([])
+    empty = await tool.search_by_vector(vector, "ESG政策", format=False)
+    assert empty == {"found": False, "chunks": []}
+    assert "没有找到" in tool.format_results(empty, "ESG政策")
+
+
+async def test_agent_keeps_one_search_tool_per_user(agent):
+    agent._tools["u2"] = FakeSearchTool("u2")
+
+    await agent._process_message(chat_message("公司的ESG政策是什么？", user_id="u2"))
+
+    assert agent._tools["u1"].calls == 0
+    assert agent._tools["u2"].calls == 1
+
+
+async def test_concurrent_searches_with_same_filters_share_one_query(app_env):
+    import asyncio
+    import numpy as np
+    from app.tools.knowledge_search_tool import KnowledgeSearchBatcher
+
+    class RecordingCollection:
+        def __init__(self):
+            self.calls = []
+
+        def query(self, query_embeddings, n_results, where):
+            self.calls.append((len(query_embeddings), where["user_id"]))
+            return {
+                "ids": [[f"{where['user_id']}-{i}"] for i in range(len(query_embeddings))],
+                "documents": [[f"doc{i}"] for i in range(len(query_embeddings))],
+                "embeddings": None,
+                "included": ["documents"],
+            }
+
+    collection = RecordingCollection()
+    batcher = KnowledgeSearchBatcher(window=0.05)
+    vector = np.ones(2, dtype=np.float32)
+
+    results = await asyncio.gather(
+        batcher.query(collection, vector, 3, {"user_id": "u1"}),
+        batcher.query(collection, vector, 3, {"user_id": "u1"}),
+        batcher.query(collection, vector, 3, {"user_id": "u2"}),
+    )
+
+    assert sorted(collection.calls) == [(1, "u2"), (2, "u1")]
+    assert [r["ids"] for r in results] == [[["u1-0"]], [["u1-1"]], [["u2-0"]]]
+    assert results[0]["included"] == ["documents"]
+    assert results[0]["embeddings"] is None
+
+
+async def test_slow_search_does_not_block_next_window(app_env):
+    import asyncio
+    import threading
+    import numpy as np
+    from app.tools.knowledge_search_tool import KnowledgeSearchBatcher
+
+    unblock = threading.Event()
+
+    class SlowCollection:
+        def query(self, query_embeddings, n_results, where):
+            if where["user_id"] == "slow":
+                unblock.wait(5)
+            return {"ids": [[where["user_id"]]] * len(query_embeddings)}
+
+    collection = SlowCollection()
+    batcher = KnowledgeSearchBatcher(window=0.01)
+    vector = np.ones(2, dtype=np.float32)
+
+    slow = asyncio.create_task(batcher.query(collection, vector, 1, {"user_id": "slow"}))
+    await asyncio.sleep(0.05)
+    fast = await asyncio.wait_for(batcher.query(collection, vector, 1, {"user_id": "fast"}), 1)
+    assert fast["ids"] == [["fast"]]
+    assert not slow.done()
+
+    unblock.set()
+    assert (await slow)["ids"] == [["slow"]]
+
+
+async def test_concurrent_identical_context_lookups_share_one_search(agent):
+    import asyncio
+
+    tool = agent._tools["u1"]
+    release = asyncio.Event()
+    search = tool.search
+
+    async def slow_search(*args, **kwargs):
+        await release.wait()
+        return await search(*args, **kwargs)
+
+    tool.search = slow_search
+    lookups = [asyncio.create_task(agent._get_knowledge_context("ESG政策", tool)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    contexts = await asyncio.gather(*lookups)
+
+    assert tool.calls == 1
+    assert contexts[0] is not None and all(c is contexts[0] for c in contexts)
+    assert agent._inflight == {}
@@ -0,0 +1,88 @@
+import pytest
+
+
+@pytest.fixture
+def db(app_env):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.base_class import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _document(doc_id, status, file_type, size, category_id=None):
+    from app.models.knowledge_db import KnowledgeDocumentDB
+
+    return KnowledgeDocumentDB(
+        id=doc_id, user_id=1, filename="f", original_filename="f", file_path="p",
+        file_type=file_type, file_size=size, status=status, category_id=category_id
+    )
+
+
+async def test_stats_aggregate_in_sql(db):
+    from app.models.knowledge_db import KnowledgeCategoryDB
+    from app.services.knowledge_service_v2 import KnowledgeServiceV2
+
+    db.add_all([
+        KnowledgeCategoryDB(id="c1", name="ESG报告", user_id=1),
+        KnowledgeCategoryDB(id="c0", name="通用", user_id=0),
+        _document("d1", "completed", "pdf", 100, "c1"),
+        _document("d2", "processing", "docx", 50),
+        _document("d3", "deleted", "pdf", 999, "c1"),
+        _document("d4", "completed", "pdf", 7, "c1"),
+    ])
+    db.commit()
+
+    service = KnowledgeServiceV2.__new__(KnowledgeServiceV2)
+    stats = await service.get_stats(db, 1)
+
+    assert stats.total_documents == 3
+    assert stats.total_size == 157
+    assert stats.total_categories == 2
+    assert stats.documents_by_status == {"completed": 2, "processing": 1}
+    assert stats.documents_by_type == {"pdf": 2, "docx": 1}
+    assert stats.documents_by_category == {"ESG报告": 2}
+
+    empty = await service.get_stats(db, 2)
+    assert (empty.total_documents, empty.total_size, empty.documents_by_status) == (0, 0, {})
+
+
+async def test_search_documents_sorts_on_whitelisted_columns(db):
+    from app.models.knowledge_db import KnowledgeDocumentDB
+    from app.services.knowledge_service_v2 import KnowledgeServiceError, KnowledgeServiceV2
+    from datetime import datetime
+
+    for i, status in enumerate(["completed", "completed", "deleted", "processing"]):
+        doc = _document(f"d{i}", status, "pdf", 1)
+        doc.original_filename = f"esg_report_{i}.pdf"
+        doc.created_at = datetime(2024, 1, i + 1)
+        db.add(doc)
+    db.commit()
+
+    service = KnowledgeServiceV2.__new__(KnowledgeServiceV2)
+    newest = await service.search_documents(db, 1, "esg", {"status": "completed"})
+    assert [d.id for d in newest] == ["d1", "d0"]
+
+    oldest = await service.search_documents(db, 1, "esg", {"sort_order": "asc", "limit": 2})
+    assert [d.id for d in oldest] == ["d0", "d1"]
+
+    with pytest.raises(KnowledgeServiceError):
+        await service.search_documents(db, 1, "esg", {"sort_by": "file_size"})
+
+
+async def test_delete_document_invalidates_cached_chat_answers(db, monkeypatch):
+    from app.core.chat_cache import chat_cache
+    from app.services.knowledge_service_v2 import KnowledgeServiceV2
+
+    invalidated = []
+    monkeypatch.setattr(chat_cache, "invalidate_user", invalidated.append)
+    db.add(_document("d1", "completed", "pdf", 1))
+    db.commit()
+
+    service = KnowledgeServiceV2.__new__(KnowledgeServiceV2)
+    assert await service.delete_document(db, "d1", 1) is True
+    assert invalidated == [1]
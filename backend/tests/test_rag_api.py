@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def rag(app_env):
+    from app.api.v1 import rag
+
+    return rag
+
+
+async def test_question_suggestions_are_capped(rag):
+    generic = (await rag.get_question_suggestions("u1", None, None)).data
+    assert len(generic["suggestions"]) == rag.MAX_QUESTION_SUGGESTIONS
+    assert generic["total_suggestions"] == 10
+
+    by_type = (await rag.get_question_suggestions("u1", None, "PDF")).data
+    assert by_type["suggestions"][0] == "这份PDF文档的主要内容是什么？"
+
+    unknown = (await rag.get_question_suggestions("u1", None, "pptx")).data
+    assert unknown["suggestions"] == rag._DEFAULT_TYPE_SUGGESTIONS[0]
+
+    document = (await rag.get_question_suggestions("u1", "d1", "pdf")).data
+    assert document["total_suggestions"] == len(document["suggestions"]) == 7
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def rag(app_env):
+    from app.services import rag_service
+
+    return rag_service
+
+
+@pytest.fixture
+def service(rag, monkeypatch):
+    service = rag.RAGService()
+    service.calls = []
+
+    async def fake_answer(question, user_id, document_id=None, document_type=None):
+        service.calls.append(question)
+        await asyncio.sleep(0)
+        chunk = rag.DocumentChunk("内容", {"document_id": document_id or "d1"})
+        return rag.RAGAnswer(question, "答案", [chunk], 0.8)
+
+    monkeypatch.setattr(service, "_answer_question", fake_answer)
+    return service
+
+
+async def test_format_variants_share_cached_answer(rag, service):
+    user_id = "u-variants"
+    first = await service.answer_question("这份文档的主要内容是什么？", user_id)
+    again = await service.answer_question("  这份文档的主要内容是什么? ", user_id)
+    other = await service.answer_question("这份文档的结论是什么？", user_id)
+
+    assert again.answer == first.answer
+    assert service.calls == ["这份文档的主要内容是什么？", "这份文档的结论是什么？"]
+    assert other is not first
+
+
+async def test_concurrent_questions_share_one_run(service):
+    answers = await asyncio.gather(*(service.answer_question("ESG评分?", "u-concurrent") for _ in range(3)))
+    assert service.calls == ["ESG评分?"]
+    assert all(answer is answers[0] for answer in answers)
+    assert service._inflight == {}
+
+
+async def test_failed_and_empty_answers_are_not_cached(rag, service, monkeypatch):
+    async def failing(question, user_id, document_id=None, document_type=None):
+        service.calls.append(question)
+        raise RuntimeError("llm down")
+
+    monkeypatch.setattr(service, "_answer_question", failing)
+    error = await service.answer_question("排放数据?", "u-errors")
+    assert error.confidence == 0.0 and "llm down" in error.reasoning
+
+    async def no_context(question, user_id, document_id=None, document_type=None):
+        service.calls.append(question)
+        return service._generate_no_context_answer(question)
+
+    monkeypatch.setattr(service, "_answer_question", no_context)
+    await service.answer_question("排放数据?", "u-errors")
+    await service.answer_question("排放数据?", "u-errors")
+    assert len(service.calls) == 3
@@ -0,0 +1,118 @@
+import pytest
+
+from app.core import report_cache as report_cache_module
+from app.core.report_cache import ReportCache, build_report_key, canonicalize
+
+
+PROFILE_A = {"company_name": "Acme", "basic_profile": {"industry_category": "制造业"}}
+PROFILE_A_SIMILAR = {"company_name": "Acme", "basic_profile": {"industry_category": "制造业", "scale": "大型"}}
+PROFILE_B = {"company_name": "Globex", "basic_profile": {"industry_category": "制造业"}}
+ASSESSMENT = {"overall_score": 6.5}
+
+
+@pytest.fixture
+def cache(stub_embeddings):
+    report_cache = ReportCache()
+    report_cache._embedding_model = stub_embeddings({
+        canonicalize(PROFILE_A): [1.0, 0.0, 0.0],
+        canonicalize(PROFILE_A_SIMILAR): [0.99, 0.05, 0.0],
+        canonicalize(PROFILE_B): [1.0, 0.0, 0.0],
+    })
+    return report_cache
+
+
+def test_canonicalize_is_key_order_independent():
+    assert canonicalize({"b": 1, "a": {"d": 2, "c": 3}}) == canonicalize({"a": {"c": 3, "d": 2}, "b": 1})
+
+
+def test_build_report_key_covers_all_inputs():
+    key = build_report_key("GRI", PROFILE_A, ASSESSMENT)
+    assert key.startswith("esg_report:")
+    assert key == build_report_key("GRI", dict(PROFILE_A), dict(ASSESSMENT))
+    assert key != build_report_key("SASB", PROFILE_A, ASSESSMENT)
+    assert key != build_report_key("GRI", PROFILE_A, {"overall_score": 7.0})
+
+
+async def test_exact_hit_returns_copy(cache):
+    probe = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    assert probe.content is None
+    await cache.store(probe, {"executive_summary": "A"})
+
+    hit = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    assert hit.content == {"executive_summary": "A"}
+    hit.content["executive_summary"] = "mutated"
+    again = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    assert again.content == {"executive_summary": "A"}
+
+
+async def test_semantic_hit_requires_same_company_and_assessment(cache):
+    probe = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    await cache.store(probe, {"executive_summary": "A"})
+
+    similar = await cache.lookup("GRI", PROFILE_A_SIMILAR, ASSESSMENT)
+    assert similar.content == {"executive_summary": "A"}
+
+    # Identical embedding, but another company: must not reuse Acme's report.
+    other_company = await cache.lookup("GRI", PROFILE_B, ASSESSMENT)
+    assert other_company.content is None
+
+    other_assessment = await cache.lookup("GRI", PROFILE_A_SIMILAR, {"overall_score": 3.0})
+    assert other_assessment.content is None
+
+
+async def test_miss_embeds_profile_once(cache):
+    first = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    await cache.store(first, {"executive_summary": "A"})
+    calls = cache._embedding_model.calls
+
+    probe = await cache.lookup("GRI", {**PROFILE_A, "extra": "x"}, ASSESSMENT)
+    assert probe.content is None
+    await cache.store(probe, {"executive_summary": "A2"})
+    assert cache._embedding_model.calls == calls + 1
+
+
+async def test_local_exact_tier_is_bounded():
+    report_cache = ReportCache(local_max_entries=2)
+    report_cache._semantic_enabled = False
+    for i in range(3):
+        probe = await report_cache.lookup("GRI", {"company_name": f"c{i}"}, ASSESSMENT)
+        await report_cache.store(probe, {"i": i})
+    assert len(report_cache._local) == 2
+    assert (await report_cache.lookup("GRI", {"company_name": "c0"}, ASSESSMENT)).content is None
+
+
+async def test_semantic_buckets_are_bounded(cache):
+    cache.max_buckets = 2
+    for name in ("a", "b", "c"):
+        probe = await cache.lookup("GRI", {**PROFILE_A, "company_name": name}, ASSESSMENT)
+        await cache.store(probe, {"executive_summary": name})
+
+    assert [bucket[1] for bucket in cache._semantic_index] == ["b", "c"]
+
+
+async def test_expired_semantic_entries_are_evicted(cache):
+    probe = await cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    await cache.store(probe, {"executive_summary": "A"})
+    entries = cache._semantic_index[probe.bucket]
+    _, vector, content = entries[0]
+    entries[0] = (0.0, vector, content)
+
+    assert (await cache.lookup("GRI", PROFILE_A_SIMILAR, ASSESSMENT)).content is None
+    assert probe.bucket not in cache._semantic_index
+
+
+async def test_disabled_embedding_falls_back_to_exact_only(app_env, monkeypatch):
+    def broken_factory():
+        raise ValueError("EMBEDDING_API_KEY is not configured.")
+
+    from app.core.llm_factory import llm_factory
+    monkeypatch.setattr(llm_factory, "create_embedding_model", broken_factory)
+
+    report_cache = report_cache_module.ReportCache()
+    probe = await report_cache.lookup("GRI", PROFILE_A, ASSESSMENT)
+    await report_cache.store(probe, {"executive_summary": "A"})
+
+    assert report_cache._semantic_enabled is False
+    assert report_cache._semantic_index == {}
+    assert (await report_cache.lookup("GRI", PROFILE_A, ASSESSMENT)).content == {"executive_summary": "A"}
+    assert (await report_cache.lookup("GRI", PROFILE_A_SIMILAR, ASSESSMENT)).content is None
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def db(app_env):
+    from app.db.base_class import Base
+    from app.models.report_db import ReportDB
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[ReportDB.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+async def test_concurrent_writes_share_one_commit(db):
+    from app.models.report import ReportCreate
+    from app.models.report_db import ReportDB
+    from app.services.report_service import ReportService, ReportWriteBatcher
+
+    commits = 0
+    original_commit = db.commit
+
+    def counting_commit():
+        nonlocal commits
+        commits += 1
+        original_commit()
+
+    db.commit = counting_commit
+    writer = ReportWriteBatcher(db)
+    try:
+        report_ids = await asyncio.gather(*[
+            writer.create_report(ReportCreate(
+                conversation_id="conv", company_name=f"c{i}",
+                company_profile={"company_name": f"c{i}"}, standard="GRI",
+            ))
+            for i in range(5)
+        ])
+        assert commits == 1
+
+        await asyncio.gather(
+            writer.update_report_content(report_ids[0], {"executive_summary": "done"}),
+            writer.update_report_status(report_ids[1], "failed", "boom"),
+        )
+        assert commits == 2
+    finally:
+        await writer.close()
+
+    db.expire_all()
+    assert db.query(ReportDB).count() == 5
+    completed = ReportService(db).find_completed_report("conv", "GRI", {"company_name": "c0"})
+    assert completed.id == report_ids[0]
+    assert completed.content == {"executive_summary": "done"}
+    failed = ReportService(db).get_report(report_ids[1])
+    assert (failed.status, failed.error_message) == ("failed", "boom")
+
+
+async def test_sections_merge_into_report_content(db):
+    from app.models.report import ReportCreate
+    from app.services.report_service import ReportService, ReportWriteBatcher
+
+    writer = ReportWriteBatcher(db)
+    try:
+        report_id = await writer.create_report(ReportCreate(
+            conversation_id="conv", company_name="Acme", company_profile={}, standard="GRI",
+        ))
+        await asyncio.gather(
+            writer.append_section(report_id, "executive_summary", "hello"),
+            writer.append_section(report_id, "company_overview", {"name": "Acme"}),
+        )
+    finally:
+        await writer.close()
+
+    db.expire_all()
+    report = ReportService(db).get_report(report_id)
+    assert report.content == {"executive_summary": "hello", "company_overview": {"name": "Acme"}}
+    assert report.status == "generating"
+
+
+async def test_failed_batch_only_fails_the_broken_report(db):
+    from app.models.report import ReportCreate
+    from app.services.report_service import ReportService, ReportWriteBatcher
+
+    writer = ReportWriteBatcher(db)
+    flush = writer._flush
+
+    def flaky_flush(batch):
+        if any(values["id"] == "broken" for _, values, _ in batch):
+            raise ValueError("boom")
+        flush(batch)
+
+    writer._flush = flaky_flush
+    try:
+        report_id = await writer.create_report(ReportCreate(
+            conversation_id="conv", company_name="Acme", company_profile={}, standard="GRI",
+        ))
+        good, broken = await asyncio.gather(
+            writer.update_report_status(report_id, "failed", "llm"),
+            writer.update_report_status("broken", "failed"),
+            return_exceptions=True,
+        )
+    finally:
+        await writer.close()
+
+    assert good is None
+    assert isinstance(broken, ValueError)
+    db.expire_all()
+    assert ReportService(db).get_report(report_id).status == "failed"
+
+
+@pytest.mark.parametrize("delay", [0, 0.01])
+async def test_close_fails_pending_writes(db, delay):
+    from app.services.report_service import ReportWriteBatcher
+
+    writer = ReportWriteBatcher(db, window=60)
+    pending = asyncio.gather(
+        writer.update_report_status("r1", "failed"),
+        writer.update_report_status("r2", "failed"),
+        return_exceptions=True,
+    )
+    await asyncio.sleep(delay)
+    await writer.close()
+
+    results = await asyncio.wait_for(pending, 1)
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+async def test_fetch_report_falls_back_to_sync_session_without_async_engine(db, monkeypatch):
+    from app.db import session as db_session
+    from app.models.report_db import ReportDB
+    from app.services.report_service import fetch_report
+
+    db.add(ReportDB(id="r1", conversation_id="conv", company_name="c", standard="GRI",
+                    company_profile={}, status="completed", content={"summary": "ok"}))
+    db.commit()
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", None)
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(bind=db.get_bind()))
+
+    report = await fetch_report("r1")
+    assert report.content == {"summary": "ok"}
+    assert await fetch_report("missing") is None
+
+
+def test_get_report_revalidates_with_etag(db, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api.routers import reports
+    from app.db import session as db_session
+    from app.models.report_db import ReportDB
+
+    db.add(ReportDB(id="r1", conversation_id="conv", company_name="c", standard="GRI",
+                    company_profile={}, status="generating"))
+    db.commit()
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", None)
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    app = FastAPI()
+    app.include_router(reports.router, prefix="/reports")
+    client = TestClient(app)
+
+    first = client.get("/reports/r1")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    not_modified = client.get("/reports/r1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+    report = db.get(ReportDB, "r1")
+    report.status = "completed"
+    db.commit()
+    changed = client.get("/reports/r1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert client.get("/reports/missing").status_code == 404